@@ -2,14 +2,35 @@
 
 import sys
 import os
+import time
+import atexit
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import (
+    Flask,
+    Response,
+    abort,
+    g,
+    jsonify,
+    request,
+    send_file,
+    send_from_directory,
+)
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.security import safe_join
 from flask_cors import CORS
+from PIL import Image, UnidentifiedImageError
 
+from core import metrics
+from core.database import UnitOfWork, close_pool
+from core.exceptions import AppError
 from modules.api.routes import api_bp
+from laser import service
 from laser.routes import laser_bp
+from laser.step_catalog import catalog as step_catalog
+from shared import previews
+from shared.fast_json import provider_class
 
 # ---------------------------------------------------------------------------
 # Diretórios de assets estáticos
@@ -17,16 +38,110 @@ from laser.routes import laser_bp
 BASE_PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 FRONTEND_DIR = os.path.join(BASE_PROJECT_DIR, "front")
 IMGS_DIR = os.path.join(BASE_PROJECT_DIR, "imgs")
+# JPGs gerados pelo conversor de desenhos (teste/converter.py)
+DRAWINGS_DIR = os.getenv("DRAWINGS_DIR", IMGS_DIR)
+# max-age só para a URL versionada (?v=<etag>); sem versão, revalida sempre
+PREVIEW_MAX_AGE = int(os.getenv("PREVIEW_MAX_AGE", "604800"))  # 7 dias
 
 # ---------------------------------------------------------------------------
 # App
 # ---------------------------------------------------------------------------
 app = Flask(__name__)
+# orjson + formato único para datas, Decimal e LOB do Oracle
+app.json = provider_class(DefaultJSONProvider)(app)
+# Delega o envio de arquivos ao servidor web (X-Sendfile) quando houver proxy
+app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "0") == "1"
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 app.register_blueprint(api_bp)
 app.register_blueprint(laser_bp)
 
+atexit.register(close_pool)
+
+# Índice dos arquivos .step em segundo plano (ativo se STEP_ROOTS definido)
+step_catalog.start()
+atexit.register(step_catalog.stop)
+
+# Retrato do sequenciamento de todos os operadores (ativo se
+# SEQUENCING_SNAPSHOT_INTERVAL > 0)
+if service.sequencing_snapshot is not None:
+    service.sequencing_snapshot.start()
+    atexit.register(service.sequencing_snapshot.stop)
+
+
+# Reaplicação no Oracle das escritas do diário local (ativo se
+# APONTAMENTO_JOURNAL definido). Sob o gunicorn com preload_app o app é
+# importado no mestre, que não atende requisições: lá a drenagem nunca
+# começa (o mestre ficaria com a concessão e os callbacks pós-commit rodariam
+# fora dos workers). serve.py chama start_journal() em cada worker (post_fork)
+def start_journal() -> None:
+    if service.journal is not None:
+        service.journal.start()
+        atexit.register(service.journal.stop)
+
+
+if os.getenv("SERVER_PRELOAD") != "1":
+    start_journal()
+
+
+# ---------------------------------------------------------------------------
+# Métricas por rota (GET /metrics). O rótulo é o padrão da rota, não a URL,
+# para o número de séries não crescer com ids. Registrado antes da unidade de
+# trabalho: after_request roda na ordem inversa, então vê a resposta final.
+# ---------------------------------------------------------------------------
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    started = g.get("request_started")
+    if started is not None and request.endpoint != "get_metrics":
+        route = request.url_rule.rule if request.url_rule else "<sem rota>"
+        metrics.observe_request(
+            request.method,
+            route,
+            response.status_code,
+            time.perf_counter() - started,
+        )
+    return response
+
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# Unidade de trabalho por requisição — uma conexão e um commit por request.
+# A conexão só sai do pool se algum repositório for usado.
+# ---------------------------------------------------------------------------
+@app.before_request
+def open_unit_of_work():
+    g.uow = UnitOfWork().begin()
+
+
+@app.after_request
+def commit_unit_of_work(response):
+    uow = g.get("uow")
+    if uow is not None:
+        if response.status_code < 400:
+            try:
+                uow.commit()
+            except AppError as e:
+                return jsonify({"success": False, "error": e.message}), e.status_code
+        else:
+            uow.rollback()
+    return response
+
+
+@app.teardown_request
+def close_unit_of_work(exc):
+    uow = g.pop("uow", None)
+    if uow is not None:
+        uow.end()
+
 
 # ---------------------------------------------------------------------------
 # Rotas estáticas
@@ -46,6 +161,43 @@ def serve_images(filename):
     return send_from_directory(IMGS_DIR, filename)
 
 
+@app.route("/previews/<string:variant>/<path:filename>")
+def serve_preview(variant, filename):
+    """
+    Variante redimensionada (thumb/medium) de um desenho, com cache em disco.
+    Com ?v= igual ao ETag atual a resposta é imutável; sem ele o navegador
+    revalida a cada uso (304), e um desenho reconvertido aparece na hora.
+    """
+    if variant not in previews.VARIANTS:
+        abort(404)
+    source = safe_join(DRAWINGS_DIR, filename)
+    if source is None:
+        abort(404)
+    try:
+        path, etag = previews.get_cache().get(source, variant)
+        versioned = request.args.get("v") == etag
+        response = send_file(
+            path,
+            mimetype="image/jpeg",
+            etag=etag,
+            conditional=True,
+            max_age=PREVIEW_MAX_AGE if versioned else 0,
+        )
+        response.cache_control.immutable = versioned
+        return response
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        abort(404)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        # Arquivo existe mas não é uma imagem legível. Demais OSError (disco
+        # cheio, permissão no cache) são falha do servidor: seguem como 500
+        abort(415)
+
+
 # ---------------------------------------------------------------------------
+# Servidor de desenvolvimento. Em produção use: python serve.py
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5050, debug=True)
+    app.run(
+        host="0.0.0.0",
+        port=int(os.getenv("SERVER_PORT", "5050")),
+        debug=os.getenv("FLASK_DEBUG", "0") == "1",
+    )
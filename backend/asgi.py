@@ -0,0 +1,117 @@
+## backend/asgi.py
+
+"""
+Aplicação ASGI: as rotas de laser/routes_async.py rodam no event loop
+(pool Oracle asyncio, modo thin); todo o resto cai no app Flask de app.py,
+executado em threads. Um único processo sustenta centenas de requisições
+aguardando o banco.
+
+Uso:
+    DB_THIN_MODE=1 hypercorn asgi:application --bind 0.0.0.0:5050
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from quart import Quart, g, jsonify, request
+from quart.json.provider import DefaultJSONProvider
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+from app import app as flask_app
+from core import database_async, metrics
+from core.database_async import AsyncUnitOfWork
+from core.exceptions import AppError
+from laser.routes_async import laser_async_bp
+from shared.fast_json import provider_class
+
+# Maior corpo aceito nas rotas WSGI (upload de relatórios PDF)
+WSGI_MAX_BODY_SIZE = int(os.getenv("WSGI_MAX_BODY_SIZE", str(64 * 1024 * 1024)))
+
+quart_app = Quart(__name__)
+quart_app.json = provider_class(DefaultJSONProvider)(quart_app)
+quart_app.register_blueprint(laser_async_bp)
+
+
+# ---------------------------------------------------------------------------
+# Métricas por rota — mesma regra de app.py (registradas antes da unidade de
+# trabalho para ver a resposta final)
+# ---------------------------------------------------------------------------
+@quart_app.before_request
+async def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@quart_app.after_request
+async def observe_request(response):
+    metrics.observe_request(
+        request.method,
+        request.url_rule.rule,
+        response.status_code,
+        time.perf_counter() - g.request_started,
+    )
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Unidade de trabalho por requisição — mesma regra de app.py
+# ---------------------------------------------------------------------------
+@quart_app.before_request
+async def open_unit_of_work():
+    g.uow = AsyncUnitOfWork().begin()
+
+
+@quart_app.after_request
+async def commit_unit_of_work(response):
+    uow = g.get("uow")
+    if uow is not None:
+        if response.status_code < 400:
+            try:
+                await uow.commit()
+            except AppError as e:
+                return jsonify({"success": False, "error": e.message}), e.status_code
+        else:
+            await uow.rollback()
+    # Mesma política de CORS do app Flask para /api/*
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+@quart_app.teardown_request
+async def close_unit_of_work(exc):
+    uow = g.pop("uow", None)
+    if uow is not None:
+        await uow.end()
+
+
+@quart_app.after_serving
+async def close_async_pool():
+    await database_async.close_pool()
+
+
+# ---------------------------------------------------------------------------
+# Despacho: rota assíncrona se existir, senão o app Flask
+# ---------------------------------------------------------------------------
+_wsgi = AsyncioWSGIMiddleware(flask_app, max_body_size=WSGI_MAX_BODY_SIZE)
+_async_routes = quart_app.url_map.bind("")
+
+
+def _is_async_route(scope) -> bool:
+    # Preflight CORS fica com o flask-cors
+    if scope["method"] == "OPTIONS":
+        return False
+    try:
+        _async_routes.match(scope["path"], method=scope["method"])
+        return True
+    except (NotFound, MethodNotAllowed):
+        return False
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and not _is_async_route(scope):
+        await _wsgi(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
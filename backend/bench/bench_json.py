@@ -0,0 +1,114 @@
+## backend/bench/bench_json.py
+
+"""
+Custo de serialização das respostas: provider JSON padrão do Flask (json da
+biblioteca padrão) x shared/fast_json.py (orjson), sobre listas sintéticas no
+formato de sequencing_v2 e do histórico de apontamentos.
+
+Uso:
+    python bench/bench_json.py
+    python bench/bench_json.py --rows 20000 --repeat 20
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from shared import fast_json  # noqa: E402
+
+
+def sequencing_rows(n: int) -> list[dict]:
+    return [
+        {
+            "SOC_CODIOF": str(100000 + i),
+            "SOC_EMPRESA": "1",
+            "SOC_CODSEQ": 1 + i % 5,
+            "SOC_COLABID": 42,
+            "SOC_SEQUEN": i,
+            "JLB_CODERP": "1234",
+            "JLB_NOMECB": "OPERADOR TESTE",
+            "JRO_PROERP": f"P{i:06d}",
+            "JRO_DESCRI": "CHAPA CORTADA LASER AÇO 3MM",
+            "JRO_UNIMED": "PC",
+            "QUANTIDADE_PROGRAMADA": Decimal(random.randint(1, 500)),
+            "QUANTIDADE_REALIZADA": Decimal(random.randint(0, 500)),
+            "JPC_DESENHO_ENG": f"\\\\srv\\eng\\P{i:06d}.step",
+            "STEP_DISPONIVEL": True,
+        }
+        for i in range(n)
+    ]
+
+
+def history_rows(n: int) -> list[dict]:
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        {
+            "SOF_APONTAOFID": i,
+            "SOF_CODIOF": "123456",
+            "SOF_OPERAD": "1234",
+            "SOF_DTINIC": start + datetime.timedelta(minutes=7 * i),
+            "SOF_DTAFIM": start + datetime.timedelta(minutes=7 * i + 5),
+            "SOF_QNTBOA": random.randint(0, 50),
+            "SOF_ERROINTEGRA": None,
+        }
+        for i in range(n)
+    ]
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(1)
+    app = Flask(__name__)
+    providers = {
+        "padrão (json)": DefaultJSONProvider(app),
+        "fast_json": fast_json.provider_class(DefaultJSONProvider)(app),
+    }
+    payloads = {
+        "sequencing_v2": {"success": True, "jobs": sequencing_rows(args.rows)},
+        "apontamentos": {"success": True, "apontamentos": history_rows(args.rows)},
+    }
+
+    print(
+        f"{args.rows} linhas | melhor de {args.repeat} | orjson: "
+        f"{'sim' if fast_json.orjson else 'não'}"
+    )
+    print(f"{'payload':<16}{'provider':<16}{'ms':>10}{'KB':>10}")
+    with app.app_context():
+        for name, payload in payloads.items():
+            baseline = None
+            for label, provider in providers.items():
+                body = provider.response(payload).get_data()
+                seconds = measure(lambda: provider.response(payload), args.repeat)
+                baseline = baseline or seconds
+                print(
+                    f"{name:<16}{label:<16}{seconds * 1000:>10.2f}"
+                    f"{len(body) / 1024:>10.1f}"
+                    + (f"   {baseline / seconds:.1f}x" if seconds != baseline else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+## backend/bench/bench_report_parser.py
+
+"""
+Benchmark do parser de relatórios PDF (laser/report_parser.py).
+
+Uso:
+    python bench/bench_report_parser.py                 # corpus sintético
+    python bench/bench_report_parser.py C:\\relatorios   # corpus real (*.pdf)
+
+Opções: --files N (tamanho do corpus sintético), --pages N (páginas por
+relatório sintético), --workers N (pool de processos).
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from laser import report_parser  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Corpus sintético — PDF mínimo, só texto, no formato do relatório da máquina
+# ---------------------------------------------------------------------------
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(lines: list[str]) -> bytes:
+    ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+    for line in lines:
+        ops.append(f"({_pdf_escape(line)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_report_pdf(index: int, pages: int) -> bytes:
+    part = f"P{2000 + index:06d}_{index % 9 + 1}"
+    first = [
+        "Job Report",
+        f"Start Time  2026-02-{index % 28 + 1:02d}  {index % 24:02d}:15:30",
+        f"Total Time  01:{index % 60:02d}:45.678",
+        "Part Name                 Material        Count",
+        f"{part}              S235 3mm        {index % 50 + 1}",
+    ]
+    filler = [
+        f"Sheet {n:03d}  nest {n * 7 % 97:02d}  cut length {n * 13.5:.1f} mm"
+        for n in range(60)
+    ]
+    contents = [_page_stream(first + filler[:40])]
+    contents += [_page_stream(filler) for _ in range(pages - 1)]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for stream in contents:
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = (
+        b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def build_corpus(directory: str, files: int, pages: int) -> list[str]:
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"report_{i:04d}.pdf")
+        with open(path, "wb") as f:
+            f.write(build_report_pdf(i, pages))
+        paths.append(path)
+    return paths
+
+
+# ---------------------------------------------------------------------------
+def run(label: str, fn) -> float:
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r.get("success"))
+    print(
+        f"{label:<28} {elapsed:8.3f}s  {len(results) / elapsed:8.1f} relatórios/s  ok={ok}/{len(results)}"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("corpus", nargs="?", help="Diretório com relatórios PDF reais")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=report_parser.REPORT_PARSER_WORKERS
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(
+                os.path.join(args.corpus, n)
+                for n in os.listdir(args.corpus)
+                if n.lower().endswith(".pdf")
+            )
+        else:
+            paths = build_corpus(tmp, args.files, args.pages)
+
+        files = [(os.path.basename(p), p) for p in paths]
+        print(f"Corpus: {len(files)} relatórios | workers: {args.workers}")
+
+        def full_read():
+            # Referência: extrai todas as páginas antes de procurar os campos
+            results = []
+            for name, path in files:
+                try:
+                    texts = list(report_parser.iter_page_texts(path))
+                    results.append(
+                        {
+                            "file": name,
+                            "success": True,
+                            **report_parser.parse_report_pages(texts),
+                        }
+                    )
+                except Exception as e:
+                    results.append({"file": name, "success": False, "error": str(e)})
+            return results
+
+        def serial():
+            return [report_parser._parse_file(name, path) for name, path in files]
+
+        def pooled():
+            report_parser.REPORT_PARSER_WORKERS = args.workers
+            return report_parser.parse_reports(files)
+
+        base = run("leitura completa (serial)", full_read)
+        run("streaming (serial)", serial)
+        pooled_time = run(f"streaming (pool x{args.workers})", pooled)
+        print(f"Ganho total: {base / pooled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+## backend/bench/bench_serving.py
+
+"""
+Comparação de vazão: servidor de desenvolvimento (app.py, debug) x produção
+(serve.py). Sobe cada modo em um subprocesso, dispara requisições
+concorrentes e mede req/s e latências p50/p95/p99.
+
+Uso:
+    python bench/bench_serving.py
+    python bench/bench_serving.py --modes dev,waitress,gunicorn --clients 32
+        --requests 2000 --path /api/laser/cache/stats
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+MODES = {
+    # Configuração anterior: python app.py com debug=True
+    "dev": ([sys.executable, "app.py"], {"FLASK_DEBUG": "1"}),
+    "waitress": ([sys.executable, "serve.py"], {"SERVER_IMPL": "waitress"}),
+    "gunicorn": ([sys.executable, "serve.py"], {"SERVER_IMPL": "gunicorn"}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {url}")
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def load(url: str, clients: int, requests: int) -> dict:
+    def one(_):
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(url, timeout=30).read()
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [r[0] * 1000 for r in results]
+    return {
+        "rps": requests / elapsed,
+        "errors": sum(1 for r in results if not r[1]),
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    default_modes = "dev,waitress" if os.name == "nt" else "dev,waitress,gunicorn"
+    parser.add_argument("--modes", default=default_modes)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/api/laser/cache/stats")
+    parser.add_argument("--workers", default=os.getenv("SERVER_WORKERS", "4"))
+    parser.add_argument("--threads", default=os.getenv("SERVER_THREADS", "8"))
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} requisições, {args.clients} clientes, GET {args.path} "
+        f"(workers={args.workers}, threads={args.threads})"
+    )
+    print(
+        f"{'modo':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}"
+    )
+
+    for mode in args.modes.split(","):
+        command, extra_env = MODES[mode]
+        port = free_port()
+        env = {
+            **os.environ,
+            **extra_env,
+            "SERVER_PORT": str(port),
+            "SERVER_WORKERS": str(args.workers),
+            "SERVER_THREADS": str(args.threads),
+        }
+        proc = subprocess.Popen(
+            command,
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}{args.path}"
+            wait_ready(url)
+            load(url, args.clients, min(200, args.requests))  # aquecimento
+            r = load(url, args.clients, args.requests)
+            print(
+                f"{mode:<10} {r['rps']:>9.1f} {r['p50']:>9.1f} {r['p95']:>9.1f} "
+                f"{r['p99']:>9.1f} {r['errors']:>6}"
+            )
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+if __name__ == "__main__":
+    main()
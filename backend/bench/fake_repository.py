@@ -0,0 +1,482 @@
+## backend/bench/fake_repository.py
+
+"""
+Oracle em memória para benchmarks: implementa as operações de
+laser/repository.py (e laser/repository_async.py) sobre dados sintéticos
+gerados com semente fixa, com latência injetada por round-trip e por linha.
+
+    import fake_repository
+    fake_repository.install()   # antes de importar app/asgi
+
+Escritas valem na hora (não há transação); o pool real não é usado, e um
+semáforo de FAKE_DB_SESSIONS limita as chamadas simultâneas como o pool faria.
+
+Configuração (variáveis de ambiente, lidas em install()):
+
+    FAKE_DB_SEED              1     semente dos dados e do jitter
+    FAKE_DB_OPERATORS         40    operadores
+    FAKE_DB_OFS_PER_OPERATOR  60    OFs sequenciadas por operador
+    FAKE_DB_LANC_PER_OF       20    linhas de J_OFLANC agregadas por OF
+    FAKE_DB_HISTORY_PER_OF    10    apontamentos já existentes por OF
+    FAKE_DB_LATENCY_MS        2     custo de um round-trip
+    FAKE_DB_JITTER            0.2   variação relativa do round-trip
+    FAKE_DB_ROW_US            5     custo por linha lida/agregada
+    FAKE_DB_WRITE_MS          3     custo extra de DML (redo + commit)
+    FAKE_DB_SESSIONS          DB_POOL_MAX
+    FAKE_STEP_DIR             <temp>/laser_fake_steps
+    FAKE_STEP_FILES           50    arquivos .step distintos
+    FAKE_STEP_KB              512   tamanho de cada .step
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from core import metrics  # noqa: E402
+from core.database import DB_POOL_MAX  # noqa: E402
+from core.exceptions import ValidationError  # noqa: E402
+from laser import repository  # noqa: E402
+
+JOBS_COLUMNS = [
+    "data_lancamento",
+    "sof_apontaofid",
+    "operador",
+    "of_numero",
+    "produto",
+    "quantidade",
+]
+
+
+def _env(name: str, default, kind=int):
+    return kind(os.getenv(name, str(default)))
+
+
+class FakeDatabase:
+    def __init__(
+        self,
+        seed: int = 1,
+        operators: int = 40,
+        ofs_per_operator: int = 60,
+        lanc_per_of: int = 20,
+        history_per_of: int = 10,
+        step_dir: str | None = None,
+        step_files: int = 50,
+        step_kb: int = 512,
+    ):
+        self.lanc_per_of = lanc_per_of
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.operators = []  # códigos ERP
+        self.sequencing = {}  # operador → [dict de SEQUENCING_COLUMNS]
+        self.routing = {}  # (of_id, codseq) → detalhes (of_details_row)
+        self.materials = {}  # of_id → [materiais]
+        self.apontamentos = {}  # id → [id, of, operador, inicio, fim, qtd, erro]
+        self.by_of = {}  # of_id → [ids]
+        self.by_operator = {}  # operador → [ids]
+        self.open = {}  # (operador, empresa) → id aberto
+        self.finished = set()  # ids com SOF_STATUS = 'C'
+        self.closed_ofs = set()
+
+        rnd = random.Random(seed)
+        steps = self._make_steps(step_dir, step_files, step_kb)
+        start = datetime(2024, 1, 1, 6, 0, 0)
+
+        for op_index in range(operators):
+            code = str(1000 + op_index)
+            self.operators.append(code)
+            queue = []
+            for j in range(ofs_per_operator):
+                of_id = str(200000 + op_index * ofs_per_operator + j)
+                codseq = 1 + j % 5
+                programada = rnd.randint(10, 500)
+                queue.append(
+                    {
+                        "SOC_CODIOF": of_id,
+                        "SOC_EMPRESA": "1",
+                        "SOC_CODSEQ": codseq,
+                        "SOC_COLABID": op_index + 1,
+                        "SOC_SEQUEN": j + 1,
+                        "JLB_CODERP": code,
+                        "JLB_NOMECB": f"OPERADOR {code}",
+                        "JRO_PROERP": f"P{of_id}",
+                        "JRO_DESCRI": "CHAPA CORTADA LASER AÇO CARBONO 3MM",
+                        "JRO_UNIMED": "PC",
+                        "QUANTIDADE_PROGRAMADA": programada,
+                        "QUANTIDADE_REALIZADA": sum(
+                            rnd.randint(0, programada // max(1, lanc_per_of) + 1)
+                            for _ in range(lanc_per_of)
+                        ),
+                        "JPC_DESENHO_ENG": (
+                            rnd.choice(steps) if steps and rnd.random() > 0.1 else None
+                        ),
+                    }
+                )
+                self.routing[(of_id, str(codseq))] = repository.of_details_row(
+                    (f"LASER{1 + op_index % 4:02d}", codseq, f"NP{j:04d}", 1.5, 40)
+                )
+                self.materials[of_id] = [
+                    repository.of_material_row(
+                        (f"MP{rnd.randint(1, 300):05d}", "CHAPA AÇO 3MM", "ALM01")
+                    )
+                    for _ in range(rnd.randint(1, 4))
+                ]
+                for h in range(history_per_of):
+                    begin = start + timedelta(minutes=rnd.randint(0, 60 * 24 * 30))
+                    self._insert(
+                        of_id,
+                        code,
+                        begin,
+                        begin + timedelta(minutes=rnd.randint(5, 90)),
+                        rnd.randint(0, 50),
+                    )
+            self.sequencing[code] = queue
+
+    @staticmethod
+    def _make_steps(directory: str | None, count: int, kb: int) -> list[str]:
+        if count <= 0:
+            return []
+        directory = directory or os.path.join(tempfile.gettempdir(), "laser_fake_steps")
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        block = (b"ISO-10303-21;\n" * 74)[:1024]
+        for i in range(count):
+            path = os.path.join(directory, f"P{i:05d}.step")
+            if not os.path.exists(path) or os.path.getsize(path) != kb * 1024:
+                with open(path, "wb") as f:
+                    f.write(block * kb)
+            paths.append(path)
+        return paths
+
+    # -----------------------------------------------------------------------
+    # Apontamentos
+    # -----------------------------------------------------------------------
+    def _insert(self, of_id, operator, begin, end=None, qtd=None, empresa="1"):
+        # Sob self._lock (ou na montagem)
+        ap_id = self._next_id
+        self._next_id += 1
+        self.apontamentos[ap_id] = [ap_id, of_id, operator, begin, end, qtd, None]
+        self.by_of.setdefault(of_id, []).append(ap_id)
+        self.by_operator.setdefault(operator, []).append(ap_id)
+        if end is None:
+            self.open[(operator, empresa)] = ap_id
+        return ap_id
+
+    def _close(self, ap_id, qtd=None, dt_afim=None, finish=False) -> tuple:
+        try:
+            row = self.apontamentos.get(int(ap_id))
+        except (TypeError, ValueError):
+            raise ValidationError(f"Valor inválido para id: {ap_id!r}")
+        if (
+            row is None
+            or row[0] in self.finished
+            or (not finish and row[4] is not None)
+        ):
+            # UPDATE sem linhas: RETURNING não devolve nada
+            return None, None
+        row[4] = dt_afim or datetime.now().replace(microsecond=0)
+        if finish:
+            row[5] = int(qtd)
+            self.finished.add(row[0])
+        for key, value in list(self.open.items()):
+            if value == row[0]:
+                del self.open[key]
+        return row[2], row[1]
+
+    def _history(self, of_id) -> list:
+        rows = [tuple(self.apontamentos[i]) for i in self.by_of.get(str(of_id), [])]
+        rows.sort(key=lambda r: (r[3], r[0]), reverse=True)
+        return rows
+
+    # -----------------------------------------------------------------------
+    # Operações — mesmas assinaturas e retornos de laser/repository.py.
+    # Cada uma devolve (resultado, linhas tocadas, escrita?).
+    # -----------------------------------------------------------------------
+    def fetch_sequencing(self, operator_code, fields=None):
+        _, names = repository.sequencing_query(fields)
+        queue = self.sequencing.get(str(operator_code), [])
+        rows = [tuple(job[n] for n in names) for job in queue]
+        return (names, rows), len(rows) * (1 + self.lanc_per_of), False
+
+    def fetch_sequencing_snapshot(self):
+        names = list(repository.SEQUENCING_COLUMNS)
+        rows = [
+            tuple(job[n] for n in names)
+            for queue in self.sequencing.values()
+            for job in queue
+        ]
+        return (names, rows), len(rows) * (1 + self.lanc_per_of), False
+
+    def insert_apontamento(
+        self,
+        of_numero,
+        operador_codigo,
+        dt_inicio,
+        dt_afim,
+        soc_codseq,
+        quantidade_realizada,
+        soc_empresa,
+    ):
+        with self._lock:
+            self._insert(
+                str(of_numero),
+                str(operador_codigo),
+                dt_inicio,
+                dt_afim,
+                quantidade_realizada,
+                str(soc_empresa),
+            )
+        return None, 1, True
+
+    def insert_apontamentos_batch(self, rows, once=False):
+        with self._lock:
+            for row in rows:
+                if once and any(
+                    self.apontamentos[i][2] == str(row["operador_codigo"])
+                    and self.apontamentos[i][3] == row["dt_inicio"]
+                    for i in self.by_of.get(str(row["of_numero"]), [])
+                ):
+                    continue
+                self._insert(
+                    str(row["of_numero"]),
+                    str(row["operador_codigo"]),
+                    row["dt_inicio"],
+                    row["dt_afim"],
+                    row["quantidade_realizada"],
+                    str(row["soc_empresa"]),
+                )
+        return [], len(rows), True
+
+    def start_apontamento(
+        self, of_id, operator_code, empresa_id, operac=1, ignore_id=None
+    ):
+        with self._lock:
+            ap_id = self.open.get((str(operator_code), str(empresa_id)))
+            if ap_id is not None and ap_id != ignore_id:
+                open_of = self.apontamentos[ap_id][1]
+                outcome = "reused" if open_of == str(of_id) else "conflict"
+                return (outcome, ap_id, open_of), 1, True
+            ap_id = self._insert(
+                str(of_id),
+                str(operator_code),
+                datetime.now().replace(microsecond=0),
+                empresa=str(empresa_id),
+            )
+        return ("new", ap_id, None), 1, True
+
+    def update_apontamento_pause(self, apontamento_id, dt_afim=None):
+        with self._lock:
+            return self._close(apontamento_id, dt_afim=dt_afim), 1, True
+
+    def update_apontamento_finish(self, apontamento_id, quantidade, dt_afim=None):
+        with self._lock:
+            return self._close(apontamento_id, quantidade, dt_afim, True), 1, True
+
+    def apply_transitions(self, items):
+        # Um round-trip e um commit para o lote inteiro
+        calls = {
+            "start": self.start_apontamento,
+            "pause": self.update_apontamento_pause,
+            "finish": self.update_apontamento_finish,
+        }
+        results = []
+        for kind, params in items:
+            # Como no Oracle, o erro de um item não derruba os demais
+            try:
+                results.append(calls[kind](**params)[0])
+            except Exception as e:
+                results.append(e)
+        return results, len(items), True
+
+    def fetch_apontamento_changes(self, since):
+        now = datetime.now().replace(microsecond=0)
+        if since is None:
+            return (now, []), 0, False
+        with self._lock:
+            rows = [
+                (r[0], r[1], r[2], r[4], r[5])
+                for r in self.apontamentos.values()
+                if r[3] >= since or (r[4] is not None and r[4] >= since)
+            ]
+        # No Oracle a consulta usa índice em SOF_DATCAD/SOF_DTAFIM
+        return (now, rows), len(rows), False
+
+    def fetch_apontamentos_by_of(self, of_id):
+        with self._lock:
+            rows = self._history(of_id)
+        return [repository.apontamento_row(r) for r in rows], len(rows), False
+
+    def fetch_apontamentos_page(self, of_id, limit, after=None):
+        with self._lock:
+            rows = self._history(of_id)
+        if after is not None:
+            rows = [r for r in rows if (r[3], r[0]) < tuple(after)]
+        rows = rows[: limit + 1]
+        return repository.apontamentos_page(rows, limit), len(rows), False
+
+    def iter_apontamentos_by_of(self, of_id):
+        with self._lock:
+            rows = self._history(of_id)
+        return [repository.apontamento_row(r) for r in rows], len(rows), False
+
+    def _jobs(self, operator):
+        with self._lock:
+            rows = [
+                self.apontamentos[i]
+                for i in self.by_operator.get(str(operator), [])
+                if self.apontamentos[i][4] is not None
+            ]
+        rows.sort(key=lambda r: (r[4], r[0]), reverse=True)
+        return [(r[4], r[0], r[2], r[1], f"P{r[1]}", r[5]) for r in rows]
+
+    def _project(self, rows, fields):
+        if fields is None:
+            return list(JOBS_COLUMNS), rows
+        names = list(dict.fromkeys(("data_lancamento", "sof_apontaofid", *fields)))
+        at = [JOBS_COLUMNS.index(n) for n in names]
+        return names, [tuple(r[i] for i in at) for r in rows]
+
+    def jobs_columns(self):
+        return list(JOBS_COLUMNS), 0, False
+
+    def fetch_jobs(self, operator, limit=None, after=None, fields=None):
+        columns, rows = self._project(self._jobs(operator), fields)
+        scanned = len(rows)
+        if after is not None:
+            rows = [r for r in rows if (r[0], r[1]) < tuple(after)]
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1][0], rows[-1][1])
+        return (columns, rows, next_key), scanned, False
+
+    def iter_jobs(self, operator, fields=None):
+        columns, rows = self._project(self._jobs(operator), fields)
+        return [dict(zip(columns, r)) for r in rows], len(rows), False
+
+    def fetch_of_details(self, of_id, codseq):
+        return self.routing.get((str(of_id), str(codseq))), 1, False
+
+    def fetch_of_materials(self, of_id):
+        rows = self.materials.get(str(of_id), [])
+        return list(rows), len(rows), False
+
+    def fetch_of_details_batch(self, pairs):
+        result = {}
+        for of_id, codseq in pairs:
+            key = (str(of_id), str(codseq))
+            if key in self.routing:
+                result[key] = self.routing[key]
+        return result, len(pairs), False
+
+    def fetch_of_materials_batch(self, of_ids):
+        result = {str(i): list(self.materials.get(str(i), [])) for i in of_ids}
+        return result, sum(len(v) for v in result.values()), False
+
+    def fetch_open_of_ids(self, of_ids):
+        return {str(i) for i in of_ids if str(i) not in self.closed_ofs}, 0, False
+
+
+# Operações que produzem linhas aos poucos (geradores no repositório real)
+STREAMING = {"iter_apontamentos_by_of", "iter_jobs"}
+
+
+class Latency:
+    """Custo simulado: round-trip com jitter + linhas + DML."""
+
+    def __init__(self, round_trip_ms, jitter, row_us, write_ms, seed=1):
+        self.round_trip = round_trip_ms / 1000
+        self.jitter = jitter
+        self.row = row_us / 1_000_000
+        self.write = write_ms / 1000
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def cost(self, rows: int, write: bool) -> float:
+        with self._lock:
+            factor = 1 + self._rnd.uniform(-self.jitter, self.jitter)
+        return self.round_trip * factor + rows * self.row + (self.write if write else 0)
+
+
+def _sync_wrapper(name, method, latency, sessions):
+    def call(*args, **kwargs):
+        started = time.perf_counter()
+        with sessions:
+            result, rows, write = method(*args, **kwargs)
+            time.sleep(latency.cost(rows, write))
+        metrics.observe_query(name, time.perf_counter() - started, rows, False)
+        if name in STREAMING:
+            return iter(result)
+        return result
+
+    call.__name__ = name
+    return call
+
+
+def _async_wrapper(name, method, latency, limit):
+    semaphores = {}
+
+    def semaphore():
+        # asyncio.Semaphore fica preso ao loop em que foi criado
+        loop = asyncio.get_running_loop()
+        if loop not in semaphores:
+            semaphores[loop] = asyncio.Semaphore(limit)
+        return semaphores[loop]
+
+    async def call(*args, **kwargs):
+        started = time.perf_counter()
+        async with semaphore():
+            result, rows, write = method(*args, **kwargs)
+            await asyncio.sleep(latency.cost(rows, write))
+        metrics.observe_query(name, time.perf_counter() - started, rows, False)
+        return result
+
+    async def stream(*args, **kwargs):
+        for row in await call(*args, **kwargs):
+            yield row
+
+    stream.__name__ = call.__name__ = name
+    return stream if name in STREAMING else call
+
+
+def install(db: FakeDatabase | None = None) -> FakeDatabase:
+    """Troca as funções de laser.repository/repository_async pelas do fake."""
+    from laser import repository_async
+
+    if db is None:
+        db = FakeDatabase(
+            seed=_env("FAKE_DB_SEED", 1),
+            operators=_env("FAKE_DB_OPERATORS", 40),
+            ofs_per_operator=_env("FAKE_DB_OFS_PER_OPERATOR", 60),
+            lanc_per_of=_env("FAKE_DB_LANC_PER_OF", 20),
+            history_per_of=_env("FAKE_DB_HISTORY_PER_OF", 10),
+            step_dir=os.getenv("FAKE_STEP_DIR") or None,
+            step_files=_env("FAKE_STEP_FILES", 50),
+            step_kb=_env("FAKE_STEP_KB", 512),
+        )
+    latency = Latency(
+        _env("FAKE_DB_LATENCY_MS", 2, float),
+        _env("FAKE_DB_JITTER", 0.2, float),
+        _env("FAKE_DB_ROW_US", 5, float),
+        _env("FAKE_DB_WRITE_MS", 3, float),
+        seed=_env("FAKE_DB_SEED", 1),
+    )
+    limit = _env("FAKE_DB_SESSIONS", DB_POOL_MAX)
+    sessions = threading.BoundedSemaphore(limit)
+
+    for name in dir(FakeDatabase):
+        if name.startswith("_") or not hasattr(repository, name):
+            continue
+        method = getattr(db, name)
+        setattr(repository, name, _sync_wrapper(name, method, latency, sessions))
+        if hasattr(repository_async, name):
+            setattr(
+                repository_async, name, _async_wrapper(name, method, latency, limit)
+            )
+    return db
@@ -0,0 +1,27 @@
+## backend/bench/fake_server.py
+
+"""
+serve.py com o Oracle trocado pelo fake em memória (bench/fake_repository.py).
+Mesmas variáveis de ambiente de serve.py (SERVER_IMPL, SERVER_PORT, ...) e
+as FAKE_DB_* do fake.
+
+Uso:
+    python bench/fake_server.py
+    SERVER_IMPL=hypercorn DB_THIN_MODE=1 python bench/fake_server.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import fake_repository  # noqa: E402
+
+# Antes de importar app/asgi: o gunicorn (--preload) herda o fake nos workers
+fake_repository.install()
+
+import serve  # noqa: E402
+
+if __name__ == "__main__":
+    serve.main()
@@ -0,0 +1,309 @@
+## backend/bench/load_shift.py
+
+"""
+Carga de um turno da fábrica contra a API laser. Cada operador é uma thread
+com conexão keep-alive própria:
+
+1. login em rajada — todos liberados juntos em GET sequencing_v2;
+2. ciclos de trabalho — detalhes da OF, histórico, STEP (quando houver),
+   start → pause → start → finish, histórico de novo e recarga da fila;
+3. fim de turno — confirm_batch com os lançamentos manuais do turno.
+
+Relata n, erros e p50/p95/p99/máx por endpoint. Sem --url sobe
+bench/fake_server.py (Oracle em memória) em cada modo de --modes.
+
+Uso:
+    python bench/load_shift.py
+    python bench/load_shift.py --modes waitress,gunicorn,hypercorn --operators 40
+    python bench/load_shift.py --url http://servidor:5000 --operators 10 --cycles 3
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+import http.client
+import statistics
+from urllib.parse import urlsplit, quote
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from bench_serving import BACKEND_DIR, free_port, wait_ready, percentile  # noqa: E402
+
+MODES = {
+    "waitress": {"SERVER_IMPL": "waitress"},
+    "gunicorn": {"SERVER_IMPL": "gunicorn"},
+    "hypercorn": {"SERVER_IMPL": "hypercorn"},
+}
+
+PREFIX = "/api/laser"
+
+
+class Recorder:
+    """Latências por endpoint (rótulo fixo, sem o id da OF)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict = {}
+        self.errors: dict = {}
+
+    def add(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds * 1000)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def total(self) -> int:
+        return sum(len(v) for v in self.samples.values())
+
+
+class Client:
+    def __init__(self, base_url: str, recorder: Recorder):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.recorder = recorder
+        self.conn = None
+
+    def request(self, endpoint: str, method: str, path: str, body=None):
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {"Accept-Encoding": "identity"}
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        status, data = 0, b""
+        for attempt in range(2):
+            try:
+                if self.conn is None:
+                    self.conn = http.client.HTTPConnection(
+                        self.host, self.port, timeout=60
+                    )
+                self.conn.request(method, PREFIX + path, payload, headers)
+                response = self.conn.getresponse()
+                status, data = response.status, response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Servidor fechou a conexão keep-alive: reconecta uma vez
+                self.close()
+                if attempt:
+                    status = 0
+        self.recorder.add(endpoint, time.perf_counter() - started, status < 400)
+        if status >= 400 or not data or not data.startswith(b"{"):
+            return status, None
+        return status, json.loads(data)
+
+    def get(self, endpoint: str, path: str):
+        return self.request(endpoint, "GET", path)
+
+    def post(self, endpoint: str, path: str, body: dict):
+        return self.request(endpoint, "POST", path, body)
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _think(args, rnd: random.Random) -> None:
+    if args.think:
+        time.sleep(rnd.uniform(0.5, 1.5) * args.think / 1000)
+
+
+def operator_shift(
+    base_url: str, operator: str, args, barrier, recorder: Recorder, seed: int
+) -> None:
+    rnd = random.Random(seed)
+    client = Client(base_url, recorder)
+    manual = []
+    try:
+        barrier.wait()
+        _, body = client.get(
+            "GET sequencing_v2 (login)",
+            f"/sequencing_v2?operator_code={operator}",
+        )
+        jobs = (body or {}).get("jobs") or []
+        if not jobs:
+            return
+
+        for cycle in range(args.cycles):
+            job = jobs[cycle % len(jobs)]
+            of_id, codseq = job["SOC_CODIOF"], job["SOC_CODSEQ"]
+            _think(args, rnd)
+            client.get(
+                "GET of/details",
+                f"/of/{of_id}/details?empresa={job['SOC_EMPRESA']}&codseq={codseq}",
+            )
+            client.get("GET apontamento/list", f"/apontamento/list/{of_id}")
+            if job.get("JPC_DESENHO_ENG") and rnd.random() < args.step_ratio:
+                client.get(
+                    "GET download_step",
+                    f"/download_step?file_path={quote(job['JPC_DESENHO_ENG'])}",
+                )
+
+            start_body = {
+                "of_id": of_id,
+                "empresa_id": job["SOC_EMPRESA"],
+                "operator_code": operator,
+                "operac": codseq,
+            }
+            _think(args, rnd)
+            _, started = client.post(
+                "POST apontamento/start", "/apontamento/start", start_body
+            )
+            if not started:
+                continue
+            _think(args, rnd)
+            client.post(
+                "POST apontamento/pause",
+                "/apontamento/pause",
+                {"apontamento_id": started["apontamento_id"]},
+            )
+            _, resumed = client.post(
+                "POST apontamento/start", "/apontamento/start", start_body
+            )
+            if not resumed:
+                continue
+            _think(args, rnd)
+            client.post(
+                "POST apontamento/finish",
+                "/apontamento/finish",
+                {
+                    "apontamento_id": resumed["apontamento_id"],
+                    "quantidade_boa": rnd.randint(1, 20),
+                },
+            )
+            client.get("GET apontamento/list", f"/apontamento/list/{of_id}")
+            client.get("GET sequencing_v2", f"/sequencing_v2?operator_code={operator}")
+            manual.append(job)
+
+        # Lançamentos manuais do turno, confirmados de uma vez por OF
+        begin = datetime.now().replace(microsecond=0) - timedelta(hours=8)
+        for index, job in enumerate(manual[: args.batches]):
+            client.post(
+                "POST apontamento/confirm_batch",
+                "/apontamento/confirm_batch",
+                {
+                    "apontamento_id": job["SOC_CODIOF"],
+                    "operator_code": operator,
+                    "soc_empresa": job["SOC_EMPRESA"],
+                    "soc_codseq": job["SOC_CODSEQ"],
+                    "items": [
+                        {
+                            "start_time": (
+                                begin + timedelta(minutes=30 * index + 5 * k)
+                            ).strftime("%Y-%m-%d %H:%M:%S"),
+                            "total_time": "00:04:30.000000",
+                            "qtd_apontar": rnd.randint(1, 10),
+                        }
+                        for k in range(args.batch_items)
+                    ],
+                },
+            )
+    finally:
+        client.close()
+
+
+def run_shift(base_url: str, args) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    operators = [str(1000 + i) for i in range(args.operators)]
+    barrier = threading.Barrier(len(operators))
+    threads = [
+        threading.Thread(
+            target=operator_shift,
+            args=(base_url, op, args, barrier, recorder, args.seed + i),
+            daemon=True,
+        )
+        for i, op in enumerate(operators)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - started
+
+
+def report(title: str, recorder: Recorder, elapsed: float) -> None:
+    print(
+        f"\n{title}: {recorder.total()} requisições em {elapsed:.1f} s "
+        f"({recorder.total() / elapsed:.1f} req/s)"
+    )
+    print(
+        f"{'endpoint':<32}{'n':>7}{'erros':>7}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'máx ms':>9}"
+    )
+    for endpoint, values in sorted(recorder.samples.items()):
+        print(
+            f"{endpoint:<32}{len(values):>7}{recorder.errors.get(endpoint, 0):>7}"
+            f"{statistics.median(values):>9.1f}{percentile(values, 95):>9.1f}"
+            f"{percentile(values, 99):>9.1f}{max(values):>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    default_modes = "waitress" if os.name == "nt" else "waitress,gunicorn"
+    parser.add_argument("--modes", default=default_modes)
+    parser.add_argument("--url", help="servidor já em execução (ignora --modes)")
+    parser.add_argument("--operators", type=int, default=40)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--think", type=float, default=0, help="pausa média, ms")
+    parser.add_argument("--step-ratio", type=float, default=0.5)
+    parser.add_argument("--batches", type=int, default=2)
+    parser.add_argument("--batch-items", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", default=os.getenv("SERVER_WORKERS", "4"))
+    parser.add_argument("--threads", default=os.getenv("SERVER_THREADS", "8"))
+    args = parser.parse_args()
+
+    print(
+        f"{args.operators} operadores, {args.cycles} ciclos, think {args.think:g} ms "
+        f"(workers={args.workers}, threads={args.threads})"
+    )
+    if args.url:
+        recorder, elapsed = run_shift(args.url.rstrip("/"), args)
+        report(args.url, recorder, elapsed)
+        return
+
+    for mode in args.modes.split(","):
+        port = free_port()
+        env = {
+            **os.environ,
+            **MODES[mode],
+            "SERVER_PORT": str(port),
+            "SERVER_WORKERS": str(args.workers),
+            "SERVER_THREADS": str(args.threads),
+            # Dados do fake cobrem os operadores do turno
+            "FAKE_DB_OPERATORS": os.getenv(
+                "FAKE_DB_OPERATORS", str(max(40, args.operators))
+            ),
+        }
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join("bench", "fake_server.py")],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_ready(f"{base_url}{PREFIX}/cache/stats", timeout=60)
+            recorder, elapsed = run_shift(base_url, args)
+            report(mode, recorder, elapsed)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+if __name__ == "__main__":
+    main()
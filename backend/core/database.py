@@ -1,8 +1,14 @@
 ## backend/core/database.py
 
 import os
+import re
+import time
 import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 import oracledb as cx_Oracle
+from core import metrics
 from core.exceptions import DatabaseError
 
 # ---------------------------------------------------------------------------
@@ -14,38 +20,339 @@ DB_HOST = os.getenv("DB_HOST", "10.42.92.200")
 DB_PORT = os.getenv("DB_PORT", "1521")
 DB_SERVICE = os.getenv("DB_SERVICE", "ORCL")
 
+# Pool de sessões
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+DB_POOL_INCREMENT = int(os.getenv("DB_POOL_INCREMENT", "2"))
+DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", "60"))  # segundos
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "5000"))  # ms aguardando sessão
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # segundos
+# Statements preparados mantidos por sessão (core/statements.py registra
+# pouco mais de uma dúzia; o resto é folga para as variantes de colunas)
+DB_STMT_CACHE_SIZE = int(os.getenv("DB_STMT_CACHE_SIZE", "50"))
+# Força o modo thin mesmo com Oracle Client instalado (exigido pelo asyncio)
+DB_THIN_MODE = os.getenv("DB_THIN_MODE", "0") == "1"
+
 # ---------------------------------------------------------------------------
 # Detecta modo thick (Oracle Client instalado) ou thin
 # ---------------------------------------------------------------------------
-try:
-    cx_Oracle.init_oracle_client()
-    THICK_MODE = True
-    logging.info("Modo thick ativado (Oracle Client encontrado).")
-except cx_Oracle.DatabaseError:
-    THICK_MODE = False
-    logging.info("Oracle Client não encontrado, usando modo thin.")
+THICK_MODE = False
+if DB_THIN_MODE:
+    logging.info("Modo thin forçado por DB_THIN_MODE.")
+else:
+    try:
+        cx_Oracle.init_oracle_client()
+        THICK_MODE = True
+        logging.info("Modo thick ativado (Oracle Client encontrado).")
+    except cx_Oracle.DatabaseError:
+        logging.info("Oracle Client não encontrado, usando modo thin.")
 
 
 # ---------------------------------------------------------------------------
-# Função pública de conexão — usada em todo o projeto
+# Pool de sessões — criado sob demanda, compartilhado por todo o processo
 # ---------------------------------------------------------------------------
-def get_connection():
-    """Retorna uma conexão com o banco de dados Oracle."""
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Pools herdados do processo pai (gunicorn --preload): nunca usados nem
+# fechados no filho — as sessões são do pai
+_inherited: list = []
+
+
+def _forget_pool_after_fork() -> None:
+    global _pool, _pool_lock
+    if _pool is not None:
+        _inherited.append(_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+def _dsn() -> str:
+    return cx_Oracle.makedsn(DB_HOST, int(DB_PORT), service_name=DB_SERVICE)
+
+
+def get_pool():
+    """Retorna o pool de sessões Oracle, criando-o na primeira chamada."""
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            try:
+                logging.debug(
+                    "Criando pool Oracle: %s@%s:%s/%s (min=%s max=%s inc=%s)",
+                    DB_USER,
+                    DB_HOST,
+                    DB_PORT,
+                    DB_SERVICE,
+                    DB_POOL_MIN,
+                    DB_POOL_MAX,
+                    DB_POOL_INCREMENT,
+                )
+                started = time.perf_counter()
+                _pool = cx_Oracle.create_pool(
+                    user=DB_USER,
+                    password=DB_PASS,
+                    dsn=_dsn(),
+                    min=DB_POOL_MIN,
+                    max=DB_POOL_MAX,
+                    increment=DB_POOL_INCREMENT,
+                    getmode=cx_Oracle.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=DB_POOL_TIMEOUT,
+                    ping_interval=DB_POOL_PING_INTERVAL,
+                    timeout=DB_POOL_IDLE_TIMEOUT,
+                    stmtcachesize=DB_STMT_CACHE_SIZE,
+                )
+                metrics.DB_CONNECT_SECONDS.observe(
+                    time.perf_counter() - started, "sync"
+                )
+                logging.info(
+                    "Pool Oracle criado (modo %s).", "thick" if THICK_MODE else "thin"
+                )
+            except cx_Oracle.Error as e:
+                logging.error("Erro ao criar pool Oracle: %s", e)
+                raise DatabaseError(f"Falha ao conectar ao banco de dados: {e}")
+    return _pool
+
+
+def acquire():
+    """Obtém uma conexão do pool. Devolver sempre com release()."""
+    pool = get_pool()
+    started = time.perf_counter()
     try:
-        logging.debug(
-            "Tentando conectar ao Oracle: %s@%s:%s/%s",
-            DB_USER,
-            DB_HOST,
-            DB_PORT,
-            DB_SERVICE,
-        )
-        dsn = cx_Oracle.makedsn(DB_HOST, int(DB_PORT), service_name=DB_SERVICE)
-        conn = cx_Oracle.connect(user=DB_USER, password=DB_PASS, dsn=dsn)
-        logging.info("Conexão com o Oracle estabelecida com sucesso.")
-        return conn
+        conn = pool.acquire()
     except cx_Oracle.Error as e:
-        logging.error("Erro ao conectar ao Oracle: %s", e)
+        metrics.DB_ACQUIRE_ERRORS.inc("sync")
+        logging.error("Erro ao obter conexão do pool: %s", e)
         raise DatabaseError(f"Falha ao conectar ao banco de dados: {e}")
+    metrics.DB_ACQUIRE_SECONDS.observe(time.perf_counter() - started, "sync")
+    metrics.DB_ACQUIRED.inc("sync")
+    return conn
+
+
+def release(conn) -> None:
+    """Devolve a conexão ao pool (ou descarta, se estiver inválida)."""
+    if conn is None:
+        return
+    metrics.DB_RELEASED.inc("sync")
+    try:
+        get_pool().release(conn)
+    except cx_Oracle.Error as e:
+        logging.warning("Erro ao devolver conexão ao pool: %s", e)
+
+
+metrics.register_pool("sync", lambda: _pool)
+
+
+def close_pool() -> None:
+    """Fecha o pool — usado no desligamento do processo."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            try:
+                _pool.close(force=True)
+            except cx_Oracle.Error as e:
+                logging.warning("Erro ao fechar pool Oracle: %s", e)
+            _pool = None
+
+
+# ---------------------------------------------------------------------------
+# Unidade de trabalho — uma conexão e uma transação por requisição
+# ---------------------------------------------------------------------------
+_current_uow: ContextVar["UnitOfWork | None"] = ContextVar("current_uow", default=None)
+
+
+class UnitOfWork:
+    """
+    Agrupa as chamadas ao repositório em uma única conexão e transação.
+    A conexão só é obtida do pool no primeiro uso.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._token = None
+        self._pending = False
+        self._on_commit = []
+
+    @property
+    def connection(self):
+        if self._conn is None:
+            self._conn = acquire()
+        return self._conn
+
+    def mark_write(self) -> None:
+        """Registra que há escrita a confirmar — leituras não geram commit."""
+        self._pending = True
+
+    def on_commit(self, callback) -> None:
+        """Agenda callback() para depois do commit; descartado no rollback."""
+        self._on_commit.append(callback)
+
+    def commit(self) -> None:
+        if self._conn is not None and self._pending:
+            try:
+                self._conn.commit()
+            except cx_Oracle.Error as e:
+                raise DatabaseError(f"Erro Oracle ao confirmar transação: {e}")
+            self._pending = False
+            run_callbacks(self._on_commit)
+        self._on_commit = []
+
+    def rollback(self) -> None:
+        self._on_commit = []
+        if self._conn is not None and self._pending:
+            try:
+                self._conn.rollback()
+            except cx_Oracle.Error as e:
+                logging.warning("Erro ao desfazer transação: %s", e)
+            self._pending = False
+
+    def begin(self) -> "UnitOfWork":
+        self._token = _current_uow.set(self)
+        return self
+
+    def end(self) -> None:
+        """Desfaz o que não foi confirmado e devolve a conexão ao pool."""
+        if self._token is not None:
+            _current_uow.reset(self._token)
+            self._token = None
+        if self._conn is not None:
+            self.rollback()
+            release(self._conn)
+            self._conn = None
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    return _current_uow.get()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Abre uma unidade de trabalho explícita. Confirma ao sair sem erro.
+    Se já houver uma ativa (ex.: a da requisição), participa dela.
+    """
+    active = _current_uow.get()
+    if active is not None:
+        yield active
+        return
+
+    uow = UnitOfWork().begin()
+    try:
+        yield uow
+        uow.commit()
+    finally:
+        uow.end()
+
+
+@contextmanager
+def connection():
+    """
+    Conexão para o repositório: a da unidade de trabalho ativa ou,
+    fora dela, uma conexão avulsa do pool.
+    """
+    uow = _current_uow.get()
+    if uow is not None:
+        yield uow.connection
+        return
+
+    conn = acquire()
+    try:
+        yield conn
+    finally:
+        release(conn)
+
+
+def commit(conn) -> None:
+    """Confirma a escrita — dentro de uma unidade de trabalho, fica para o final."""
+    uow = _current_uow.get()
+    if uow is None:
+        conn.commit()
+    else:
+        uow.mark_write()
+
+
+def after_commit(callback) -> None:
+    """
+    Executa callback() quando a escrita estiver confirmada: no commit da
+    unidade de trabalho ativa ou, fora dela, imediatamente.
+    """
+    uow = _current_uow.get()
+    if uow is None:
+        run_callbacks([callback])
+    else:
+        uow.on_commit(callback)
+
+
+def run_callbacks(callbacks: list) -> None:
+    # Falha em um callback não desfaz o que já foi confirmado
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logging.error("Erro em callback pós-commit: %s", e)
+
+
+# Erros Oracle que uma nova tentativa não resolve: restrição violada ou dado
+# inválido. Os de aplicação (RAISE_APPLICATION_ERROR) também contam
+DEFINITIVE_ORA_ERRORS = frozenset(
+    {
+        1,  # unique constraint
+        1400,  # NOT NULL
+        1407,
+        1438,  # precisão numérica
+        1722,  # número inválido
+        1830,  # formato de data
+        1840,
+        1841,
+        1843,
+        1847,
+        1858,
+        1861,
+        2290,  # check constraint
+        2291,  # FK: pai não encontrado
+        2292,  # FK: filho encontrado
+        12899,  # valor grande demais para a coluna
+    }
+)
+_ORA_CODE = re.compile(r"ORA-(\d{5})")
+
+
+def definitive_error(message) -> bool:
+    """
+    O erro Oracle (exceção ou mensagem) é do comando ou do dado, e repetir
+    não adianta? Deadlock, lock timeout, sessão encerrada ou sem código ORA
+    reconhecível: não — quem chama deve tentar de novo.
+    """
+    found = _ORA_CODE.search(str(message))
+    if found is None:
+        return False
+    code = int(found.group(1))
+    return code in DEFINITIVE_ORA_ERRORS or 20000 <= code <= 20999
+
+
+def rollback(conn) -> None:
+    """
+    Desfaz a escrita avulsa. Dentro de uma unidade de trabalho o Oracle já
+    desfez o comando que falhou; o restante é decidido no fim da requisição.
+    """
+    if _current_uow.get() is None:
+        conn.rollback()
+
+
+# ---------------------------------------------------------------------------
+# Função pública de conexão — mantida por compatibilidade.
+# conn.close() em conexão do pool devolve a sessão ao pool.
+# ---------------------------------------------------------------------------
+def get_connection():
+    """Retorna uma conexão com o banco de dados Oracle (via pool)."""
+    return acquire()
 
 
 # ---------------------------------------------------------------------------
@@ -54,8 +361,9 @@ def get_connection():
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     try:
-        conn = get_connection()
+        conn = acquire()
         print("Conexão bem-sucedida!")
-        conn.close()
+        release(conn)
+        close_pool()
     except Exception as e:
         print(f"Falha na conexão: {e}")
@@ -0,0 +1,198 @@
+## backend/core/database_async.py
+
+import time
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import oracledb as cx_Oracle
+from core import database, metrics
+from core.database import run_callbacks
+from core.exceptions import DatabaseError
+
+# ---------------------------------------------------------------------------
+# Pool assíncrono (python-oracledb, somente modo thin)
+# Criado no primeiro uso, dentro do event loop do servidor ASGI.
+# ---------------------------------------------------------------------------
+_pool = None
+
+# LOBs assíncronos só podem ser lidos com await — a serialização JSON é
+# síncrona, então CLOB/BLOB chegam direto como str/bytes. Só nas conexões
+# deste pool: o pool síncrono continua com LOBs normais
+_LOB_AS_VALUE = {
+    cx_Oracle.DB_TYPE_CLOB: cx_Oracle.DB_TYPE_LONG,
+    cx_Oracle.DB_TYPE_NCLOB: cx_Oracle.DB_TYPE_LONG_NVARCHAR,
+    cx_Oracle.DB_TYPE_BLOB: cx_Oracle.DB_TYPE_LONG_RAW,
+}
+
+
+def _lobs_as_values(cursor, metadata):
+    kind = _LOB_AS_VALUE.get(metadata.type_code)
+    if kind is not None:
+        return cursor.var(kind, arraysize=cursor.arraysize)
+    return None
+
+
+def get_pool():
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    if database.THICK_MODE:
+        raise DatabaseError(
+            "Conexões asyncio exigem o modo thin (defina DB_THIN_MODE=1)"
+        )
+    try:
+        started = time.perf_counter()
+        _pool = cx_Oracle.create_pool_async(
+            user=database.DB_USER,
+            password=database.DB_PASS,
+            dsn=database._dsn(),
+            min=database.DB_POOL_MIN,
+            max=database.DB_POOL_MAX,
+            increment=database.DB_POOL_INCREMENT,
+            getmode=cx_Oracle.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=database.DB_POOL_TIMEOUT,
+            ping_interval=database.DB_POOL_PING_INTERVAL,
+            timeout=database.DB_POOL_IDLE_TIMEOUT,
+            stmtcachesize=database.DB_STMT_CACHE_SIZE,
+        )
+        metrics.DB_CONNECT_SECONDS.observe(time.perf_counter() - started, "async")
+        logging.info("Pool Oracle assíncrono criado.")
+    except cx_Oracle.Error as e:
+        logging.error("Erro ao criar pool Oracle assíncrono: %s", e)
+        raise DatabaseError(f"Falha ao conectar ao banco de dados: {e}")
+    return _pool
+
+
+async def acquire():
+    """Obtém uma conexão assíncrona do pool. Devolver sempre com release()."""
+    started = time.perf_counter()
+    try:
+        conn = await get_pool().acquire()
+    except cx_Oracle.Error as e:
+        metrics.DB_ACQUIRE_ERRORS.inc("async")
+        logging.error("Erro ao obter conexão assíncrona do pool: %s", e)
+        raise DatabaseError(f"Falha ao conectar ao banco de dados: {e}")
+    metrics.DB_ACQUIRE_SECONDS.observe(time.perf_counter() - started, "async")
+    metrics.DB_ACQUIRED.inc("async")
+    conn.outputtypehandler = _lobs_as_values
+    return conn
+
+
+async def release(conn) -> None:
+    if conn is None:
+        return
+    metrics.DB_RELEASED.inc("async")
+    try:
+        await get_pool().release(conn)
+    except cx_Oracle.Error as e:
+        logging.warning("Erro ao devolver conexão assíncrona ao pool: %s", e)
+
+
+metrics.register_pool("async", lambda: _pool)
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        try:
+            await _pool.close(force=True)
+        except cx_Oracle.Error as e:
+            logging.warning("Erro ao fechar pool Oracle assíncrono: %s", e)
+        _pool = None
+
+
+# ---------------------------------------------------------------------------
+# Unidade de trabalho assíncrona — mesma semântica de core.database
+# ---------------------------------------------------------------------------
+_current_uow: ContextVar["AsyncUnitOfWork | None"] = ContextVar(
+    "current_async_uow", default=None
+)
+
+
+class AsyncUnitOfWork:
+    def __init__(self):
+        self._conn = None
+        self._token = None
+        self._pending = False
+        self._on_commit = []
+
+    async def connection(self):
+        if self._conn is None:
+            self._conn = await acquire()
+        return self._conn
+
+    def mark_write(self) -> None:
+        self._pending = True
+
+    def on_commit(self, callback) -> None:
+        self._on_commit.append(callback)
+
+    async def commit(self) -> None:
+        if self._conn is not None and self._pending:
+            try:
+                await self._conn.commit()
+            except cx_Oracle.Error as e:
+                raise DatabaseError(f"Erro Oracle ao confirmar transação: {e}")
+            self._pending = False
+            run_callbacks(self._on_commit)
+        self._on_commit = []
+
+    async def rollback(self) -> None:
+        self._on_commit = []
+        if self._conn is not None and self._pending:
+            try:
+                await self._conn.rollback()
+            except cx_Oracle.Error as e:
+                logging.warning("Erro ao desfazer transação: %s", e)
+            self._pending = False
+
+    def begin(self) -> "AsyncUnitOfWork":
+        self._token = _current_uow.set(self)
+        return self
+
+    async def end(self) -> None:
+        if self._token is not None:
+            _current_uow.reset(self._token)
+            self._token = None
+        if self._conn is not None:
+            await self.rollback()
+            await release(self._conn)
+            self._conn = None
+
+
+@asynccontextmanager
+async def connection():
+    """Conexão da unidade de trabalho ativa ou, fora dela, avulsa do pool."""
+    uow = _current_uow.get()
+    if uow is not None:
+        yield await uow.connection()
+        return
+
+    conn = await acquire()
+    try:
+        yield conn
+    finally:
+        await release(conn)
+
+
+async def commit(conn) -> None:
+    uow = _current_uow.get()
+    if uow is None:
+        await conn.commit()
+    else:
+        uow.mark_write()
+
+
+def after_commit(callback) -> None:
+    """Como core.database.after_commit, para a unidade de trabalho assíncrona."""
+    uow = _current_uow.get()
+    if uow is None:
+        run_callbacks([callback])
+    else:
+        uow.on_commit(callback)
+
+
+async def rollback(conn) -> None:
+    if _current_uow.get() is None:
+        await conn.rollback()
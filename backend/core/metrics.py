@@ -0,0 +1,303 @@
+## backend/core/metrics.py
+
+"""
+Métricas do processo no formato texto do Prometheus (GET /metrics).
+
+Contadores e histogramas em memória, um lock por métrica; observar custa um
+bisect e duas somas, barato o bastante para ficar sempre ligado. Cada processo
+tem os próprios números — com gunicorn em vários workers, cada scrape mostra o
+worker que respondeu (label `pid`).
+"""
+
+import os
+import logging
+import threading
+from bisect import bisect_left
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+# Consultas acima deste tempo vão para o log (WARNING). 0 desliga.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+
+# Limites dos buckets, em segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labels
+        self._values: dict = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # contagem por bucket (+Inf no fim), soma, total
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Valor lido na hora do scrape: `collect()` → {(labels,): valor}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels, collect):
+        super().__init__(name, help_text, labels)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        try:
+            items = self.collect().items()
+        except Exception as e:
+            logging.warning("Métricas: falha ao ler %s: %s", self.name, e)
+            items = []
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items
+        ]
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---------------------------------------------------------------------------
+# Métricas da aplicação
+# ---------------------------------------------------------------------------
+PROCESS_INFO = Gauge(
+    "laser_process_info",
+    "Processo que respondeu ao scrape.",
+    ("pid",),
+    lambda: {(os.getpid(),): 1},
+)
+
+QUERY_SECONDS = Histogram(
+    "laser_query_duration_seconds",
+    "Tempo de execute + fetch por statement registrado.",
+    ("query",),
+)
+QUERY_ROWS = Counter(
+    "laser_query_rows_total", "Linhas lidas ou afetadas por statement.", ("query",)
+)
+QUERY_ERRORS = Counter("laser_query_errors_total", "Falhas por statement.", ("query",))
+SLOW_QUERIES = Counter(
+    "laser_slow_queries_total", "Consultas acima de SLOW_QUERY_MS.", ("query",)
+)
+
+GROUP_COMMIT_SIZE = Histogram(
+    "laser_group_commit_batch_size",
+    "Transições (start/pause/finish) por commit agrupado.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+HTTP_SECONDS = Histogram(
+    "laser_http_request_duration_seconds",
+    "Tempo até a resposta (cabeçalhos, no caso de streaming) por rota.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = Counter(
+    "laser_http_requests_total",
+    "Requisições por rota e status.",
+    ("method", "route", "status"),
+)
+HTTP_ERRORS = Counter(
+    "laser_http_errors_total", "Respostas 5xx por rota.", ("method", "route")
+)
+
+DB_ACQUIRE_SECONDS = Histogram(
+    "laser_db_acquire_duration_seconds",
+    "Espera por uma sessão do pool (inclui abrir sessão nova).",
+    ("pool",),
+)
+DB_ACQUIRED = Counter(
+    "laser_db_connections_acquired_total", "Sessões obtidas do pool.", ("pool",)
+)
+DB_RELEASED = Counter(
+    "laser_db_connections_released_total", "Sessões devolvidas ao pool.", ("pool",)
+)
+DB_ACQUIRE_ERRORS = Counter(
+    "laser_db_acquire_errors_total", "Falhas ao obter sessão.", ("pool",)
+)
+DB_CONNECT_SECONDS = Histogram(
+    "laser_db_pool_create_duration_seconds",
+    "Tempo de criação do pool (sessões mínimas).",
+    ("pool",),
+)
+
+
+def observe_query(name: str, seconds: float, rows: int | None, failed: bool) -> None:
+    QUERY_SECONDS.observe(seconds, name)
+    if rows:
+        QUERY_ROWS.inc(name, amount=rows)
+    if failed:
+        QUERY_ERRORS.inc(name)
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(name)
+        logging.warning(
+            "Consulta lenta: %s em %.0f ms (%s linhas%s)",
+            name,
+            seconds * 1000,
+            "?" if rows is None else rows,
+            ", falhou" if failed else "",
+        )
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_SECONDS.observe(seconds, method, route)
+    HTTP_REQUESTS.inc(method, route, str(status))
+    if status >= 500:
+        HTTP_ERRORS.inc(method, route)
+
+
+# Pools registrados por core.database / core.database_async: nome → função
+# que devolve o pool já criado ou None
+_pools: dict = {}
+
+
+def register_pool(name: str, current_pool) -> None:
+    _pools[name] = current_pool
+
+
+def _pool_sessions() -> dict:
+    values = {}
+    for name, current_pool in _pools.items():
+        pool = current_pool()
+        if pool is not None:
+            values[(name, "open")] = pool.opened
+            values[(name, "busy")] = pool.busy
+    return values
+
+
+DB_POOL_SESSIONS = Gauge(
+    "laser_db_pool_sessions",
+    "Sessões do pool por estado (open/busy).",
+    ("pool", "state"),
+    _pool_sessions,
+)
+
+
+# Diários locais de escrita (shared/journal.py): nome → função que devolve
+# {status: (quantidade, mais antiga)}
+_journals: dict = {}
+
+
+def register_journal(name: str, counts) -> None:
+    _journals[name] = counts
+
+
+def _journal_entries() -> dict:
+    values = {}
+    for name, counts in _journals.items():
+        values[(name, "pending")] = values[(name, "failed")] = 0
+        for status, (n, _) in counts().items():
+            values[(name, status)] = n
+    return values
+
+
+JOURNAL_ENTRIES = Gauge(
+    "laser_journal_entries",
+    "Escritas no diário local por estado (pending/failed).",
+    ("journal", "status"),
+    _journal_entries,
+)
+
+
+# Retratos em memória (shared/snapshot.py): nome → função que devolve a idade
+# em segundos (None antes da primeira carga)
+_snapshots: dict = {}
+
+
+def register_snapshot(name: str, age) -> None:
+    _snapshots[name] = age
+
+
+def _snapshot_ages() -> dict:
+    values = {}
+    for name, age in _snapshots.items():
+        seconds = age()
+        if seconds is not None:
+            values[(name,)] = seconds
+    return values
+
+
+SNAPSHOT_AGE = Gauge(
+    "laser_snapshot_age_seconds",
+    "Idade do retrato em memória (tempo desde o início da última carga).",
+    ("snapshot",),
+    _snapshot_ages,
+)
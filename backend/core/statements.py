@@ -0,0 +1,183 @@
+## backend/core/statements.py
+
+"""
+Registro central dos statements SQL nomeados.
+
+Cada entrada declara quantas linhas a consulta costuma trazer, o ajuste de
+fetch (arraysize/prefetchrows) e o tipo de cada bind. `bind()` aplica isso ao
+cursor antes do execute — vale para cursores síncronos e assíncronos:
+
+    cursor.execute(stmt.sql, bind(cursor, stmt, {"of_id": of_id}))
+
+Texto fixo + tipos fixos = o mesmo cursor no statement cache da sessão
+(DB_STMT_CACHE_SIZE) e no shared pool, sem reparse nem child cursors novos
+quando um bind chega ora como int, ora como str.
+"""
+
+import time
+import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from core import metrics
+from core.exceptions import ValidationError
+
+# Cardinalidade esperada
+NONE = "none"  # DML sem linhas de retorno
+ONE = "one"  # no máximo uma linha (fetchone)
+MANY = "many"  # lista lida inteira com fetchall
+STREAM = "stream"  # lista lida aos poucos, iterando o cursor
+
+# Linhas por round-trip quando a entrada não define arraysize
+DEFAULT_ARRAYSIZE = {ONE: 1, MANY: 100, STREAM: 500}
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    rows: str = MANY
+    # nome do bind → tipo Python (str, int, datetime.datetime)
+    binds: dict = field(default_factory=dict)
+    # nome do bind → tipo da variável de saída (RETURNING ... INTO)
+    returning: dict = field(default_factory=dict)
+    arraysize: int | None = None
+    prefetchrows: int | None = None
+    # False para SQL montado sob demanda (listas IN): não ocupa o cache
+    cached: bool = True
+
+    def fetch_sizes(self, rows: int | None = None) -> tuple[int, int] | None:
+        """
+        (arraysize, prefetchrows). `rows` é o total conhecido na chamada
+        (ex.: página + 1) e tem precedência sobre o declarado.
+        """
+        if self.rows == NONE:
+            return None
+        arraysize = rows or self.arraysize or DEFAULT_ARRAYSIZE[self.rows]
+        if self.prefetchrows is not None:
+            return arraysize, self.prefetchrows
+        if self.rows == ONE:
+            # Linha + fim dos dados chegam já na resposta do execute
+            return arraysize, 2
+        # Primeiro lote junto com o execute: um round-trip a menos
+        return arraysize, arraysize + 1
+
+
+REGISTRY: dict[str, Statement] = {}
+
+
+def statement(name: str, sql: str, rows: str = MANY, **options) -> Statement:
+    """Cria e registra um statement. Nomes são únicos."""
+    if name in REGISTRY:
+        raise ValueError(f"Statement já registrado: {name}")
+    stmt = Statement(name, sql, rows, **options)
+    REGISTRY[name] = stmt
+    return stmt
+
+
+def _coerce(stmt: Statement, name: str, value):
+    kind = stmt.binds.get(name)
+    if kind is None or value is None or isinstance(value, kind):
+        return value
+    if kind is datetime.datetime:
+        # Não há conversão segura a partir de texto aqui
+        raise ValidationError(f"Valor inválido para {name}")
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Valor inválido para {name}: {value!r}")
+
+
+def _coerce_all(stmt: Statement, params: dict) -> dict:
+    return {name: _coerce(stmt, name, value) for name, value in params.items()}
+
+
+def coerce(stmt: Statement, params: dict) -> dict:
+    """
+    Valores convertidos aos tipos declarados, sem tocar em cursor. Para
+    escritas que saem da requisição antes de ir ao banco (diário local,
+    agrupador): o valor inválido vira 400 na hora, não falha depois.
+    """
+    return _coerce_all(stmt, params)
+
+
+def bind(
+    cursor, stmt: Statement, params: dict | None = None, rows=None, sql=None
+) -> dict:
+    """
+    Ajusta o cursor para `stmt` e devolve os binds prontos para o execute,
+    com os valores convertidos aos tipos declarados e as variáveis de saída
+    de `returning` criadas (lidas depois em params[nome]).
+
+    `sql` é o texto efetivo quando a entrada é um modelo (colunas ou listas
+    IN variáveis); o execute deve receber esse mesmo objeto.
+    """
+    sizes = stmt.fetch_sizes(rows)
+    if sizes is not None:
+        cursor.arraysize, cursor.prefetchrows = sizes
+    if not stmt.cached:
+        # Preparado fora do cache; o execute com o mesmo texto o reaproveita
+        cursor.prepare(sql or stmt.sql, cache_statement=False)
+
+    params = _coerce_all(stmt, params or {})
+    inputs = {n: t for n, t in stmt.binds.items() if n in params}
+    if inputs:
+        cursor.setinputsizes(**inputs)
+    for name, kind in stmt.returning.items():
+        params[name] = cursor.var(kind)
+    return params
+
+
+def bind_many(
+    cursor, stmt: Statement, rows: list[dict], out: dict | None = None
+) -> list[dict]:
+    """
+    Como bind(), para executemany: tipos fixados antes da primeira linha.
+    Com `out`, as variáveis de `returning` são criadas nele, com uma posição
+    por linha (lidas com var.getvalue(i)).
+    """
+    sizes = dict(stmt.binds)
+    if out is not None:
+        for name, kind in stmt.returning.items():
+            out[name] = sizes[name] = cursor.var(kind, arraysize=max(1, len(rows)))
+    if sizes:
+        cursor.setinputsizes(**sizes)
+    return [_coerce_all(stmt, row) for row in rows]
+
+
+@contextmanager
+def timed(stmt: Statement, cursor, streaming: bool = False):
+    """
+    Mede o bloco (execute + fetch) para /metrics e para o log de consultas
+    lentas. Linhas vêm de cursor.rowcount: lidas (SELECT) ou afetadas (DML).
+    Com `streaming` o bloco cobre só o execute — o resto do tempo é do
+    cliente — e as linhas não são contadas.
+    """
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        rows = None if streaming else _rowcount(cursor)
+        metrics.observe_query(stmt.name, time.perf_counter() - started, rows, failed)
+
+
+def _rowcount(cursor) -> int | None:
+    try:
+        return cursor.rowcount
+    except Exception:
+        # Cursor já fechado ou inválido após erro
+        return None
+
+
+def stats() -> dict:
+    return {
+        "registered": len(REGISTRY),
+        "statements": {
+            name: {"rows": s.rows, "sizes": s.fetch_sizes()}
+            for name, s in REGISTRY.items()
+        },
+    }
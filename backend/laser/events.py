@@ -0,0 +1,357 @@
+## backend/laser/events.py
+
+"""
+Canal de alterações (Server-Sent Events) por operador e por OF.
+
+Os terminais assinam /api/laser/events e recebem um evento quando um
+apontamento muda, em vez de reconsultar o Oracle periodicamente. Duas fontes:
+
+* escritas feitas por este processo (start/pause/finish/confirm_batch),
+  publicadas logo após o commit;
+* um observador por processo que consulta S_APONTAMENTO_OF a cada
+  EVENTS_POLL_INTERVAL segundos — pega o que foi gravado por outros
+  sistemas. Só roda enquanto houver assinantes.
+
+Com EVENTS_SHARED, as escritas de cada worker vão também para um SQLite
+dividido, e o observador dos demais as publica em até EVENTS_SHARED_POLL
+segundos. Isso cobre o que a consulta não vê: pause/finish reaplicados do
+diário local gravam em SOF_DTAFIM a hora do gesto, já no passado.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from functools import partial
+
+from laser import repository
+from shared.fast_json import dumps
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "5"))  # segundos
+EVENTS_KEEPALIVE = float(os.getenv("EVENTS_KEEPALIVE", "15"))  # segundos
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+# No WSGI cada terminal prende uma thread do servidor até desconectar: acima
+# deste limite /events responde 503 e o front cai para a consulta periódica.
+# Padrão: um quarto das threads (SERVER_THREADS), o resto fica para a API
+EVENTS_WSGI_MAX_SUBSCRIBERS = int(
+    os.getenv(
+        "EVENTS_WSGI_MAX_SUBSCRIBERS",
+        str(max(1, int(os.getenv("SERVER_THREADS", "8")) // 4)),
+    )
+)
+# Arquivo SQLite com os eventos de todos os workers (serve.py define um
+# padrão para o gunicorn); vazio = cada processo só vê as próprias escritas
+EVENTS_SHARED = os.getenv("EVENTS_SHARED", "")
+EVENTS_SHARED_POLL = float(os.getenv("EVENTS_SHARED_POLL", "0.5"))  # segundos
+# Reconexão sugerida ao EventSource do navegador
+EVENTS_RETRY_MS = 5000
+# Retry-After do 503 por excesso de assinantes (segundos)
+EVENTS_BUSY_RETRY = 60
+
+
+def change_event(kind: str, operator_code=None, of_id=None, apontamento_id=None):
+    return {
+        "type": kind,
+        "operator_code": None if operator_code is None else str(operator_code),
+        "of_id": None if of_id is None else str(of_id),
+        "apontamento_id": apontamento_id,
+    }
+
+
+class Subscription:
+    """Fila de eventos de um terminal. `loop` definido = assinante asyncio."""
+
+    def __init__(self, topics: set, loop=None):
+        self.topics = topics
+        self._loop = loop
+        self._overflow = False
+        if loop is None:
+            self._queue = queue.Queue(EVENTS_QUEUE_SIZE)
+        else:
+            self._queue = asyncio.Queue(EVENTS_QUEUE_SIZE)
+
+    def put(self, event: dict) -> None:
+        """Chamado pelo hub, de qualquer thread."""
+        if self._loop is None:
+            self._put(event)
+        else:
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except (queue.Full, asyncio.QueueFull):
+            # Terminal lento: descarta e pede uma recarga completa
+            self._overflow = True
+
+    def _pending_resync(self) -> dict | None:
+        if self._overflow:
+            self._overflow = False
+            return change_event("resync")
+        return None
+
+    def get(self, timeout: float) -> dict | None:
+        resync = self._pending_resync()
+        if resync:
+            return resync
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def get_async(self, timeout: float) -> dict | None:
+        resync = self._pending_resync()
+        if resync:
+            return resync
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SharedLog:
+    """Eventos publicados por cada processo, em um SQLite lido pelos demais."""
+
+    KEEP = 60.0  # segundos
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._pruned = time.time()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+                at      REAL    NOT NULL,
+                pid     INTEGER NOT NULL,
+                payload TEXT    NOT NULL
+            );
+            """)
+
+    def _db(self) -> sqlite3.Connection:
+        # Uma conexão por thread; após o fork o worker abre as suas
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def append(self, event: dict) -> None:
+        now = time.time()
+        conn = self._db()
+        conn.execute(
+            "INSERT INTO events (at, pid, payload) VALUES (?, ?, ?)",
+            (now, os.getpid(), dumps(event)),
+        )
+        if now - self._pruned > self.KEEP:
+            self._pruned = now
+            conn.execute("DELETE FROM events WHERE at < ?", (now - self.KEEP,))
+
+    def last(self) -> int:
+        return (
+            self._db().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        )
+
+    def read(self, after: int) -> tuple[int, list[dict]]:
+        """(último seq, eventos de outros processos depois de `after`)."""
+        rows = self._db().execute(
+            "SELECT seq, pid, payload FROM events WHERE seq > ? ORDER BY seq",
+            (after,),
+        )
+        last, found = after, []
+        for seq, pid, payload in rows:
+            last = seq
+            if pid != os.getpid():
+                found.append(json.loads(payload))
+        return last, found
+
+
+class ChangeHub:
+    def __init__(self, interval: float, shared: str | None = None):
+        self.interval = interval
+        self.log = SharedLog(shared) if shared else None
+        self._log_seq = None
+        self._subs: set = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._since = None
+        self._seen: dict = {}  # id → (assinatura, instante)
+        self._published = 0
+        self._threaded = 0  # assinantes WSGI (loop None)
+        self._refused = 0
+
+    # -----------------------------------------------------------------------
+    # Assinaturas
+    # -----------------------------------------------------------------------
+    def subscribe(
+        self, operator_code=None, of_id=None, loop=None, limit=None
+    ) -> Subscription | None:
+        """
+        Nova assinatura. Com `limit`, devolve None se já houver esse número
+        de assinantes WSGI (cada um ocupa uma thread do servidor).
+        """
+        topics = set()
+        if operator_code is not None:
+            topics.add(("operator", str(operator_code)))
+        if of_id is not None:
+            topics.add(("of", str(of_id)))
+        sub = Subscription(topics, loop)
+        with self._lock:
+            if loop is None:
+                if limit is not None and self._threaded >= limit:
+                    self._refused += 1
+                    return None
+                self._threaded += 1
+            self._subs.add(sub)
+            self._ensure_watcher()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs and sub._loop is None:
+                self._threaded -= 1
+            self._subs.discard(sub)
+
+    def publish(self, event: dict, local: bool = True) -> None:
+        topics = {("operator", event["operator_code"]), ("of", event["of_id"])}
+        with self._lock:
+            targets = [s for s in self._subs if s.topics & topics]
+            self._published += 1
+            if local and event["apontamento_id"] is not None:
+                # O observador não repete o que já foi publicado localmente
+                self._seen[event["apontamento_id"]] = (None, time.monotonic())
+        for sub in targets:
+            sub.put(event)
+        if local and self.log is not None:
+            try:
+                self.log.append(event)
+            except sqlite3.Error as e:
+                # Roda em callback pós-commit: a escrita já foi feita
+                logging.error("Eventos: falha ao gravar em %s: %s", self.log.path, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subs),
+                "wsgi_subscribers": self._threaded,
+                "wsgi_limit": EVENTS_WSGI_MAX_SUBSCRIBERS,
+                "refused": self._refused,
+                "published": self._published,
+                "watching": self._thread is not None,
+            }
+
+    # -----------------------------------------------------------------------
+    # Observador central
+    # -----------------------------------------------------------------------
+    def _ensure_watcher(self) -> None:
+        # Sob self._lock. Iniciado no primeiro assinante — já no worker, após
+        # o fork do gunicorn
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="laser-events", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        next_poll = 0.0
+        while True:
+            with self._lock:
+                if not self._subs:
+                    # Sem assinantes: para de consultar e recomeça do zero depois
+                    self._thread = None
+                    self._since = None
+                    self._log_seq = None
+                    return
+            if self.log is not None:
+                try:
+                    self.read_log()
+                except Exception as e:
+                    logging.error("Eventos: falha ao ler %s: %s", self.log.path, e)
+            if time.monotonic() >= next_poll:
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.error("Eventos: falha ao consultar alterações: %s", e)
+                next_poll = time.monotonic() + self.interval
+            time.sleep(EVENTS_SHARED_POLL if self.log is not None else self.interval)
+
+    def read_log(self) -> None:
+        """Publica aqui os eventos que os outros workers gravaram no arquivo."""
+        if self._log_seq is None:
+            # Começa do fim: o histórico já passou
+            self._log_seq = self.log.last()
+            return
+        self._log_seq, found = self.log.read(self._log_seq)
+        for event in found:
+            with self._lock:
+                if event["apontamento_id"] is not None:
+                    self._seen[event["apontamento_id"]] = (None, time.monotonic())
+            self.publish(event, local=False)
+
+    def poll(self) -> None:
+        """Uma passada: publica os apontamentos alterados desde a anterior."""
+        now, rows = repository.fetch_apontamento_changes(self._since)
+        cutoff = time.monotonic() - 3 * self.interval
+        for ap_id, of_id, operator, dtafim, qntboa in rows:
+            signature = (dtafim, qntboa)
+            previous = self._seen.get(ap_id)
+            if previous is not None and previous[0] in (None, signature):
+                # Já publicado (localmente ou na passada anterior); a janela
+                # sobreposta de 1 s traz a mesma linha de novo
+                if previous[0] is None:
+                    self._seen[ap_id] = (signature, previous[1])
+                continue
+            self._seen[ap_id] = (signature, time.monotonic())
+            self.publish(change_event("change", operator, of_id, ap_id), local=False)
+        with self._lock:
+            self._seen = {k: v for k, v in self._seen.items() if v[1] >= cutoff}
+        # SOF_DATCAD/SOF_DTAFIM têm resolução de segundo: recua 1 s
+        self._since = now - timedelta(seconds=1)
+
+
+hub = ChangeHub(EVENTS_POLL_INTERVAL, EVENTS_SHARED)
+
+
+def publisher(kind: str, operator_code=None, of_id=None, apontamento_id=None):
+    """Callable que publica o evento — para passar a after_commit()."""
+    return partial(
+        hub.publish, change_event(kind, operator_code, of_id, apontamento_id)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Formato SSE
+# ---------------------------------------------------------------------------
+def _frame(event: dict) -> str:
+    return f"data: {dumps(event)}\n\n"
+
+
+def sse_stream(sub: Subscription):
+    """Gerador do corpo text/event-stream (WSGI, uma thread por terminal)."""
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        while True:
+            event = sub.get(EVENTS_KEEPALIVE)
+            # Comentário SSE mantém proxies e o Wi-Fi da fábrica sem fechar
+            yield _frame(event) if event else ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(sub)
+
+
+async def sse_stream_async(sub: Subscription):
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        while True:
+            event = await sub.get_async(EVENTS_KEEPALIVE)
+            yield _frame(event) if event else ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,143 @@
+## backend/laser/report_parser.py
+
+"""
+Leitura dos relatórios de corte (PDF) gerados pela máquina laser.
+
+Substitui o parsing feito no navegador (laser.html): as páginas são lidas
+uma a uma e descartadas, e a leitura para assim que todos os campos
+(StartTime, TotalTime, peça e quantidade) forem encontrados.
+"""
+
+import os
+import re
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+
+REPORT_PARSER_WORKERS = int(os.getenv("REPORT_PARSER_WORKERS", "0")) or min(
+    4, os.cpu_count() or 1
+)
+
+_START_TIME_RE = re.compile(r"StartTime(\d{4}-\d{2}-\d{2})(\d{2}:\d{2}:\d{2})", re.I)
+_TOTAL_TIME_RE = re.compile(r"TotalTime(\d{2}:\d{2}:\d{2}\.\d{3})", re.I)
+_PART_NAME_RE = re.compile(r"\b(P\d{6}_\d+)\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ReportParseError(Exception):
+    pass
+
+
+def iter_page_texts(source):
+    """
+    Gera o texto de cada página sem manter o documento inteiro em memória.
+    `source` pode ser caminho ou arquivo binário.
+    """
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages:
+            try:
+                yield page.extract_text() or ""
+            finally:
+                page.close()
+
+
+def parse_report_pages(pages) -> dict:
+    """Extrai os campos do relatório a partir de um iterável de textos de página."""
+    start_time = total_time = part_name = part_count = None
+    pending = []  # páginas lidas antes de a peça ser identificada
+
+    for text in pages:
+        compact = _WHITESPACE_RE.sub("", text)
+
+        if start_time is None:
+            m = _START_TIME_RE.search(compact)
+            if m:
+                start_time = f"{m.group(1)} {m.group(2)}"
+
+        if total_time is None:
+            m = _TOTAL_TIME_RE.search(compact)
+            if m:
+                total_time = m.group(1)
+
+        if part_name is None:
+            pending.append(text)
+            m = _PART_NAME_RE.search(text) or _PART_NAME_RE.search(compact)
+            if m:
+                part_name = m.group(1)
+                count_re = re.compile(re.escape(part_name) + r"[^\n]*?(\d+)\s*$", re.M)
+                for previous in pending:
+                    m = count_re.search(previous)
+                    if m:
+                        part_count = int(m.group(1))
+                        break
+                pending = []
+        elif part_count is None:
+            m = count_re.search(text)
+            if m:
+                part_count = int(m.group(1))
+
+        if start_time and total_time and part_name and part_count is not None:
+            break
+
+    missing = [
+        name
+        for name, value in (
+            ("StartTime", start_time),
+            ("TotalTime", total_time),
+            ("Part Name", part_name),
+            ("Part Count", part_count),
+        )
+        if value is None
+    ]
+    if missing:
+        raise ReportParseError(f"Campos não encontrados: {', '.join(missing)}")
+
+    return {
+        "start_time": start_time,
+        "total_time": total_time,
+        "part_name": part_name,
+        "qtd_apontar": part_count,
+    }
+
+
+def parse_report(source) -> dict:
+    return parse_report_pages(iter_page_texts(source))
+
+
+def _parse_file(name: str, path: str) -> dict:
+    """Executado nos processos do pool — recebe só o caminho do arquivo."""
+    try:
+        return {"file": name, "success": True, **parse_report(path)}
+    except Exception as e:
+        return {"file": name, "success": False, "error": str(e)}
+
+
+# ---------------------------------------------------------------------------
+# Pool de processos — criado sob demanda e compartilhado
+# ---------------------------------------------------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=REPORT_PARSER_WORKERS)
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def parse_reports(files: list[tuple[str, str]]) -> list[dict]:
+    """
+    Processa vários relatórios [(nome, caminho)] em paralelo.
+    Retorna um resultado por arquivo, na mesma ordem.
+    """
+    if len(files) == 1 or REPORT_PARSER_WORKERS <= 1:
+        return [_parse_file(name, path) for name, path in files]
+
+    executor = _get_executor()
+    futures = [executor.submit(_parse_file, name, path) for name, path in files]
+    return [f.result() for f in futures]
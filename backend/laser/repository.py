@@ -1,31 +1,44 @@
 ## backend/modules/laser/repository.py
 
+import os
 from datetime import datetime
+from functools import lru_cache
 import oracledb as cx_Oracle
-from core.database import get_connection
-from core.exceptions import DatabaseError, ConflictError
+from core.database import connection, commit, rollback, acquire, release
+from core.exceptions import DatabaseError, ConflictError, ValidationError
+from core.statements import (
+    NONE,
+    ONE,
+    MANY,
+    STREAM,
+    statement,
+    bind,
+    bind_many,
+    coerce,
+    timed,
+)
 
+# Colunas do sequenciamento: nome na resposta → expressão no SELECT.
+# É também a lista de campos aceitos em ?fields= (ordem canônica).
+SEQUENCING_COLUMNS = {
+    "SOC_CODIOF": "v.CODIOF",
+    "SOC_EMPRESA": "v.EMPRESA",
+    "SOC_CODSEQ": "v.CODSEQ",
+    "SOC_COLABID": "i.SOC_COLABID",
+    "SOC_SEQUEN": "i.SOC_SEQUEN",
+    "JLB_CODERP": "c.JLB_CODERP",
+    "JLB_NOMECB": "c.JLB_NOMECB",
+    "JRO_PROERP": "p.JRO_PROERP",
+    "JRO_DESCRI": "p.JRO_DESCRI",
+    "JRO_UNIMED": "p.JRO_UNIMED",
+    "QUANTIDADE_PROGRAMADA": "o.JOF_QTPROG",
+    "QUANTIDADE_REALIZADA": "SUM(l.JFL_QTREAL)",
+    "JPC_DESENHO_ENG": "pc.JPC_DESENHO_ENG",
+}
 
-SEQUENCING_QUERY = """
+_SEQUENCING_QUERY = """
     SELECT
-        v.CODIOF   AS SOC_CODIOF,
-        v.EMPRESA  AS SOC_EMPRESA,
-        v.CODSEQ   AS SOC_CODSEQ,
-
-        i.SOC_COLABID,
-        i.SOC_SEQUEN,
-
-        c.JLB_CODERP,
-        c.JLB_NOMECB,
-
-        p.JRO_PROERP,
-        p.JRO_DESCRI,
-        p.JRO_UNIMED,
-
-        o.JOF_QTPROG AS QUANTIDADE_PROGRAMADA,
-        SUM(l.JFL_QTREAL) AS QUANTIDADE_REALIZADA,
-
-        pc.JPC_DESENHO_ENG
+        {columns}
 
     FROM ALJ_V_OF_COM_SALDO v
 
@@ -56,7 +69,7 @@ SEQUENCING_QUERY = """
        AND l.JFL_EMPRESA = v.EMPRESA
        AND l.JFL_DATA_EXCLUSAO IS NULL
 
-    WHERE c.JLB_CODERP = :operator_code
+    {where}
 
     GROUP BY
         v.CODIOF, v.EMPRESA, v.CODSEQ,
@@ -69,47 +82,508 @@ SEQUENCING_QUERY = """
 """
 
 
-def fetch_sequencing(operator_code: str) -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(SEQUENCING_QUERY, operator_code=operator_code)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    except cx_Oracle.Error as e:
-        raise DatabaseError(f"Erro Oracle ao buscar sequenciamento: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+@lru_cache(maxsize=64)
+def sequencing_query(fields: tuple | None = None) -> tuple[str, list[str]]:
+    """
+    SQL do sequenciamento só com as colunas pedidas (None = todas) e os nomes
+    das colunas na ordem do SELECT. O texto é sempre o mesmo para o mesmo
+    conjunto de campos, então o statement cache do Oracle continua valendo.
+    """
+    names = [n for n in SEQUENCING_COLUMNS if fields is None or n in fields]
+    select = ",\n        ".join(f"{SEQUENCING_COLUMNS[n]} AS {n}" for n in names)
+    sql = _SEQUENCING_QUERY.format(
+        columns=select, where="WHERE c.JLB_CODERP = :operator_code"
+    )
+    return sql, names
 
 
-def fetch_open_apontamento(operator_code: str, empresa_id: str) -> dict | None:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT SOF_APONTAOFID, SOF_CODIOF, SOF_DTINIC, SOF_OPERAC
-            FROM S_APONTAMENTO_OF
-            WHERE SOF_OPERAD = :operator
-              AND SOF_EMPRESA = :empresa
-              AND SOF_DTAFIM IS NULL
-              AND SOF_DATA_EXCLUSAO IS NULL
-            """,
-            {"operator": operator_code, "empresa": empresa_id},
-        )
-        row = cursor.fetchone()
-        if row:
-            return {
-                "apontamento_id": row[0],
-                "of_id": row[1],
-                "inicio": row[2],
-                "operacao": row[3],
-            }
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+SEQUENCING_QUERY = sequencing_query()[0]
+
+# Todos os operadores de uma vez, com todas as colunas (retrato em memória
+# do serviço). Mesma ordem por operador que a consulta filtrada.
+SEQUENCING_SNAPSHOT_QUERY = _SEQUENCING_QUERY.format(
+    columns=",\n        ".join(f"{e} AS {n}" for n, e in SEQUENCING_COLUMNS.items()),
+    where="",
+)
+
+INSERT_APONTAMENTO_SQL = """
+    INSERT INTO S_APONTAMENTO_OF
+        (SOF_CODIOF, SOF_OPERAD, SOF_DTINIC, SOF_DTAFIM,
+         SOF_OPERAC, SOF_QNTBOA, SOF_EMPRESA, SOF_DATCAD)
+    VALUES
+        (:of_numero, :operador_codigo, :dt_inicio, :dt_afim,
+         :soc_codseq, :quantidade_realizada, :soc_empresa, SYSDATE)
+"""
+
+# Mesma inserção, ignorada se o apontamento já existe (mesma OF, operação,
+# operador e início): a reaplicação do diário pode repetir uma entrada
+# confirmada no Oracle mas ainda não apagada do arquivo local.
+INSERT_APONTAMENTO_ONCE_SQL = """
+    INSERT INTO S_APONTAMENTO_OF
+        (SOF_CODIOF, SOF_OPERAD, SOF_DTINIC, SOF_DTAFIM,
+         SOF_OPERAC, SOF_QNTBOA, SOF_EMPRESA, SOF_DATCAD)
+    SELECT :of_numero, :operador_codigo, :dt_inicio, :dt_afim,
+           :soc_codseq, :quantidade_realizada, :soc_empresa, SYSDATE
+      FROM DUAL
+     WHERE NOT EXISTS (
+        SELECT 1 FROM S_APONTAMENTO_OF
+         WHERE SOF_CODIOF  = :of_numero
+           AND SOF_OPERAD  = :operador_codigo
+           AND SOF_OPERAC  = :soc_codseq
+           AND SOF_EMPRESA = :soc_empresa
+           AND SOF_DTINIC  = :dt_inicio
+     )
+"""
+
+# Início em um round-trip: trava o operador para dois starts simultâneos
+# não abrirem dois apontamentos, procura o aberto e reaproveita (mesma OF),
+# recusa (outra OF) ou insere. A trava é do DBMS_LOCK, com id derivado de
+# empresa + operador: existe para qualquer código, sem depender de linha em
+# J_COLAB (nem de SOF_OPERAD = JLB_CODERP), e sai no commit/rollback.
+# Requer EXECUTE em DBMS_LOCK. Colisão de hash só serializa dois operadores.
+# :outcome = 'new' | 'reused' | 'conflict' | 'busy' (trava não obtida em
+# 10 s); :ap_id = id novo ou o aberto; :open_of = OF do aberto. :ignore_id
+# trata um apontamento como já fechado (pausa/finalização ainda no diário).
+START_APONTAMENTO_SQL = """
+    DECLARE
+        lock_status INTEGER;
+    BEGIN
+        lock_status := DBMS_LOCK.REQUEST(
+            id => ORA_HASH('LASER_START:' || :empresa || ':' || :operator,
+                           1073741823),
+            lockmode => DBMS_LOCK.X_MODE,
+            timeout => 10,
+            release_on_commit => TRUE
+        );
+        -- 4: a transação já detém a trava (mesmo operador no lote agrupado)
+        IF lock_status = 1 THEN
+            :outcome := 'busy';
+            RETURN;
+        ELSIF lock_status NOT IN (0, 4) THEN
+            RAISE_APPLICATION_ERROR(
+                -20001, 'DBMS_LOCK.REQUEST retornou ' || lock_status
+            );
+        END IF;
+
+        SELECT MAX(SOF_APONTAOFID) KEEP (DENSE_RANK LAST ORDER BY SOF_DTINIC),
+               MAX(SOF_CODIOF) KEEP (DENSE_RANK LAST ORDER BY SOF_DTINIC)
+        INTO :ap_id, :open_of
+        FROM S_APONTAMENTO_OF
+        WHERE SOF_OPERAD = :operator
+          AND SOF_EMPRESA = :empresa
+          AND SOF_DTAFIM IS NULL
+          AND SOF_DATA_EXCLUSAO IS NULL
+          AND (:ignore_id IS NULL OR SOF_APONTAOFID <> :ignore_id);
+
+        IF :ap_id IS NULL THEN
+            INSERT INTO S_APONTAMENTO_OF
+                (SOF_CODIOF, SOF_OPERAD, SOF_DTINIC, SOF_STATUS,
+                 SOF_EMPRESA, SOF_OPERAC, SOF_CODTUR, SOF_DATCAD)
+            VALUES
+                (:of_id, :operator, SYSDATE, 'A',
+                 :empresa, :operac, 1, SYSDATE)
+            RETURNING SOF_APONTAOFID INTO :ap_id;
+            :outcome := 'new';
+        ELSIF :open_of = :of_id THEN
+            :outcome := 'reused';
+        ELSE
+            :outcome := 'conflict';
+        END IF;
+    END;
+"""
+
+# Transições validam o estado no próprio UPDATE: sem linha no RETURNING, o
+# apontamento não existe ou não está aberto (pausado/encerrado).
+# :dt_afim vem preenchido quando a escrita é reaplicada do diário local
+PAUSE_APONTAMENTO_SQL = """
+    UPDATE S_APONTAMENTO_OF
+    SET SOF_DTAFIM = NVL(:dt_afim, SYSDATE)
+    WHERE SOF_APONTAOFID = :id
+      AND SOF_STATUS = 'A'
+      AND SOF_DTAFIM IS NULL
+    RETURNING SOF_OPERAD, SOF_CODIOF INTO :operator, :of_id
+"""
+
+FINISH_APONTAMENTO_SQL = """
+    UPDATE S_APONTAMENTO_OF
+    SET SOF_DTAFIM = NVL(:dt_afim, SYSDATE),
+        SOF_QNTBOA = :qtd,
+        SOF_STATUS = 'C'
+    WHERE SOF_APONTAOFID = :id
+      AND SOF_STATUS = 'A'
+    RETURNING SOF_OPERAD, SOF_CODIOF INTO :operator, :of_id
+"""
+
+APONTAMENTOS_BY_OF_QUERY = """
+    SELECT
+        SOF_APONTAOFID,
+        SOF_CODIOF,
+        SOF_OPERAD,
+        SOF_DTINIC,
+        SOF_DTAFIM,
+        SOF_QNTBOA,
+        SOF_ERROINTEGRA
+    FROM S_APONTAMENTO_OF
+    WHERE SOF_CODIOF = :of_id
+      AND SOF_DATA_EXCLUSAO IS NULL
+    ORDER BY SOF_DTINIC DESC, SOF_APONTAOFID DESC
+"""
+
+# Paginação por chave (keyset): a página seguinte começa depois do último
+# (SOF_DTINIC, SOF_APONTAOFID) visto — sem OFFSET, custo constante por página.
+_APONTAMENTOS_BY_OF_PAGE = """
+    SELECT
+        SOF_APONTAOFID,
+        SOF_CODIOF,
+        SOF_OPERAD,
+        SOF_DTINIC,
+        SOF_DTAFIM,
+        SOF_QNTBOA,
+        SOF_ERROINTEGRA
+    FROM S_APONTAMENTO_OF
+    WHERE SOF_CODIOF = :of_id
+      AND SOF_DATA_EXCLUSAO IS NULL
+      {keyset}
+    ORDER BY SOF_DTINIC DESC, SOF_APONTAOFID DESC
+    FETCH FIRST :page_rows ROWS ONLY
+"""
+APONTAMENTOS_BY_OF_PAGE_QUERY = _APONTAMENTOS_BY_OF_PAGE.format(keyset="")
+APONTAMENTOS_BY_OF_AFTER_QUERY = _APONTAMENTOS_BY_OF_PAGE.format(
+    keyset="""AND (SOF_DTINIC < :after_dt
+           OR (SOF_DTINIC = :after_dt AND SOF_APONTAOFID < :after_id))"""
+)
+
+# Rota legada /api/laser/jobs. DATA_LANCAMENTO não é única: a ordem e o
+# cursor levam também uma coluna única da view (o id do apontamento), e a
+# página seguinte começa depois do último (DATA_LANCAMENTO, id) visto.
+JOBS_KEY_COLUMN = os.getenv("JOBS_KEY_COLUMN", "SOF_APONTAOFID").lower()
+_JOBS_BY_OPERATOR = """
+    SELECT {columns}
+    FROM VW_APONTAMENTO_LASER
+    WHERE OPERADOR = :operator
+      {keyset}
+    ORDER BY DATA_LANCAMENTO DESC, {key} DESC
+    {page}
+"""
+JOBS_COLUMNS_QUERY = "SELECT * FROM VW_APONTAMENTO_LASER WHERE 1 = 0"
+
+
+@lru_cache(maxsize=64)
+def jobs_query(fields: tuple | None, paged: bool, after: bool) -> str:
+    """
+    SQL de VW_APONTAMENTO_LASER. `fields` já validados contra as colunas da
+    view (jobs_columns); DATA_LANCAMENTO e JOBS_KEY_COLUMN vão sempre, são a
+    chave do cursor.
+    """
+    key = JOBS_KEY_COLUMN.upper()
+    columns = "*"
+    if fields is not None:
+        names = dict.fromkeys(("data_lancamento", JOBS_KEY_COLUMN, *fields))
+        columns = ", ".join(n.upper() for n in names)
+    keyset = f"""AND (DATA_LANCAMENTO < :after_dt
+           OR (DATA_LANCAMENTO = :after_dt AND {key} < :after_id))"""
+    return _JOBS_BY_OPERATOR.format(
+        columns=columns,
+        key=key,
+        keyset=keyset if after else "",
+        page="FETCH FIRST :page_rows ROWS ONLY" if paged else "",
+    )
+
+
+JOBS_BY_OPERATOR_QUERY = jobs_query(None, False, False)
+
+# Observador de mudanças (laser/events.py): apontamentos criados ou
+# encerrados desde a última consulta, e o relógio do banco para a próxima.
+# Um ramo por coluna, cada um em faixa do próprio índice (README, seção de
+# eventos: S_APONTAMENTO_OF_DATCAD_IX e S_APONTAMENTO_OF_DTAFIM_IX) — com OR
+# o Oracle pode varrer a tabela inteira a cada EVENTS_POLL_INTERVAL
+APONTAMENTO_CHANGES_QUERY = """
+    SELECT SOF_APONTAOFID, SOF_CODIOF, SOF_OPERAD, SOF_DTAFIM, SOF_QNTBOA
+    FROM S_APONTAMENTO_OF
+    WHERE SOF_DATCAD >= :since
+    UNION
+    SELECT SOF_APONTAOFID, SOF_CODIOF, SOF_OPERAD, SOF_DTAFIM, SOF_QNTBOA
+    FROM S_APONTAMENTO_OF
+    WHERE SOF_DTAFIM >= :since
+"""
+DB_CLOCK_QUERY = "SELECT SYSDATE FROM DUAL"
+
+OF_DETAILS_QUERY = """
+    SELECT
+        JRF_CODMAQ,
+        JRF_CODSEQ,
+        JRF_CODCNP,
+        JRF_TMPMAQ,
+        JRF_PROHOR
+    FROM J_ROTOF
+    WHERE JRF_CODIOF = :of_id
+      AND JRF_CODSEQ = :codseq
+"""
+
+OF_MATERIALS_QUERY = """
+    SELECT
+        c.JFC_CODPRO,
+        p.JRO_DESCRI,
+        c.JFC_LOCEST
+    FROM J_OFCONS c
+    LEFT JOIN J_PRODUTO p
+        ON p.JRO_PROERP = c.JFC_CODPRO
+    WHERE c.JFC_CODIOF = :of_id
+"""
+
+# Modelos das consultas em lote: a lista IN muda a cada chamada
+OF_DETAILS_BATCH_QUERY = """
+    SELECT
+        JRF_CODIOF,
+        JRF_CODMAQ,
+        JRF_CODSEQ,
+        JRF_CODCNP,
+        JRF_TMPMAQ,
+        JRF_PROHOR
+    FROM J_ROTOF
+    WHERE (JRF_CODIOF, JRF_CODSEQ) IN ({pairs})
+"""
+
+OF_MATERIALS_BATCH_QUERY = """
+    SELECT
+        c.JFC_CODIOF,
+        c.JFC_CODPRO,
+        p.JRO_DESCRI,
+        c.JFC_LOCEST
+    FROM J_OFCONS c
+    LEFT JOIN J_PRODUTO p
+        ON p.JRO_PROERP = c.JFC_CODPRO
+    WHERE c.JFC_CODIOF IN ({placeholders})
+"""
+
+OPEN_OF_IDS_QUERY = """
+    SELECT DISTINCT JOF_CODIOF
+    FROM J_OF
+    WHERE JOF_CODIOF IN ({placeholders})
+      AND JOF_DATA_EXCLUSAO IS NULL
+      AND JOF_DTENCE IS NULL
+"""
+
+# ---------------------------------------------------------------------------
+# Registro de statements (core/statements.py) — cardinalidade, fetch e tipos
+# dos binds. Compartilhado com o repositório assíncrono.
+# ---------------------------------------------------------------------------
+# Linhas trazidas por round-trip nas leituras em streaming
+STREAM_ARRAYSIZE = 500
+
+# Um operador tem de dezenas a poucas centenas de OFs na fila: 500 cobre a
+# lista inteira no próprio execute
+SEQUENCING = statement(
+    "sequencing",
+    SEQUENCING_QUERY,
+    MANY,
+    binds={"operator_code": str},
+    arraysize=500,
+)
+SEQUENCING_SNAPSHOT = statement(
+    "sequencing_snapshot",
+    SEQUENCING_SNAPSHOT_QUERY,
+    MANY,
+    arraysize=2000,
+)
+INSERT_APONTAMENTO = statement(
+    "insert_apontamento",
+    INSERT_APONTAMENTO_SQL,
+    NONE,
+    binds={
+        "of_numero": str,
+        "operador_codigo": str,
+        "dt_inicio": datetime,
+        "dt_afim": datetime,
+        "soc_codseq": int,
+        "quantidade_realizada": int,
+        "soc_empresa": str,
+    },
+)
+INSERT_APONTAMENTO_ONCE = statement(
+    "insert_apontamento_once",
+    INSERT_APONTAMENTO_ONCE_SQL,
+    NONE,
+    binds=INSERT_APONTAMENTO.binds,
+)
+START_APONTAMENTO = statement(
+    "start_apontamento",
+    START_APONTAMENTO_SQL,
+    NONE,
+    binds={
+        "of_id": str,
+        "operator": str,
+        "empresa": str,
+        "operac": int,
+        "ignore_id": int,
+    },
+    returning={"ap_id": int, "open_of": str, "outcome": str},
+)
+PAUSE_APONTAMENTO = statement(
+    "pause_apontamento",
+    PAUSE_APONTAMENTO_SQL,
+    NONE,
+    binds={"id": int, "dt_afim": datetime},
+    returning={"operator": str, "of_id": str},
+)
+FINISH_APONTAMENTO = statement(
+    "finish_apontamento",
+    FINISH_APONTAMENTO_SQL,
+    NONE,
+    binds={"id": int, "qtd": int, "dt_afim": datetime},
+    returning={"operator": str, "of_id": str},
+)
+APONTAMENTOS_BY_OF = statement(
+    "apontamentos_by_of",
+    APONTAMENTOS_BY_OF_QUERY,
+    STREAM,
+    binds={"of_id": str},
+    arraysize=STREAM_ARRAYSIZE,
+)
+# Página: arraysize = linhas pedidas + 1, definido na chamada
+APONTAMENTOS_BY_OF_PAGE = statement(
+    "apontamentos_by_of_page",
+    APONTAMENTOS_BY_OF_PAGE_QUERY,
+    MANY,
+    binds={"of_id": str, "page_rows": int, "after_dt": datetime, "after_id": int},
+)
+APONTAMENTO_CHANGES = statement(
+    "apontamento_changes",
+    APONTAMENTO_CHANGES_QUERY,
+    MANY,
+    binds={"since": datetime},
+)
+DB_CLOCK = statement("db_clock", DB_CLOCK_QUERY, ONE)
+JOBS_BY_OPERATOR = statement(
+    "jobs_by_operator",
+    JOBS_BY_OPERATOR_QUERY,
+    STREAM,
+    binds={"operator": str, "page_rows": int, "after_dt": datetime, "after_id": int},
+    arraysize=STREAM_ARRAYSIZE,
+)
+# Roda uma vez por processo
+JOBS_COLUMNS = statement("jobs_columns", JOBS_COLUMNS_QUERY, ONE, cached=False)
+OF_DETAILS = statement(
+    "of_details",
+    OF_DETAILS_QUERY,
+    ONE,
+    binds={"of_id": str, "codseq": str},
+)
+OF_MATERIALS = statement(
+    "of_materials",
+    OF_MATERIALS_QUERY,
+    MANY,
+    binds={"of_id": str},
+)
+# Texto diferente a cada tamanho de lista: fora do statement cache para não
+# expulsar os statements fixos acima
+OF_DETAILS_BATCH = statement(
+    "of_details_batch", OF_DETAILS_BATCH_QUERY, MANY, arraysize=1000, cached=False
+)
+OF_MATERIALS_BATCH = statement(
+    "of_materials_batch",
+    OF_MATERIALS_BATCH_QUERY,
+    MANY,
+    arraysize=1000,
+    cached=False,
+)
+OPEN_OF_IDS = statement(
+    "open_of_ids", OPEN_OF_IDS_QUERY, MANY, arraysize=1000, cached=False
+)
+
+
+# ---------------------------------------------------------------------------
+# Conversão de linhas — compartilhada com o repositório assíncrono
+# ---------------------------------------------------------------------------
+def apontamento_row(r) -> dict:
+    return {
+        "SOF_APONTAOFID": r[0],
+        "SOF_CODIOF": r[1],
+        "SOF_OPERAD": r[2],
+        "SOF_DTINIC": r[3],
+        "SOF_DTAFIM": r[4],
+        "SOF_QNTBOA": r[5],
+        "SOF_ERROINTEGRA": r[6],
+    }
+
+
+def apontamentos_page_query(of_id: str, limit: int, after: tuple | None):
+    """SQL e binds de uma página; pede uma linha a mais para saber se há próxima."""
+    binds = {"of_id": of_id, "page_rows": limit + 1}
+    if after is None:
+        return APONTAMENTOS_BY_OF_PAGE_QUERY, binds
+    binds["after_dt"], binds["after_id"] = after
+    return APONTAMENTOS_BY_OF_AFTER_QUERY, binds
+
+
+def apontamentos_page(rows, limit: int) -> tuple[list[dict], tuple | None]:
+    """Corta a linha extra e devolve a chave (SOF_DTINIC, ID) da próxima página."""
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1][3], rows[-1][0])
+    return [apontamento_row(r) for r in rows], next_key
+
+
+def of_details_row(row) -> dict:
+    return {
+        "maquina": row[0],
+        "operacao": row[1],
+        "np": row[2],
+        "tempo_maquina": row[3],
+        "producao_por_hora": row[4],
+    }
+
+
+def of_material_row(r) -> dict:
+    return {
+        "codigo": r[0],
+        "descricao": r[1],
+        "estoque": r[2],
+    }
+
+
+def returned_value(var, row: int = 0):
+    values = var.getvalue(row)
+    return values[0] if values else None
+
+
+def start_result(binds: dict, row: int = 0) -> tuple:
+    """(resultado, id, OF aberta) das variáveis de saída do bloco de início."""
+    return tuple(binds[name].getvalue(row) for name in ("outcome", "ap_id", "open_of"))
+
+
+def fetch_sequencing(operator_code: str, fields: tuple | None = None) -> tuple:
+    """Sequenciamento do operador como (colunas, linhas em tuplas)."""
+    sql, columns = sequencing_query(fields)
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(SEQUENCING, cursor):
+                cursor.execute(
+                    sql, bind(cursor, SEQUENCING, {"operator_code": operator_code})
+                )
+                return columns, cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar sequenciamento: {e}")
+        finally:
+            cursor.close()
+
+
+def fetch_sequencing_snapshot() -> tuple:
+    """Sequenciamento de todos os operadores como (colunas, linhas em tuplas)."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(SEQUENCING_SNAPSHOT, cursor):
+                cursor.execute(
+                    SEQUENCING_SNAPSHOT.sql, bind(cursor, SEQUENCING_SNAPSHOT)
+                )
+                return list(SEQUENCING_COLUMNS), cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar sequenciamento: {e}")
+        finally:
+            cursor.close()
 
 
 def insert_apontamento(
@@ -121,223 +595,601 @@ def insert_apontamento(
     quantidade_realizada: int,
     soc_empresa: str,
 ) -> None:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO S_APONTAMENTO_OF
-                (SOF_CODIOF, SOF_OPERAD, SOF_DTINIC, SOF_DTAFIM,
-                 SOF_OPERAC, SOF_QNTBOA, SOF_EMPRESA, SOF_DATCAD)
-            VALUES
-                (:of_numero, :operador_codigo, :dt_inicio, :dt_afim,
-                 :soc_codseq, :quantidade_realizada, :soc_empresa, SYSDATE)
-            """,
-            of_numero=of_numero,
-            operador_codigo=operador_codigo,
-            dt_inicio=dt_inicio,
-            dt_afim=dt_afim,
-            soc_codseq=soc_codseq,
-            quantidade_realizada=quantidade_realizada,
-            soc_empresa=soc_empresa,
-        )
-        conn.commit()
-    except cx_Oracle.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Erro Oracle ao registrar apontamento: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(INSERT_APONTAMENTO, cursor):
+                cursor.execute(
+                    INSERT_APONTAMENTO.sql,
+                    bind(
+                        cursor,
+                        INSERT_APONTAMENTO,
+                        {
+                            "of_numero": of_numero,
+                            "operador_codigo": operador_codigo,
+                            "dt_inicio": dt_inicio,
+                            "dt_afim": dt_afim,
+                            "soc_codseq": soc_codseq,
+                            "quantidade_realizada": quantidade_realizada,
+                            "soc_empresa": soc_empresa,
+                        },
+                    ),
+                )
+            commit(conn)
+        except cx_Oracle.Error as e:
+            rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao registrar apontamento: {e}")
+        finally:
+            cursor.close()
 
 
-def insert_apontamento_start(
-    of_id: str, operator_code: str, empresa_id: str, operac: int = 1
-) -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        new_id = cursor.var(int)
-        cursor.execute(
-            """
-            INSERT INTO S_APONTAMENTO_OF
-            (SOF_CODIOF, SOF_OPERAD, SOF_DTINIC, SOF_STATUS,
-             SOF_EMPRESA, SOF_OPERAC, SOF_CODTUR, SOF_DATCAD)
-            VALUES
-            (:of_id, :operator, SYSDATE, 'A',
-             :empresa, :operac, 1, SYSDATE)
-            RETURNING SOF_APONTAOFID INTO :new_id
-            """,
-            {
-                "of_id": of_id,
-                "operator": operator_code,
-                "empresa": empresa_id,
-                "operac": operac,
-                "new_id": new_id,
-            },
-        )
-        conn.commit()
-        return new_id.getvalue()[0]
-    except cx_Oracle.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Erro Oracle ao iniciar apontamento: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+def insert_apontamentos_batch(
+    rows: list[dict], once: bool = False
+) -> list[tuple[int, str]]:
+    """
+    Insere vários apontamentos em um único executemany (array DML).
+    Retorna [(posição, mensagem)] das linhas rejeitadas pelo Oracle.
+    Com `once`, linhas já existentes são ignoradas (reaplicação).
+    """
+    if not rows:
+        return []
 
+    stmt = INSERT_APONTAMENTO_ONCE if once else INSERT_APONTAMENTO
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(stmt, cursor):
+                cursor.executemany(
+                    stmt.sql,
+                    bind_many(cursor, stmt, rows),
+                    batcherrors=True,
+                )
+                errors = [
+                    (err.offset, err.message.strip()) for err in cursor.getbatcherrors()
+                ]
+            commit(conn)
+            return errors
+        except cx_Oracle.Error as e:
+            rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao registrar lote de apontamentos: {e}")
+        finally:
+            cursor.close()
 
-def update_apontamento_pause(apontamento_id: int) -> None:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE S_APONTAMENTO_OF
-            SET SOF_DTAFIM = SYSDATE
-            WHERE SOF_APONTAOFID = :id
-            """,
-            {"id": apontamento_id},
-        )
-        conn.commit()
-    except cx_Oracle.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Erro Oracle ao pausar apontamento: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+
+def start_binds(
+    of_id: str,
+    operator_code: str,
+    empresa_id: str,
+    operac: int = 1,
+    ignore_id: int | None = None,
+) -> dict:
+    return {
+        "of_id": of_id,
+        "operator": operator_code,
+        "empresa": empresa_id,
+        "operac": operac,
+        "ignore_id": ignore_id,
+    }
+
+
+def start_apontamento(
+    of_id: str,
+    operator_code: str,
+    empresa_id: str,
+    operac: int = 1,
+    ignore_id: int | None = None,
+) -> tuple:
+    """
+    Abre o apontamento em um único round-trip (START_APONTAMENTO_SQL).
+    Retorna (resultado, id, OF aberta), resultado 'new', 'reused' ou
+    'conflict' ou 'busy'. Sempre confirma: libera a trava do operador.
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor,
+                START_APONTAMENTO,
+                start_binds(of_id, operator_code, empresa_id, operac, ignore_id),
+            )
+            with timed(START_APONTAMENTO, cursor):
+                cursor.execute(START_APONTAMENTO.sql, binds)
+            commit(conn)
+            return start_result(binds)
+        except cx_Oracle.Error as e:
+            rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao iniciar apontamento: {e}")
+        finally:
+            cursor.close()
+
+
+def update_apontamento_pause(apontamento_id: int, dt_afim=None) -> tuple:
+    """
+    Pausa o apontamento e retorna (SOF_OPERAD, SOF_CODIOF). Sem `dt_afim`
+    o fim é o SYSDATE do banco.
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor, PAUSE_APONTAMENTO, {"id": apontamento_id, "dt_afim": dt_afim}
+            )
+            with timed(PAUSE_APONTAMENTO, cursor):
+                cursor.execute(PAUSE_APONTAMENTO.sql, binds)
+            commit(conn)
+            return returned_value(binds["operator"]), returned_value(binds["of_id"])
+        except cx_Oracle.Error as e:
+            rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao pausar apontamento: {e}")
+        finally:
+            cursor.close()
 
 
-def update_apontamento_finish(apontamento_id: int, quantidade: int) -> None:
-    conn = get_connection()
-    cursor = conn.cursor()
+def update_apontamento_finish(
+    apontamento_id: int, quantidade: int, dt_afim=None
+) -> tuple:
+    """Finaliza o apontamento e retorna (SOF_OPERAD, SOF_CODIOF)."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor,
+                FINISH_APONTAMENTO,
+                {"id": apontamento_id, "qtd": quantidade, "dt_afim": dt_afim},
+            )
+            with timed(FINISH_APONTAMENTO, cursor):
+                cursor.execute(FINISH_APONTAMENTO.sql, binds)
+            commit(conn)
+            return returned_value(binds["operator"]), returned_value(binds["of_id"])
+        except cx_Oracle.Error as e:
+            rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao finalizar apontamento: {e}")
+        finally:
+            cursor.close()
+
+
+# ---------------------------------------------------------------------------
+# Transições agrupadas (group commit)
+# ---------------------------------------------------------------------------
+# tipo → (statement, função que monta os binds a partir dos argumentos das
+# funções avulsas acima)
+TRANSITIONS = {
+    "start": (START_APONTAMENTO, start_binds),
+    "pause": (
+        PAUSE_APONTAMENTO,
+        lambda apontamento_id, dt_afim=None: {
+            "id": apontamento_id,
+            "dt_afim": dt_afim,
+        },
+    ),
+    "finish": (
+        FINISH_APONTAMENTO,
+        lambda apontamento_id, quantidade, dt_afim=None: {
+            "id": apontamento_id,
+            "qtd": quantidade,
+            "dt_afim": dt_afim,
+        },
+    ),
+}
+
+
+def _transition_rows(cursor, kind: str, stmt, params: list) -> list:
+    """Um executemany de `kind`; um resultado (ou DatabaseError) por linha."""
+    out = {}
+    rows = bind_many(cursor, stmt, params, out)
+    # Batch errors só valem para DML; o bloco PL/SQL do início, se falhar,
+    # derruba o executemany inteiro
+    dml = kind != "start"
+    with timed(stmt, cursor):
+        cursor.executemany(stmt.sql, rows, batcherrors=dml)
+    failed = {
+        err.offset: err.message.strip()
+        for err in (cursor.getbatcherrors() if dml else [])
+    }
+    results = []
+    for row in range(len(params)):
+        if row in failed:
+            results.append(DatabaseError(f"Erro Oracle: {failed[row]}"))
+        elif kind == "start":
+            results.append(start_result(out, row))
+        else:
+            results.append(
+                (
+                    returned_value(out["operator"], row),
+                    returned_value(out["of_id"], row),
+                )
+            )
+    return results
+
+
+def apply_transitions(items: list[tuple[str, dict]]) -> list:
+    """
+    Executa várias transições (start/pause/finish) em uma conexão própria:
+    um executemany por tipo e um único commit. `items` são (tipo, argumentos
+    da função avulsa). Retorna, na mesma ordem, o que a função avulsa
+    retornaria — ou o erro (ValidationError/DatabaseError) daquele item.
+
+    Um item inválido ou recusado pelo Oracle não derruba os demais: se o
+    executemany de um tipo falhar, o grupo é desfeito até o savepoint e
+    reexecutado linha a linha. Só perda de sessão falha o lote inteiro, e
+    aí nada foi confirmado.
+
+    Fora da unidade de trabalho da requisição: ao retornar, já está confirmado.
+    """
+    results = [None] * len(items)
+    by_kind: dict = {}
+    for index, (kind, params) in enumerate(items):
+        stmt, binds_of = TRANSITIONS[kind]
+        try:
+            binds = coerce(stmt, binds_of(**params))
+        except (TypeError, ValidationError) as e:
+            results[index] = e
+            continue
+        by_kind.setdefault(kind, []).append((index, binds))
+
+    conn = acquire()
     try:
-        cursor.execute(
-            """
-            UPDATE S_APONTAMENTO_OF
-            SET SOF_DTAFIM = SYSDATE,
-                SOF_QNTBOA = :qtd,
-                SOF_STATUS = 'C'
-            WHERE SOF_APONTAOFID = :id
-            """,
-            {"id": apontamento_id, "qtd": quantidade},
-        )
-        conn.commit()
-    except cx_Oracle.Error as e:
-        conn.rollback()
-        raise DatabaseError(f"Erro Oracle ao finalizar apontamento: {e}")
+        cursor = conn.cursor()
+        try:
+            for kind, group in by_kind.items():
+                stmt = TRANSITIONS[kind][0]
+                cursor.execute("SAVEPOINT transicoes")
+                try:
+                    done = _transition_rows(cursor, kind, stmt, [b for _, b in group])
+                except cx_Oracle.Error:
+                    # O erro fica só com a linha que o causou
+                    cursor.execute("ROLLBACK TO SAVEPOINT transicoes")
+                    done = []
+                    for _, binds in group:
+                        cursor.execute("SAVEPOINT transicao")
+                        try:
+                            done += _transition_rows(cursor, kind, stmt, [binds])
+                        except cx_Oracle.Error as e:
+                            cursor.execute("ROLLBACK TO SAVEPOINT transicao")
+                            done.append(DatabaseError(f"Erro Oracle: {e}"))
+                for (index, _), result in zip(group, done):
+                    results[index] = result
+            conn.commit()
+            return results
+        except cx_Oracle.Error as e:
+            try:
+                conn.rollback()
+            except cx_Oracle.Error:
+                pass  # sessão perdida: o pool a descarta no release
+            raise DatabaseError(f"Erro Oracle ao gravar transições em lote: {e}")
+        finally:
+            cursor.close()
     finally:
-        cursor.close()
-        conn.close()
+        release(conn)
+
+
+def fetch_apontamento_changes(since) -> tuple:
+    """
+    (relógio do banco, linhas alteradas desde `since`). Com since None só
+    lê o relógio — primeira passada do observador.
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(DB_CLOCK, cursor):
+                cursor.execute(DB_CLOCK.sql, bind(cursor, DB_CLOCK))
+                now = cursor.fetchone()[0]
+            if since is None:
+                return now, []
+            with timed(APONTAMENTO_CHANGES, cursor):
+                cursor.execute(
+                    APONTAMENTO_CHANGES.sql,
+                    bind(cursor, APONTAMENTO_CHANGES, {"since": since}),
+                )
+                return now, cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao ler alterações: {e}")
+        finally:
+            cursor.close()
 
 
 def fetch_apontamentos_by_of(of_id: str) -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT
-                SOF_APONTAOFID,
-                SOF_CODIOF,
-                SOF_OPERAD,
-                TO_CHAR(SOF_DTINIC, 'DD/MM/YYYY HH24:MI:SS') AS SOF_DTINIC,
-                TO_CHAR(SOF_DTAFIM, 'DD/MM/YYYY HH24:MI:SS') AS SOF_DTAFIM,
-                SOF_QNTBOA,
-                SOF_ERROINTEGRA
-            FROM S_APONTAMENTO_OF
-            WHERE SOF_CODIOF = :of_id
-              AND SOF_DATA_EXCLUSAO IS NULL
-            ORDER BY SOF_DTINIC DESC
-            """,
-            {"of_id": of_id},
-        )
-        rows = cursor.fetchall()
-        return [
-            {
-                "SOF_APONTAOFID": r[0],
-                "SOF_CODIOF": r[1],
-                "SOF_OPERAD": r[2],
-                "SOF_DTINIC": r[3],
-                "SOF_DTAFIM": r[4],
-                "SOF_QNTBOA": r[5],
-                "SOF_ERROINTEGRA": r[6],
-            }
-            for r in rows
-        ]
-    except cx_Oracle.Error as e:
-        raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF, cursor):
+                cursor.execute(
+                    APONTAMENTOS_BY_OF.sql,
+                    bind(cursor, APONTAMENTOS_BY_OF, {"of_id": of_id}),
+                )
+                return [apontamento_row(r) for r in cursor.fetchall()]
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
 
 
-def fetch_of_details(of_id: str, codseq: str) -> dict | None:
-    conn = get_connection()
-    cursor = conn.cursor()
+def fetch_apontamentos_page(
+    of_id: str, limit: int, after: tuple | None = None
+) -> tuple[list[dict], tuple | None]:
+    """
+    Uma página do histórico da OF, do mais recente ao mais antigo.
+    `after` é o (SOF_DTINIC, SOF_APONTAOFID) da última linha da página anterior.
+    Retorna (linhas, chave da próxima página ou None se acabou).
+    """
+    sql, binds = apontamentos_page_query(of_id, limit, after)
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF_PAGE, cursor):
+                cursor.execute(
+                    sql, bind(cursor, APONTAMENTOS_BY_OF_PAGE, binds, rows=limit + 1)
+                )
+                rows = cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
 
-    try:
-        cursor.execute(
-            """
-            SELECT
-                JRF_CODMAQ,
-                JRF_CODSEQ,
-                JRF_CODCNP,
-                JRF_TMPMAQ,
-                JRF_PROHOR
-            FROM J_ROTOF
-            WHERE JRF_CODIOF = :of_id
-              AND JRF_CODSEQ = :codseq
-            """,
-            {"of_id": of_id, "codseq": codseq},
+    return apontamentos_page(rows, limit)
+
+
+def iter_apontamentos_by_of(of_id: str):
+    """Histórico completo da OF, linha a linha, sem materializar a lista."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF, cursor, streaming=True):
+                cursor.execute(
+                    APONTAMENTOS_BY_OF.sql,
+                    bind(cursor, APONTAMENTOS_BY_OF, {"of_id": of_id}),
+                )
+            for r in cursor:
+                yield apontamento_row(r)
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
+
+
+_jobs_columns = None
+
+
+def jobs_columns() -> list[str]:
+    """Colunas de VW_APONTAMENTO_LASER (minúsculas), lidas uma vez do dicionário."""
+    global _jobs_columns
+    if _jobs_columns is None:
+        with connection() as conn:
+            cursor = conn.cursor()
+            try:
+                with timed(JOBS_COLUMNS, cursor):
+                    cursor.execute(JOBS_COLUMNS.sql, bind(cursor, JOBS_COLUMNS))
+                    _jobs_columns = [col[0].lower() for col in cursor.description]
+            except cx_Oracle.Error as e:
+                raise DatabaseError(f"Erro Oracle ao ler colunas da view: {e}")
+            finally:
+                cursor.close()
+    return _jobs_columns
+
+
+def fetch_jobs(
+    operator: str,
+    limit: int | None = None,
+    after: tuple | None = None,
+    fields: tuple | None = None,
+) -> tuple[list[str], list[tuple], tuple | None]:
+    """
+    Lançamentos de VW_APONTAMENTO_LASER do operador como (colunas em
+    minúsculas, linhas em tuplas, chave da próxima página). limit None = todos.
+    `after` é (DATA_LANCAMENTO, JOBS_KEY_COLUMN) da última linha já entregue.
+    """
+    if limit is not None and JOBS_KEY_COLUMN not in jobs_columns():
+        raise DatabaseError(
+            f"VW_APONTAMENTO_LASER sem a coluna {JOBS_KEY_COLUMN.upper()} "
+            "para paginar (JOBS_KEY_COLUMN)"
         )
+    sql = jobs_query(fields, limit is not None, after is not None)
+    binds = {"operator": operator}
+    if limit is not None:
+        binds["page_rows"] = limit + 1
+    if after is not None:
+        binds["after_dt"], binds["after_id"] = after
 
-        row = cursor.fetchone()
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            page_rows = limit + 1 if limit is not None else None
+            with timed(JOBS_BY_OPERATOR, cursor):
+                cursor.execute(
+                    sql, bind(cursor, JOBS_BY_OPERATOR, binds, rows=page_rows)
+                )
+                columns = [col[0].lower() for col in cursor.description]
+                rows = cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar lançamentos: {e}")
+        finally:
+            cursor.close()
 
-        if not row:
-            return None
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_key = (
+            last[columns.index("data_lancamento")],
+            last[columns.index(JOBS_KEY_COLUMN)],
+        )
+    return columns, rows, next_key
 
-        return {
-            "maquina": row[0],
-            "operacao": row[1],
-            "np": row[2],
-            "tempo_maquina": row[3],
-            "producao_por_hora": row[4],
-        }
 
-    finally:
-        cursor.close()
-        conn.close()
+def iter_jobs(operator: str, fields: tuple | None = None):
+    """Todos os lançamentos do operador, linha a linha."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(JOBS_BY_OPERATOR, cursor, streaming=True):
+                cursor.execute(
+                    jobs_query(fields, False, False),
+                    bind(cursor, JOBS_BY_OPERATOR, {"operator": operator}),
+                )
+            cols = [col[0].lower() for col in cursor.description]
+            for row in cursor:
+                yield dict(zip(cols, row))
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar lançamentos: {e}")
+        finally:
+            cursor.close()
+
+
+def fetch_of_details(of_id: str, codseq: str) -> dict | None:
+    with connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            with timed(OF_DETAILS, cursor):
+                cursor.execute(
+                    OF_DETAILS.sql,
+                    bind(cursor, OF_DETAILS, {"of_id": of_id, "codseq": codseq}),
+                )
+                row = cursor.fetchone()
+
+            if not row:
+                return None
+
+            return of_details_row(row)
+
+        finally:
+            cursor.close()
 
 
 def fetch_of_materials(of_id: str) -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        cursor = conn.cursor()
 
-    try:
-        cursor.execute(
-            """
-            SELECT
-                c.JFC_CODPRO,
-                p.JRO_DESCRI,
-                c.JFC_LOCEST
-            FROM J_OFCONS c
-            LEFT JOIN J_PRODUTO p
-                ON p.JRO_PROERP = c.JFC_CODPRO
-            WHERE c.JFC_CODIOF = :of_id
-            """,
-            {"of_id": of_id},
-        )
+        try:
+            with timed(OF_MATERIALS, cursor):
+                cursor.execute(
+                    OF_MATERIALS.sql,
+                    bind(cursor, OF_MATERIALS, {"of_id": of_id}),
+                )
+                return [of_material_row(r) for r in cursor.fetchall()]
 
-        rows = cursor.fetchall()
+        finally:
+            cursor.close()
 
-        return [
-            {
-                "codigo": r[0],
-                "descricao": r[1],
-                "estoque": r[2],
-            }
-            for r in rows
-        ]
 
-    finally:
-        cursor.close()
-        conn.close()
+# Oracle limita listas IN a 1000 expressões
+IN_LIST_LIMIT = 1000
+
+
+def _in_list(values: list, prefix: str) -> tuple[str, dict]:
+    """Monta ':p0, :p1, ...' e o dicionário de binds correspondente."""
+    binds = {f"{prefix}{i}": v for i, v in enumerate(values)}
+    return ", ".join(f":{name}" for name in binds), binds
+
+
+def _pair_key(of_id, codseq) -> tuple[str, str]:
+    """
+    Forma comum do par pedido e do par lido: o Oracle compara '010' com a
+    coluna NUMBER 10 como iguais, então zeros à esquerda não distinguem.
+    """
+
+    def norm(value) -> str:
+        text = str(value).strip()
+        return str(int(text)) if text.isdigit() else text
+
+    return norm(of_id), norm(codseq)
+
+
+def _bucket(size: int) -> int:
+    """Tamanho de bloco arredondado (1, 2, 4, ... 512, 1000): menos SQLs distintos."""
+    bucket = 1
+    while bucket < size:
+        bucket *= 2
+    return min(bucket, IN_LIST_LIMIT)
+
+
+def fetch_of_details_batch(pairs: list[tuple[str, str]]) -> dict:
+    """
+    Roteiro de várias OFs em uma consulta por bloco de até 1000 pares.
+    Retorna {(of_id, codseq): detalhes}, com as chaves como foram pedidas.
+    """
+    if not pairs:
+        return {}
+
+    requested = {}
+    for pair in pairs:
+        requested.setdefault(_pair_key(*pair), []).append(pair)
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            result = {}
+            for start in range(0, len(pairs), IN_LIST_LIMIT):
+                chunk = pairs[start : start + IN_LIST_LIMIT]
+                # Repete o último par até o tamanho do bloco: o IN ignora
+                # duplicatas e o texto do SQL se repete entre requisições
+                chunk = chunk + [chunk[-1]] * (_bucket(len(chunk)) - len(chunk))
+                binds = {}
+                tuples = []
+                for i, (of_id, codseq) in enumerate(chunk):
+                    binds[f"of{i}"] = of_id
+                    binds[f"seq{i}"] = codseq
+                    tuples.append(f"(:of{i}, :seq{i})")
+                sql = OF_DETAILS_BATCH.sql.format(pairs=", ".join(tuples))
+                with timed(OF_DETAILS_BATCH, cursor):
+                    cursor.execute(sql, bind(cursor, OF_DETAILS_BATCH, binds, sql=sql))
+                    for r in cursor.fetchall():
+                        for pair in requested.get(_pair_key(r[0], r[2]), ()):
+                            if pair not in result:
+                                result[pair] = of_details_row(r[1:])
+            return result
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar roteiro das OFs: {e}")
+        finally:
+            cursor.close()
+
+
+def fetch_of_materials_batch(of_ids: list[str]) -> dict:
+    """Materiais de várias OFs. Retorna {of_id: [materiais]}."""
+    if not of_ids:
+        return {}
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            result = {str(of_id): [] for of_id in of_ids}
+            for start in range(0, len(of_ids), IN_LIST_LIMIT):
+                placeholders, binds = _in_list(
+                    of_ids[start : start + IN_LIST_LIMIT], "of"
+                )
+                sql = OF_MATERIALS_BATCH.sql.format(placeholders=placeholders)
+                with timed(OF_MATERIALS_BATCH, cursor):
+                    cursor.execute(
+                        sql, bind(cursor, OF_MATERIALS_BATCH, binds, sql=sql)
+                    )
+                    for r in cursor.fetchall():
+                        result.setdefault(str(r[0]), []).append(of_material_row(r[1:]))
+            return result
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar materiais das OFs: {e}")
+        finally:
+            cursor.close()
+
+
+def fetch_open_of_ids(of_ids: list[str]) -> set[str]:
+    """Dentre as OFs informadas, retorna as que seguem abertas e não excluídas."""
+    if not of_ids:
+        return set()
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            open_ids = set()
+            for start in range(0, len(of_ids), IN_LIST_LIMIT):
+                placeholders, binds = _in_list(
+                    of_ids[start : start + IN_LIST_LIMIT], "of"
+                )
+                sql = OPEN_OF_IDS.sql.format(placeholders=placeholders)
+                with timed(OPEN_OF_IDS, cursor):
+                    cursor.execute(sql, bind(cursor, OPEN_OF_IDS, binds, sql=sql))
+                    open_ids.update(str(r[0]) for r in cursor.fetchall())
+            return open_ids
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao verificar OFs abertas: {e}")
+        finally:
+            cursor.close()
@@ -0,0 +1,201 @@
+## backend/laser/repository_async.py
+
+import oracledb as cx_Oracle
+from core.database_async import connection, commit, rollback
+from core.exceptions import DatabaseError
+from core.statements import bind, timed
+from laser.repository import (
+    SEQUENCING,
+    START_APONTAMENTO,
+    PAUSE_APONTAMENTO,
+    FINISH_APONTAMENTO,
+    APONTAMENTOS_BY_OF,
+    APONTAMENTOS_BY_OF_PAGE,
+    OF_DETAILS,
+    OF_MATERIALS,
+    apontamento_row,
+    returned_value,
+    start_binds,
+    start_result,
+    sequencing_query,
+    apontamentos_page_query,
+    apontamentos_page,
+    of_details_row,
+    of_material_row,
+)
+
+# Mesmas operações de laser/repository.py, sobre o pool asyncio (modo thin).
+# O SQL, o registro de statements e a conversão de linhas são compartilhados
+# com a versão síncrona.
+
+
+async def fetch_sequencing(operator_code: str, fields: tuple | None = None) -> tuple:
+    sql, columns = sequencing_query(fields)
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(SEQUENCING, cursor):
+                await cursor.execute(
+                    sql, bind(cursor, SEQUENCING, {"operator_code": operator_code})
+                )
+                return columns, await cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar sequenciamento: {e}")
+        finally:
+            cursor.close()
+
+
+async def start_apontamento(
+    of_id: str,
+    operator_code: str,
+    empresa_id: str,
+    operac: int = 1,
+    ignore_id: int | None = None,
+) -> tuple:
+    """(resultado, id, OF aberta) — ver repository.start_apontamento."""
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor,
+                START_APONTAMENTO,
+                start_binds(of_id, operator_code, empresa_id, operac, ignore_id),
+            )
+            with timed(START_APONTAMENTO, cursor):
+                await cursor.execute(START_APONTAMENTO.sql, binds)
+            await commit(conn)
+            return start_result(binds)
+        except cx_Oracle.Error as e:
+            await rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao iniciar apontamento: {e}")
+        finally:
+            cursor.close()
+
+
+async def update_apontamento_pause(apontamento_id: int, dt_afim=None) -> tuple:
+    """
+    Pausa o apontamento e retorna (SOF_OPERAD, SOF_CODIOF). Sem `dt_afim`
+    o fim é o SYSDATE do banco.
+    """
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor, PAUSE_APONTAMENTO, {"id": apontamento_id, "dt_afim": dt_afim}
+            )
+            with timed(PAUSE_APONTAMENTO, cursor):
+                await cursor.execute(PAUSE_APONTAMENTO.sql, binds)
+            await commit(conn)
+            return returned_value(binds["operator"]), returned_value(binds["of_id"])
+        except cx_Oracle.Error as e:
+            await rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao pausar apontamento: {e}")
+        finally:
+            cursor.close()
+
+
+async def update_apontamento_finish(
+    apontamento_id: int, quantidade: int, dt_afim=None
+) -> tuple:
+    """Finaliza o apontamento e retorna (SOF_OPERAD, SOF_CODIOF)."""
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            binds = bind(
+                cursor,
+                FINISH_APONTAMENTO,
+                {"id": apontamento_id, "qtd": quantidade, "dt_afim": dt_afim},
+            )
+            with timed(FINISH_APONTAMENTO, cursor):
+                await cursor.execute(FINISH_APONTAMENTO.sql, binds)
+            await commit(conn)
+            return returned_value(binds["operator"]), returned_value(binds["of_id"])
+        except cx_Oracle.Error as e:
+            await rollback(conn)
+            raise DatabaseError(f"Erro Oracle ao finalizar apontamento: {e}")
+        finally:
+            cursor.close()
+
+
+async def fetch_apontamentos_by_of(of_id: str) -> list[dict]:
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF, cursor):
+                await cursor.execute(
+                    APONTAMENTOS_BY_OF.sql,
+                    bind(cursor, APONTAMENTOS_BY_OF, {"of_id": of_id}),
+                )
+                return [apontamento_row(r) for r in await cursor.fetchall()]
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
+
+
+async def fetch_apontamentos_page(
+    of_id: str, limit: int, after: tuple | None = None
+) -> tuple[list[dict], tuple | None]:
+    sql, binds = apontamentos_page_query(of_id, limit, after)
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF_PAGE, cursor):
+                await cursor.execute(
+                    sql, bind(cursor, APONTAMENTOS_BY_OF_PAGE, binds, rows=limit + 1)
+                )
+                rows = await cursor.fetchall()
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
+    return apontamentos_page(rows, limit)
+
+
+async def iter_apontamentos_by_of(of_id: str):
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(APONTAMENTOS_BY_OF, cursor, streaming=True):
+                await cursor.execute(
+                    APONTAMENTOS_BY_OF.sql,
+                    bind(cursor, APONTAMENTOS_BY_OF, {"of_id": of_id}),
+                )
+            async for r in cursor:
+                yield apontamento_row(r)
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao listar apontamentos: {e}")
+        finally:
+            cursor.close()
+
+
+async def fetch_of_details(of_id: str, codseq: str) -> dict | None:
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(OF_DETAILS, cursor):
+                await cursor.execute(
+                    OF_DETAILS.sql,
+                    bind(cursor, OF_DETAILS, {"of_id": of_id, "codseq": codseq}),
+                )
+                row = await cursor.fetchone()
+            return of_details_row(row) if row else None
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar roteiro da OF: {e}")
+        finally:
+            cursor.close()
+
+
+async def fetch_of_materials(of_id: str) -> list[dict]:
+    async with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with timed(OF_MATERIALS, cursor):
+                await cursor.execute(
+                    OF_MATERIALS.sql, bind(cursor, OF_MATERIALS, {"of_id": of_id})
+                )
+                return [of_material_row(r) for r in await cursor.fetchall()]
+        except cx_Oracle.Error as e:
+            raise DatabaseError(f"Erro Oracle ao buscar materiais da OF: {e}")
+        finally:
+            cursor.close()
@@ -1,19 +1,47 @@
 ## backend/laser/routes.py
 
-from flask import Blueprint, request, jsonify, send_file
+import os
+import hmac
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
+from flask_login import current_user
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
 from core.exceptions import AppError
 from laser import service
+from laser import events
 from laser import schemas
+from shared.http_cache import conditional_json
+from shared.streaming import stream_json
 from .service import get_of_full_details
 from core.exceptions import NotFoundError
 
 laser_bp = Blueprint("laser_bp", __name__, url_prefix="/api/laser")
+laser_bp.after_request(conditional_json)
+
+# 0 = o navegador sempre revalida (ETag/Last-Modified → 304 se não mudou)
+STEP_CACHE_MAX_AGE = int(os.getenv("STEP_CACHE_MAX_AGE", "0"))
+# Rotas administrativas: header "Authorization: Bearer <token>"
+LASER_ADMIN_TOKEN = os.getenv("LASER_ADMIN_TOKEN", "")
 
 
 def _error_response(e: AppError):
     return jsonify({"success": False, "error": e.message}), e.status_code
 
 
+def _is_admin() -> bool:
+    """
+    Token configurado (LASER_ADMIN_TOKEN) ou, com login ativo no app, a
+    permissão LASER_ADMIN do usuário — como check_permissions em
+    modules/api. Sem nenhum dos dois, ninguém é administrador.
+    """
+    if LASER_ADMIN_TOKEN:
+        sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if hmac.compare_digest(sent.encode(), LASER_ADMIN_TOKEN.encode()):
+            return True
+    if getattr(current_app, "login_manager", None) is not None:
+        return current_user.has_permission("LASER_ADMIN")
+    return False
+
+
 # ---------------------------------------------------------------------------
 # GET /api/laser/sequencing_v2
 # ---------------------------------------------------------------------------
@@ -21,8 +49,21 @@ def _error_response(e: AppError):
 def get_sequencing_v2():
     try:
         operator_code = schemas.validate_operator_code(request.args)
-        jobs = service.get_sequencing(operator_code)
-        return jsonify({"success": True, "jobs": jobs})
+        fields, columnar = schemas.validate_projection(
+            request.args, service.SEQUENCING_FIELDS
+        )
+        if columnar:
+            columns, rows, age = service.get_sequencing_table(operator_code, fields)
+            body = {"success": True, "columns": columns, "jobs": rows}
+        else:
+            jobs, age = service.get_sequencing(operator_code, fields)
+            body = {"success": True, "jobs": jobs}
+        response = jsonify(body)
+        if age is not None:
+            # Servido do retrato em memória: idade no cabeçalho, fora do corpo
+            # (o ETag continua valendo entre recargas)
+            response.headers["Age"] = str(int(age))
+        return response
     except AppError as e:
         return _error_response(e)
     except Exception as e:
@@ -36,10 +77,23 @@ def get_sequencing_v2():
 def download_step_file():
     try:
         file_path = schemas.validate_file_path(request.args)
-        path, name = service.get_step_file(file_path)
-        return send_file(path, as_attachment=True, download_name=name)
+        step = service.get_step_file(file_path)
+        # conditional=True: If-None-Match / If-Modified-Since → 304 e Range → 206.
+        # O corpo usa wsgi.file_wrapper (sendfile) quando o servidor oferece,
+        # ou X-Sendfile se USE_X_SENDFILE estiver ligado.
+        return send_file(
+            step["path"],
+            as_attachment=True,
+            download_name=step["name"],
+            conditional=True,
+            etag=step["etag"],
+            last_modified=step["mtime"],
+            max_age=STEP_CACHE_MAX_AGE,
+        )
     except AppError as e:
         return _error_response(e)
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
     except Exception as e:
         return jsonify({"success": False, "error": f"Erro no servidor: {e}"}), 500
 
@@ -127,10 +181,29 @@ def finish_apontamento():
 # ---------------------------------------------------------------------------
 @laser_bp.route("/apontamento/list/<string:of_id>", methods=["GET"])
 def list_apontamentos(of_id: str):
+    # ?limit=&after= → paginação por cursor; ?stream=1 → histórico completo
+    # enviado conforme sai do banco; sem parâmetros → lista completa
     try:
-        apontamentos = service.list_apontamentos(of_id)
+        limit, after, stream = schemas.validate_pagination(request.args)
+        if stream:
+            return stream_json("apontamentos", service.iter_apontamentos(of_id))
+        if limit is None:
+            apontamentos = service.list_apontamentos(of_id)
+            return jsonify(
+                {
+                    "success": True,
+                    "apontamentos": apontamentos,
+                    "total": len(apontamentos),
+                }
+            )
+        apontamentos, next_cursor = service.list_apontamentos_page(of_id, limit, after)
         return jsonify(
-            {"success": True, "apontamentos": apontamentos, "total": len(apontamentos)}
+            {
+                "success": True,
+                "apontamentos": apontamentos,
+                "total": len(apontamentos),
+                "next_cursor": next_cursor,
+            }
         )
     except AppError as e:
         return _error_response(e)
@@ -145,11 +218,13 @@ def list_apontamentos(of_id: str):
 def confirm_batch():
     try:
         data = schemas.validate_confirm_batch(request.get_json() or {})
-        processed = service.confirm_batch(data)
+        result = service.confirm_batch(data)
         return jsonify(
             {
                 "success": True,
-                "message": f"{processed} apontamentos registrados com sucesso!",
+                "message": f"{result['processed']} apontamentos registrados com sucesso!",
+                "processed": result["processed"],
+                "rejected": result["rejected"],
             }
         )
     except AppError as e:
@@ -180,3 +255,61 @@ def get_of_details_route(of_id):
 
     except Exception as e:
         return jsonify({"success": False, "error": f"Erro interno: {str(e)}"}), 500
+
+
+# --------------------------------------------------------------------------
+# POST /api/laser/of/details/batch — detalhes de várias OFs (prefetch)
+# --------------------------------------------------------------------------
+@laser_bp.post("/of/details/batch")
+def get_of_details_batch_route():
+    try:
+        pairs = schemas.validate_of_details_batch(request.get_json() or {})
+        ofs = service.get_of_details_batch(pairs)
+        return jsonify({"success": True, "ofs": ofs})
+    except AppError as e:
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": f"Erro interno: {str(e)}"}), 500
+
+
+# --------------------------------------------------------------------------
+# DELETE /api/laser/of/<of_id>/cache — invalida a OF no cache de referência
+# --------------------------------------------------------------------------
+@laser_bp.delete("/of/<string:of_id>/cache")
+def invalidate_of_cache(of_id):
+    if not _is_admin():
+        return _error_response(AppError("Acesso não autorizado", 403))
+    removed = service.invalidate_of(of_id)
+    return jsonify({"success": True, "of_id": of_id, "removed": removed})
+
+
+# --------------------------------------------------------------------------
+# GET /api/laser/cache/stats — contadores dos caches em memória
+# --------------------------------------------------------------------------
+@laser_bp.get("/cache/stats")
+def get_cache_stats():
+    return jsonify({"success": True, "caches": service.cache_stats()})
+
+
+# --------------------------------------------------------------------------
+# GET /api/laser/events — alterações em tempo real (Server-Sent Events)
+# --------------------------------------------------------------------------
+@laser_bp.get("/events")
+def stream_events():
+    try:
+        topics = schemas.validate_event_topics(request.args)
+    except AppError as e:
+        return _error_response(e)
+    sub = events.hub.subscribe(**topics, limit=events.EVENTS_WSGI_MAX_SUBSCRIBERS)
+    if sub is None:
+        # Threads do servidor são da API: o terminal consulta periodicamente
+        response, status = _error_response(
+            AppError("Limite de assinantes de eventos atingido", 503)
+        )
+        response.headers["Retry-After"] = str(events.EVENTS_BUSY_RETRY)
+        return response, status
+    return Response(
+        events.sse_stream(sub),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,192 @@
+## backend/laser/routes_async.py
+
+import asyncio
+from quart import Blueprint, Response, current_app, request, jsonify
+from core.exceptions import AppError
+from laser import events
+from laser import schemas
+from laser import service_async as service
+from shared.http_cache import conditional_json_async
+from shared.streaming import json_chunks_async
+
+# Versão assíncrona (Quart/ASGI) das rotas mais acessadas de laser/routes.py.
+# Mesmas URLs e respostas; servida por asgi.py.
+laser_async_bp = Blueprint("laser_async_bp", __name__, url_prefix="/api/laser")
+laser_async_bp.after_request(conditional_json_async)
+
+
+def _error_response(e: AppError):
+    return jsonify({"success": False, "error": e.message}), e.status_code
+
+
+# ---------------------------------------------------------------------------
+# GET /api/laser/sequencing_v2
+# ---------------------------------------------------------------------------
+@laser_async_bp.route("/sequencing_v2", methods=["GET"])
+async def get_sequencing_v2():
+    try:
+        operator_code = schemas.validate_operator_code(request.args)
+        fields, columnar = schemas.validate_projection(
+            request.args, service.SEQUENCING_FIELDS
+        )
+        if columnar:
+            columns, rows, age = await service.get_sequencing_table(
+                operator_code, fields
+            )
+            body = {"success": True, "columns": columns, "jobs": rows}
+        else:
+            jobs, age = await service.get_sequencing(operator_code, fields)
+            body = {"success": True, "jobs": jobs}
+        response = jsonify(body)
+        if age is not None:
+            # Servido do retrato em memória: idade no cabeçalho, fora do corpo
+            # (o ETag continua valendo entre recargas)
+            response.headers["Age"] = str(int(age))
+        return response
+    except AppError as e:
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": f"Erro inesperado: {e}"}), 500
+
+
+# ---------------------------------------------------------------------------
+# POST /api/laser/apontamento/start
+# ---------------------------------------------------------------------------
+@laser_async_bp.route("/apontamento/start", methods=["POST"])
+async def start_apontamento():
+    try:
+        data = schemas.validate_start_apontamento(await request.get_json() or {})
+        apontamento_id = await service.start_apontamento(data)
+        return jsonify({"success": True, "apontamento_id": apontamento_id})
+    except AppError as e:
+        if e.status_code == 409:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "code": "APONTAMENTO_ABERTO",
+                        "message": e.message,
+                    }
+                ),
+                409,
+            )
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# ---------------------------------------------------------------------------
+# POST /api/laser/apontamento/pause
+# ---------------------------------------------------------------------------
+@laser_async_bp.route("/apontamento/pause", methods=["POST"])
+async def pause_apontamento():
+    try:
+        apontamento_id = schemas.validate_pause_apontamento(
+            await request.get_json() or {}
+        )
+        await service.pause_apontamento(apontamento_id)
+        return jsonify({"success": True})
+    except AppError as e:
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# ---------------------------------------------------------------------------
+# POST /api/laser/apontamento/finish
+# ---------------------------------------------------------------------------
+@laser_async_bp.route("/apontamento/finish", methods=["POST"])
+async def finish_apontamento():
+    try:
+        apontamento_id, quantidade = schemas.validate_finish_apontamento(
+            await request.get_json() or {}
+        )
+        await service.finish_apontamento(apontamento_id, quantidade)
+        return jsonify({"success": True})
+    except AppError as e:
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# ---------------------------------------------------------------------------
+# GET /api/laser/apontamento/list/<of_id>
+# ---------------------------------------------------------------------------
+@laser_async_bp.route("/apontamento/list/<string:of_id>", methods=["GET"])
+async def list_apontamentos(of_id: str):
+    try:
+        limit, after, stream = schemas.validate_pagination(request.args)
+        if stream:
+            chunks = json_chunks_async(
+                "apontamentos",
+                service.iter_apontamentos(of_id),
+                current_app.json.dumps,
+            )
+            return Response(chunks, mimetype="application/json")
+        if limit is None:
+            apontamentos = await service.list_apontamentos(of_id)
+            return jsonify(
+                {
+                    "success": True,
+                    "apontamentos": apontamentos,
+                    "total": len(apontamentos),
+                }
+            )
+        apontamentos, next_cursor = await service.list_apontamentos_page(
+            of_id, limit, after
+        )
+        return jsonify(
+            {
+                "success": True,
+                "apontamentos": apontamentos,
+                "total": len(apontamentos),
+                "next_cursor": next_cursor,
+            }
+        )
+    except AppError as e:
+        return _error_response(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# --------------------------------------------------------------------------
+# Detalhes completos da OF
+# --------------------------------------------------------------------------
+@laser_async_bp.get("/of/<string:of_id>/details")
+async def get_of_details_route(of_id):
+    try:
+        empresa = request.args.get("empresa")
+        codseq = request.args.get("codseq")
+
+        data = await service.get_of_details(of_id, empresa, codseq)
+
+        if not data:
+            return jsonify({"success": False, "error": "OF não encontrada"}), 404
+
+        return jsonify({"success": True, "data": data})
+
+    except AppError as e:
+        return _error_response(e)
+
+    except Exception as e:
+        return jsonify({"success": False, "error": f"Erro interno: {str(e)}"}), 500
+
+
+# --------------------------------------------------------------------------
+# GET /api/laser/events — alterações em tempo real (Server-Sent Events)
+# --------------------------------------------------------------------------
+@laser_async_bp.get("/events")
+async def stream_events():
+    try:
+        topics = schemas.validate_event_topics(request.args)
+    except AppError as e:
+        return _error_response(e)
+    sub = events.hub.subscribe(loop=asyncio.get_running_loop(), **topics)
+    response = Response(
+        events.sse_stream_async(sub),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Conexão de longa duração: sem o limite padrão de resposta do Quart
+    response.timeout = None
+    return response
@@ -2,6 +2,10 @@
 
 
 from core.exceptions import ValidationError
+from shared.pagination import decode_cursor
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
 
 
 def validate_operator_code(data: dict) -> str:
@@ -46,11 +50,21 @@ def validate_start_apontamento(data: dict) -> dict:
     return data
 
 
+def _int_field(data: dict, field: str) -> int:
+    value = data[field]
+    if isinstance(value, bool):
+        raise ValidationError(f"{field} deve ser um número inteiro")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{field} deve ser um número inteiro")
+
+
 def validate_pause_apontamento(data: dict) -> int:
     apontamento_id = data.get("apontamento_id")
     if not apontamento_id:
         raise ValidationError("ID do apontamento não informado")
-    return apontamento_id
+    return _int_field(data, "apontamento_id")
 
 
 def validate_finish_apontamento(data: dict) -> tuple:
@@ -58,7 +72,7 @@ def validate_finish_apontamento(data: dict) -> tuple:
     quantidade = data.get("quantidade_boa")
     if not apontamento_id or quantidade is None:
         raise ValidationError("Dados obrigatórios ausentes")
-    return apontamento_id, quantidade
+    return _int_field(data, "apontamento_id"), _int_field(data, "quantidade_boa")
 
 
 def validate_confirm_batch(data: dict) -> dict:
@@ -67,3 +81,85 @@ def validate_confirm_batch(data: dict) -> dict:
         if not data.get(field):
             raise ValidationError(f"Campo obrigatório ausente: {field}")
     return data
+
+
+def validate_of_details_batch(data: dict) -> list[tuple[str, str]]:
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise ValidationError("Lista de OFs não fornecida")
+    if len(items) > 500:
+        raise ValidationError("Máximo de 500 OFs por requisição")
+
+    pairs = []
+    for item in items:
+        if (
+            not isinstance(item, dict)
+            or not item.get("of_id")
+            or not item.get("codseq")
+        ):
+            raise ValidationError("Cada item precisa de of_id e codseq")
+        pairs.append((str(item["of_id"]), str(item["codseq"])))
+    return pairs
+
+
+def validate_pagination(args: dict) -> tuple[int | None, tuple | None, bool]:
+    """
+    Lê ?limit=, ?after= e ?stream= da listagem.
+    Retorna (limit, after, stream); limit None = lista completa (sem paginação).
+    """
+    stream = args.get("stream") in ("1", "true")
+    raw_limit = args.get("limit")
+    token = args.get("after")
+    if stream and (raw_limit or token):
+        raise ValidationError("stream não pode ser combinado com limit/after")
+
+    after = None
+    if token:
+        try:
+            after = decode_cursor(token)
+        except ValueError:
+            raise ValidationError("Cursor de paginação inválido")
+
+    if raw_limit is None:
+        limit = PAGE_SIZE_DEFAULT if after is not None else None
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValidationError("limit deve ser um número inteiro")
+        if not 1 <= limit <= PAGE_SIZE_MAX:
+            raise ValidationError(f"limit deve estar entre 1 e {PAGE_SIZE_MAX}")
+    return limit, after, stream
+
+
+def validate_projection(args: dict, allowed) -> tuple[tuple | None, bool]:
+    """
+    Lê ?fields=a,b,c e ?format=columns.
+    Retorna (campos na ordem de `allowed` ou None = todos, formato colunar?).
+    """
+    fmt = args.get("format", "objects")
+    if fmt not in ("objects", "columns"):
+        raise ValidationError("format deve ser 'objects' ou 'columns'")
+
+    raw = args.get("fields")
+    if raw is None:
+        return None, fmt == "columns"
+
+    requested = {f.strip() for f in raw.split(",") if f.strip()}
+    if not requested:
+        raise ValidationError("fields não pode ser vazio")
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValidationError(f"Campos não permitidos: {', '.join(sorted(unknown))}")
+    return tuple(f for f in allowed if f in requested), fmt == "columns"
+
+
+def validate_event_topics(args: dict) -> dict:
+    """?operator_code= e/ou ?of_id= da assinatura de eventos."""
+    topics = {
+        "operator_code": args.get("operator_code") or None,
+        "of_id": args.get("of_id") or None,
+    }
+    if not any(topics.values()):
+        raise ValidationError("Informe operator_code e/ou of_id")
+    return topics
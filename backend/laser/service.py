@@ -2,105 +2,711 @@
 
 
 import os
+import stat
+import logging
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from shared.cache import TTLCache
 from shared.utils import calc_end_datetime
-from core.exceptions import ConflictError, ValidationError, NotFoundError
-from laser import repository
-from .repository import fetch_of_details, fetch_of_materials
+from shared.pagination import encode_cursor
+from shared.batcher import GroupCommit
+from shared.journal import WriteJournal
+from shared.marks import TouchMarks
+from shared.snapshot import PartitionedSnapshot
+from core import metrics, statements
+from core.database import (
+    after_commit,
+    definitive_error,
+    run_callbacks,
+    unit_of_work,
+)
+from core.exceptions import (
+    ConflictError,
+    DatabaseError,
+    ValidationError,
+    NotFoundError,
+)
+from laser import events, repository, report_parser
+from laser.step_catalog import catalog as step_catalog
+
+# ---------------------------------------------------------------------------
+# Cache de sequenciamento por operador (TTL + LRU)
+# ---------------------------------------------------------------------------
+SEQUENCING_CACHE_TTL = float(os.getenv("SEQUENCING_CACHE_TTL", "30"))  # segundos
+SEQUENCING_CACHE_SIZE = int(os.getenv("SEQUENCING_CACHE_SIZE", "256"))
+
+# Arquivo SQLite com as marcas de escrita, dividido pelos workers: a escrita
+# confirmada em um invalida o cache de todos (serve.py define um padrão para
+# o gunicorn). Vazio = marcas só deste processo
+SEQUENCING_MARKS_SHARED = os.getenv("SEQUENCING_MARKS_SHARED", "")
+
+# Entradas são (início da leitura, tabela)
+_sequencing_cache = TTLCache(maxsize=SEQUENCING_CACHE_SIZE, ttl=SEQUENCING_CACHE_TTL)
+# Escritas confirmadas por operador: entrada cuja leitura começou antes da
+# marca (inclusive a que cruzou o commit) não vale mais
+sequencing_marks = TouchMarks(SEQUENCING_CACHE_TTL, SEQUENCING_MARKS_SHARED)
+
+# Com SEQUENCING_SNAPSHOT_INTERVAL > 0, uma thread lê o sequenciamento de
+# todos os operadores em uma consulta só e os terminais são servidos da
+# memória: a carga no banco não depende de quantos terminais estão abertos.
+SEQUENCING_SNAPSHOT_INTERVAL = float(
+    os.getenv("SEQUENCING_SNAPSHOT_INTERVAL", "0")
+)  # segundos
+# Retrato mais velho que isso (recarga falhando) não é servido
+SEQUENCING_SNAPSHOT_MAX_AGE = float(
+    os.getenv("SEQUENCING_SNAPSHOT_MAX_AGE", str(3 * SEQUENCING_SNAPSHOT_INTERVAL))
+)
+# Escritas dentro desta janela viram uma recarga só
+SEQUENCING_SNAPSHOT_MIN_GAP = float(os.getenv("SEQUENCING_SNAPSHOT_MIN_GAP", "1"))
+# Arquivo SQLite dividido pelos workers: um só consulta o banco, as escritas
+# valem para todos (serve.py define um padrão para o gunicorn)
+SEQUENCING_SNAPSHOT_SHARED = os.getenv("SEQUENCING_SNAPSHOT_SHARED", "")
+
+
+# Campos aceitos em ?fields=; STEP_DISPONIVEL é derivado de JPC_DESENHO_ENG
+SEQUENCING_FIELDS = (*repository.SEQUENCING_COLUMNS, "STEP_DISPONIVEL")
+
+
+def get_sequencing(operator_code: str, fields: tuple | None = None) -> tuple:
+    columns, rows, age = get_sequencing_table(operator_code, fields)
+    return [dict(zip(columns, row)) for row in rows], age
+
+
+def get_sequencing_table(operator_code: str, fields: tuple | None = None) -> tuple:
+    """
+    Sequenciamento como (colunas, linhas, idade). Vem do retrato em memória
+    quando ativo e em dia para o operador — idade em segundos; senão do
+    banco, com idade None. `fields` limita as colunas do SELECT; cada
+    conjunto de campos tem sua entrada no cache.
+    """
+    select = _sequencing_select(fields)
+    served = _from_snapshot(operator_code, select)
+    if served is not None:
+        table, age = served
+        return (*_with_step_availability(table, fields), age)
+    if sequencing_snapshot is not None:
+        # Fora do retrato (escrita recente, retrato ausente ou velho): direto do
+        # banco — o cache deste processo não vê escritas de outros workers
+        table = repository.fetch_sequencing(operator_code, select)
+        return (*_with_step_availability(table, fields), None)
+    key = (operator_code, select)
+    table = cached_sequencing(key)
+    if table is None:
+        started = time.time()
+        table = repository.fetch_sequencing(operator_code, select)
+        cache_sequencing(key, started, table)
+    return (*_with_step_availability(table, fields), None)
+
+
+def cached_sequencing(key: tuple) -> tuple | None:
+    """Tabela em cache, se nenhuma escrita do operador (em qualquer worker)
+    foi confirmada depois que a leitura começou."""
+    entry = _sequencing_cache.get(key)
+    if entry is None:
+        return None
+    started, table = entry
+    if not sequencing_marks.fresh(key[0], started):
+        _sequencing_cache.invalidate(key)
+        return None
+    return table
+
+
+def cache_sequencing(key: tuple, started: float, table: tuple) -> None:
+    """Guarda a leitura, a menos que uma escrita do operador tenha sido
+    confirmada enquanto ela rodava."""
+    if sequencing_marks.fresh(key[0], started):
+        _sequencing_cache.set(key, (started, table))
+
+
+def _from_snapshot(operator_code: str, select: tuple | None) -> tuple | None:
+    """((colunas, linhas), idade) do retrato, já projetado; None = ir ao banco."""
+    if sequencing_snapshot is None:
+        return None
+    found = sequencing_snapshot.lookup(operator_code)
+    if found is None:
+        return None
+    columns, rows, age = found
+    if select is not None:
+        names = repository.sequencing_query(select)[1]
+        at = [columns.index(n) for n in names]
+        columns, rows = names, [tuple(row[i] for i in at) for row in rows]
+    return (columns, rows), age
+
+
+def _sequencing_select(fields: tuple | None) -> tuple | None:
+    """Campos pedidos → colunas do SELECT (STEP_DISPONIVEL lê JPC_DESENHO_ENG)."""
+    if fields is None:
+        return None
+    select = [f for f in fields if f != "STEP_DISPONIVEL"]
+    if "STEP_DISPONIVEL" in fields and "JPC_DESENHO_ENG" not in select:
+        select.append("JPC_DESENHO_ENG")
+    return tuple(select)
+
+
+def _with_step_availability(table: tuple, fields: tuple | None) -> tuple:
+    # Disponibilidade do .step vem do catálogo em memória (None = desconhecida)
+    columns, rows = table
+    if fields is not None and "STEP_DISPONIVEL" not in fields:
+        return columns, rows
+    at = columns.index("JPC_DESENHO_ENG")
+    return (
+        [*columns, "STEP_DISPONIVEL"],
+        [(*row, step_catalog.exists(row[at])) for row in rows],
+    )
+
+
+def invalidate_sequencing(operator_code: str | None, on_commit=None) -> None:
+    """
+    Descarta o sequenciamento do operador quando a escrita for confirmada
+    (por `on_commit`, padrão after_commit). Antes do commit uma leitura
+    concorrente ainda veria os dados antigos e os guardaria no cache.
+    """
+    if operator_code:
+        (on_commit or after_commit)(partial(_evict_sequencing, str(operator_code)))
+
+
+def _evict_sequencing(operator_code: str) -> None:
+    # A marca vale para os outros workers; aqui a entrada já sai
+    sequencing_marks.touch(operator_code)
+    _sequencing_cache.invalidate_where(lambda key: key[0] == operator_code)
+    if sequencing_snapshot is not None:
+        # No retrato, o operador é lido do banco até a próxima recarga
+        sequencing_snapshot.touch(operator_code)
+
+
+def _fetch_sequencing_snapshot() -> tuple:
+    return repository.fetch_sequencing_snapshot()
+
+
+sequencing_snapshot = (
+    PartitionedSnapshot(
+        _fetch_sequencing_snapshot,
+        "JLB_CODERP",
+        SEQUENCING_SNAPSHOT_INTERVAL,
+        SEQUENCING_SNAPSHOT_MAX_AGE,
+        min_gap=SEQUENCING_SNAPSHOT_MIN_GAP,
+        name="sequencing-snapshot",
+        path=SEQUENCING_SNAPSHOT_SHARED,
+    )
+    if SEQUENCING_SNAPSHOT_INTERVAL > 0
+    else None
+)
+if sequencing_snapshot is not None:
+    metrics.register_snapshot("sequencing", sequencing_snapshot.age)
+
+
+# ---------------------------------------------------------------------------
+# Cache de dados de referência da OF (J_ROTOF / J_OFCONS)
+# ---------------------------------------------------------------------------
+OF_CACHE_TTL = float(os.getenv("OF_CACHE_TTL", "3600"))  # segundos
+OF_CACHE_SIZE = int(os.getenv("OF_CACHE_SIZE", "1024"))
+OF_CACHE_SWEEP_INTERVAL = float(os.getenv("OF_CACHE_SWEEP_INTERVAL", "300"))
+
+_of_details_cache = TTLCache(maxsize=OF_CACHE_SIZE, ttl=OF_CACHE_TTL)
+_of_materials_cache = TTLCache(maxsize=OF_CACHE_SIZE, ttl=OF_CACHE_TTL)
+_of_sweep_lock = threading.Lock()
+_of_last_sweep = time.monotonic()
+
+
+def _cached_of_details(of_id: str, codseq: str) -> dict | None:
+    key = (str(of_id), str(codseq))
+    details = _of_details_cache.get(key)
+    if details is None:
+        details = repository.fetch_of_details(of_id, codseq)
+        if details:
+            _of_details_cache.set(key, details)
+    return details
+
+
+def _cached_of_materials(of_id: str) -> list[dict]:
+    key = str(of_id)
+    materials = _of_materials_cache.get(key)
+    if materials is None:
+        materials = repository.fetch_of_materials(of_id)
+        _of_materials_cache.set(key, materials)
+    return materials
+
+
+def invalidate_of(of_id: str) -> int:
+    """Remove a OF dos caches de referência. Retorna quantas entradas saíram."""
+    of_id = str(of_id)
+    removed = _of_details_cache.invalidate_where(lambda k: k[0] == of_id)
+    removed += _of_materials_cache.invalidate_where(lambda k: k == of_id)
+    return removed
+
+
+def _sweep_closed_ofs() -> None:
+    """
+    Periodicamente, descarta do cache as OFs encerradas ou excluídas.
+    Roda no máximo uma vez a cada OF_CACHE_SWEEP_INTERVAL segundos. Falha
+    aqui só adia a limpeza: a requisição segue servida pelo cache.
+    """
+    global _of_last_sweep
+    if time.monotonic() - _of_last_sweep < OF_CACHE_SWEEP_INTERVAL:
+        return
+    if not _of_sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _of_last_sweep = time.monotonic()
+        cached = {k[0] for k in _of_details_cache.keys()}
+        cached.update(_of_materials_cache.keys())
+        if not cached:
+            return
+        try:
+            open_ids = repository.fetch_open_of_ids(sorted(cached))
+        except DatabaseError as e:
+            logging.warning("Cache de OFs: limpeza adiada: %s", e.message)
+            return
+        for of_id in cached - open_ids:
+            invalidate_of(of_id)
+    finally:
+        _of_sweep_lock.release()
+
+
+def cache_stats() -> dict:
+    return {
+        "sequencing": {**_sequencing_cache.stats(), **sequencing_marks.stats()},
+        "sequencing_snapshot": (
+            sequencing_snapshot.stats()
+            if sequencing_snapshot is not None
+            else {"enabled": False}
+        ),
+        "of_details": _of_details_cache.stats(),
+        "of_materials": _of_materials_cache.stats(),
+        "step_catalog": step_catalog.stats(),
+        "events": events.hub.stats(),
+        "statements": statements.stats(),
+        "group_commit": (
+            group_commit.stats() if group_commit is not None else {"enabled": False}
+        ),
+        "journal": journal.stats() if journal is not None else {"enabled": False},
+    }
 
-def get_sequencing(operator_code: str) -> list[dict]:
-    return repository.fetch_sequencing(operator_code)
 
+def get_step_file(file_path: str) -> dict:
+    """
+    Localiza o arquivo .step e lê tamanho e mtime com um stat na hora do
+    download — o catálogo em memória só responde se o arquivo existe (um
+    arquivo sobrescrito desde a última varredura teria o ETag antigo).
+    Retorna caminho, nome, tamanho, mtime e um ETag forte (mtime + tamanho).
+    """
+    if step_catalog.covers(file_path):
+        entry = step_catalog.lookup(file_path)
+        if entry is None:
+            raise NotFoundError(
+                "Arquivo .step não encontrado ou não é um arquivo válido"
+            )
+        file_path = entry["path"]
 
-def get_step_file(file_path: str):
-    """Retorna (file_path, file_name) se o arquivo existir."""
-    if not os.path.exists(file_path) or not os.path.isfile(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise NotFoundError("Arquivo .step não encontrado ou não é um arquivo válido")
-    return file_path, os.path.basename(file_path)
+    return {
+        "path": file_path,
+        "name": os.path.basename(file_path),
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "etag": f"{st.st_mtime_ns:x}-{st.st_size:x}",
+    }
 
 
 def submit_apontamento(data: dict) -> None:
     dt_inicio, dt_afim = calc_end_datetime(data["data_inicio"], data["tempo_total_pdf"])
-    repository.insert_apontamento(
-        of_numero=data["of_numero"],
-        operador_codigo=data["operador_codigo"],
-        dt_inicio=dt_inicio,
-        dt_afim=dt_afim,
-        soc_codseq=data["soc_codseq"],
-        quantidade_realizada=int(data["quantidade_realizada"]),
-        soc_empresa=data["soc_empresa"],
+    # Tipos conferidos aqui: com o diário, a escrita sai da requisição
+    row = statements.coerce(
+        repository.INSERT_APONTAMENTO,
+        {
+            "of_numero": data["of_numero"],
+            "operador_codigo": data["operador_codigo"],
+            "dt_inicio": dt_inicio,
+            "dt_afim": dt_afim,
+            "soc_codseq": data["soc_codseq"],
+            "quantidade_realizada": data["quantidade_realizada"],
+            "soc_empresa": data["soc_empresa"],
+        },
     )
+    if journal is not None:
+        journal.append("insert", row)
+        return
+    repository.insert_apontamento(**row)
+    invalidate_sequencing(data["operador_codigo"])
+    after_commit(events.publisher("submit", data["operador_codigo"], data["of_numero"]))
 
 
 def start_apontamento(data: dict) -> int:
-
-    open_ap = repository.fetch_open_apontamento(
-        data["operator_code"], data["empresa_id"]
+    """
+    Abre (ou reaproveita) o apontamento do operador em um único round-trip.
+    ConflictError se já houver um aberto em outra OF.
+    """
+    params = start_params(data)
+    (outcome, apontamento_id, open_of), on_commit = _transition("start", **params)
+    if (
+        outcome != "new"
+        and journal is not None
+        and journal.pending(str(apontamento_id))
+    ):
+        # Pausa/finalização ainda no diário: para o operador já está fechado
+        (outcome, apontamento_id, open_of), on_commit = _transition(
+            "start", **params, ignore_id=apontamento_id
+        )
+    return started(data, outcome, apontamento_id, open_of, on_commit)
+
+
+def start_params(data: dict) -> dict:
+    # Convertido aqui: pelo agrupador, o valor inválido vira 400 desta
+    # requisição em vez de erro no lote
+    binds = statements.coerce(
+        repository.START_APONTAMENTO,
+        repository.start_binds(
+            data["of_id"],
+            data["operator_code"],
+            data["empresa_id"],
+            data.get("operac", 1),
+        ),
     )
+    return {
+        "of_id": binds["of_id"],
+        "operator_code": binds["operator"],
+        "empresa_id": binds["empresa"],
+        "operac": binds["operac"],
+    }
 
-    if open_ap:
-
-        # Já está na mesma OF → reutiliza
-        if open_ap["SOF_CODIOF"] == data["of_id"]:
-            return open_ap["SOF_APONTAOFID"]
 
-        # Está em outra OF → bloqueia
+def started(data: dict, outcome: str, apontamento_id, open_of, on_commit) -> int:
+    """Resultado do bloco de início → id do apontamento (ou ConflictError)."""
+    if outcome == "conflict":
+        raise ConflictError(f"Operador já possui apontamento aberto na OF {open_of}.")
+    if outcome == "busy":
         raise ConflictError(
-            f"Operador já possui apontamento aberto na OF {open_ap['SOF_CODIOF']}."
+            "Outro início do mesmo operador está em andamento. Tente novamente."
+        )
+    if outcome == "new":
+        invalidate_sequencing(data["operator_code"], on_commit)
+        on_commit(
+            events.publisher(
+                "start", data["operator_code"], data["of_id"], apontamento_id
+            )
         )
+    return apontamento_id
 
-    return repository.insert_apontamento_start(
-        of_id=data["of_id"],
-        operator_code=data["operator_code"],
-        empresa_id=data["empresa_id"],
-        operac=data.get("operac", 1),
-    )
+
+def ensure_transition(apontamento_id: int, operator_code) -> None:
+    # UPDATE sem linha no RETURNING: inexistente, pausado ou encerrado
+    if operator_code is None:
+        raise ConflictError(
+            f"Apontamento {apontamento_id} não encontrado ou não está aberto."
+        )
 
 
 def pause_apontamento(apontamento_id: int) -> None:
-    repository.update_apontamento_pause(apontamento_id)
+    apontamento_id = statements.coerce(
+        repository.PAUSE_APONTAMENTO, {"id": apontamento_id}
+    )["id"]
+    if journal is not None:
+        journal.append(
+            "pause", {"id": apontamento_id, "at": _now()}, str(apontamento_id)
+        )
+        return
+    (operator_code, of_id), on_commit = _transition(
+        "pause", apontamento_id=apontamento_id
+    )
+    ensure_transition(apontamento_id, operator_code)
+    on_commit(events.publisher("pause", operator_code, of_id, apontamento_id))
 
 
 def finish_apontamento(apontamento_id: int, quantidade: int) -> None:
-    repository.update_apontamento_finish(apontamento_id, quantidade)
+    params = statements.coerce(
+        repository.FINISH_APONTAMENTO, {"id": apontamento_id, "qtd": quantidade}
+    )
+    apontamento_id, quantidade = params["id"], params["qtd"]
+    if journal is not None:
+        journal.append(
+            "finish",
+            {"id": apontamento_id, "qtd": quantidade, "at": _now()},
+            str(apontamento_id),
+        )
+        return
+    (operator_code, of_id), on_commit = _transition(
+        "finish", apontamento_id=apontamento_id, quantidade=quantidade
+    )
+    ensure_transition(apontamento_id, operator_code)
+    invalidate_sequencing(operator_code, on_commit)
+    on_commit(events.publisher("finish", operator_code, of_id, apontamento_id))
 
 
 def list_apontamentos(of_id: str) -> list[dict]:
     return repository.fetch_apontamentos_by_of(of_id)
 
 
-def confirm_batch(data: dict) -> int:
+def list_apontamentos_page(
+    of_id: str, limit: int, after: tuple | None
+) -> tuple[list[dict], str | None]:
+    """Página do histórico da OF e o cursor da próxima (None na última)."""
+    rows, next_key = repository.fetch_apontamentos_page(of_id, limit, after)
+    return rows, encode_cursor(*next_key) if next_key else None
+
+
+def iter_apontamentos(of_id: str):
+    return repository.iter_apontamentos_by_of(of_id)
+
+
+def job_fields() -> list[str]:
+    """Campos aceitos em ?fields= da rota legada: as colunas da view."""
+    return repository.jobs_columns()
+
+
+def list_jobs(
+    operator: str,
+    limit: int | None,
+    after: tuple | None,
+    fields: tuple | None = None,
+) -> tuple[list[str], list[tuple], str | None]:
+    """Lançamentos do operador (rota legada) e o cursor da próxima página."""
+    columns, rows, next_key = repository.fetch_jobs(operator, limit, after, fields)
+    return columns, rows, encode_cursor(*next_key) if next_key else None
+
+
+def iter_jobs(operator: str, fields: tuple | None = None):
+    return repository.iter_jobs(operator, fields)
+
+
+def confirm_batch(data: dict) -> dict:
+    """
+    Registra todos os itens do relatório em um único round trip.
+    Itens inválidos não abortam o lote: voltam em "rejected" com o índice.
+    """
     items = data.get("items", [])
-    processed = 0
+    rows = []
+    positions = []
+    rejected = []
 
-    for item in items:
+    for index, item in enumerate(items):
         try:
             dt_inicio, dt_afim = calc_end_datetime(
                 item["start_time"], item["total_time"]
             )
-            repository.insert_apontamento(
-                of_numero=data["apontamento_id"],
-                operador_codigo=data["operator_code"],
-                dt_inicio=dt_inicio,
-                dt_afim=dt_afim,
-                soc_codseq=data["soc_codseq"],
-                quantidade_realizada=int(item.get("qtd_apontar", 0)),
-                soc_empresa=data["soc_empresa"],
+            rows.append(
+                statements.coerce(
+                    repository.INSERT_APONTAMENTO,
+                    {
+                        "of_numero": data["apontamento_id"],
+                        "operador_codigo": data["operator_code"],
+                        "dt_inicio": dt_inicio,
+                        "dt_afim": dt_afim,
+                        "soc_codseq": data["soc_codseq"],
+                        "quantidade_realizada": item.get("qtd_apontar", 0),
+                        "soc_empresa": data["soc_empresa"],
+                    },
+                )
             )
-            processed += 1
-        except Exception as e:
-            # Loga e continua — item inválido não aborta o lote
-            print(f"[confirm_batch] Erro no item {item}: {e}")
+            positions.append(index)
+        except ValidationError as e:
+            rejected.append({"index": index, "error": e.message})
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            rejected.append({"index": index, "error": f"Item inválido: {e}"})
+
+    if journal is not None:
+        # Recusas do Oracle (batcherrors) ficam no diário como 'failed'
+        journal.append_many([("insert", row, None) for row in rows])
+        return {"processed": len(rows), "rejected": rejected}
+
+    for offset, message in repository.insert_apontamentos_batch(rows):
+        rejected.append({"index": positions[offset], "error": message})
+
+    rejected.sort(key=lambda r: r["index"])
+    invalidate_sequencing(data["operator_code"])
+    if rows:
+        after_commit(
+            events.publisher(
+                "confirm_batch", data["operator_code"], data["apontamento_id"]
+            )
+        )
+    return {"processed": len(items) - len(rejected), "rejected": rejected}
+
+
+# ---------------------------------------------------------------------------
+# Agrupamento de transições (group commit)
+# ---------------------------------------------------------------------------
+# Com GROUP_COMMIT_WINDOW_MS > 0, start/pause/finish que chegam dentro da
+# janela vão ao Oracle juntos: um executemany por tipo e um commit só.
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "0"))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+
+# Função avulsa do repositório para cada transição
+_TRANSITIONS = {
+    "start": "start_apontamento",
+    "pause": "update_apontamento_pause",
+    "finish": "update_apontamento_finish",
+}
 
-    return processed
+
+def _apply_transitions(items: list) -> list:
+    metrics.GROUP_COMMIT_SIZE.observe(len(items))
+    return repository.apply_transitions(items)
+
+
+def _run_now(callback) -> None:
+    run_callbacks([callback])
+
+
+def _transition(kind: str, **params) -> tuple:
+    """
+    Executa start/pause/finish e retorna (resultado, agendador de callbacks).
+    Pelo agrupador a escrita volta já confirmada e o callback roda na hora;
+    direto, fica para o commit da unidade de trabalho.
+    """
+    if group_commit is None:
+        return getattr(repository, _TRANSITIONS[kind])(**params), after_commit
+    return group_commit.submit(kind, params), _run_now
+
+
+group_commit = (
+    GroupCommit(
+        _apply_transitions, GROUP_COMMIT_WINDOW_MS / 1000, GROUP_COMMIT_MAX_BATCH
+    )
+    if GROUP_COMMIT_WINDOW_MS > 0
+    else None
+)
+
+
+# ---------------------------------------------------------------------------
+# Diário local de escritas (opcional)
+# ---------------------------------------------------------------------------
+# Com APONTAMENTO_JOURNAL definido, submit/pause/finish/confirm_batch gravam
+# em um SQLite local e respondem na hora; uma thread reaplica no Oracle.
+APONTAMENTO_JOURNAL = os.getenv("APONTAMENTO_JOURNAL", "")  # caminho do arquivo
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "100"))
+JOURNAL_INTERVAL = float(os.getenv("JOURNAL_INTERVAL", "1"))  # segundos
+JOURNAL_MAX_BACKOFF = float(os.getenv("JOURNAL_MAX_BACKOFF", "30"))  # segundos
+JOURNAL_SYNCHRONOUS = os.getenv("JOURNAL_SYNCHRONOUS", "FULL")
+
+
+def _now() -> datetime:
+    # Hora do gesto do operador, não a da reaplicação (DATE: sem fração)
+    return datetime.now().replace(microsecond=0)
+
+
+def _replay_journal(batch: list[dict]) -> dict:
+    """
+    Aplica um lote do diário em uma única transação. Inserções seguidas vão
+    em um executemany; pausa/finalização, uma a uma. Retorna {seq: erro} das
+    entradas recusadas em definitivo (dado inválido, restrição violada) — o
+    resto do lote é confirmado. Qualquer outro erro (conexão, deadlock, lock
+    timeout) derruba o lote inteiro, que é tentado de novo.
+
+    A reaplicação pode repetir entradas já confirmadas (queda entre o commit
+    no Oracle e a baixa no arquivo): inserções ignoram o apontamento que já
+    existe; pausa/finalização repetidas são recusadas pela guarda de estado.
+    """
+    rejected = {}
+    operators = set()
+    inserts = []
+
+    def flush_inserts():
+        rows = [row for _, row in inserts]
+        for offset, message in repository.insert_apontamentos_batch(rows, once=True):
+            if not definitive_error(message):
+                raise DatabaseError(f"Erro Oracle: {message}")
+            rejected[inserts[offset][0]] = message
+        for seq, row in inserts:
+            if seq not in rejected:
+                operators.add(str(row["operador_codigo"]))
+                after_commit(
+                    events.publisher("submit", row["operador_codigo"], row["of_numero"])
+                )
+        inserts.clear()
+
+    with unit_of_work():
+        for entry in batch:
+            seq, payload = entry["seq"], entry["payload"]
+            if entry["kind"] != "insert":
+                # Fora do try da entrada: erro do lote de inserções não é dela
+                flush_inserts()
+            try:
+                if entry["kind"] == "insert":
+                    # Entradas gravadas antes da validação na requisição
+                    row = _journal_params(
+                        repository.INSERT_APONTAMENTO,
+                        payload,
+                        repository.INSERT_APONTAMENTO.binds,
+                    )
+                    inserts.append((seq, row))
+                    continue
+                if entry["kind"] == "pause":
+                    params = _journal_params(
+                        repository.PAUSE_APONTAMENTO, payload, ("id", "at")
+                    )
+                    operator_code, of_id = repository.update_apontamento_pause(
+                        params["id"], params["at"]
+                    )
+                else:
+                    params = _journal_params(
+                        repository.FINISH_APONTAMENTO, payload, ("id", "qtd", "at")
+                    )
+                    operator_code, of_id = repository.update_apontamento_finish(
+                        params["id"], params["qtd"], params["at"]
+                    )
+            except ValidationError as e:
+                rejected[seq] = e.message
+                continue
+            except DatabaseError as e:
+                # O Oracle desfaz só o comando; erro transitório volta o lote
+                if not definitive_error(e.message):
+                    raise
+                rejected[seq] = e.message
+                continue
+            if operator_code is None:
+                rejected[seq] = "Apontamento não encontrado ou não está aberto"
+                continue
+            operators.add(str(operator_code))
+            after_commit(
+                events.publisher(entry["kind"], operator_code, of_id, params["id"])
+            )
+        flush_inserts()
+
+    for operator_code in operators:
+        invalidate_sequencing(operator_code)
+    return rejected
+
+
+def _journal_params(stmt, payload: dict, required) -> dict:
+    """Payload do diário conferido e nos tipos de `stmt` (ValidationError)."""
+    missing = [name for name in required if payload.get(name) is None]
+    if missing:
+        raise ValidationError(f"Entrada incompleta: {', '.join(missing)}")
+    return statements.coerce(stmt, payload)
+
+
+journal = (
+    WriteJournal(
+        APONTAMENTO_JOURNAL,
+        _replay_journal,
+        batch_size=JOURNAL_BATCH_SIZE,
+        interval=JOURNAL_INTERVAL,
+        max_backoff=JOURNAL_MAX_BACKOFF,
+        synchronous=JOURNAL_SYNCHRONOUS,
+    )
+    if APONTAMENTO_JOURNAL
+    else None
+)
+if journal is not None:
+    metrics.register_journal("apontamentos", journal.counts)
 
 
 def get_of_full_details(of_id: str, empresa: str, codseq: str) -> dict:
-    details = fetch_of_details(of_id, empresa, codseq)
+    _sweep_closed_ofs()
+    details = _cached_of_details(of_id, codseq)
 
     if not details:
         raise NotFoundError("OF não encontrada ou sem dados de operação.")
 
-    materials = fetch_of_materials(of_id)
+    materials = _cached_of_materials(of_id)
 
     return {
         "of_id": of_id,
@@ -111,12 +717,89 @@ def get_of_full_details(of_id: str, empresa: str, codseq: str) -> dict:
 
 
 def get_of_details(of_id, empresa, codseq):
-
-    details = fetch_of_details(of_id, codseq)
+    _sweep_closed_ofs()
+    details = _cached_of_details(of_id, codseq)
 
     if not details:
         return None
 
-    materials = fetch_of_materials(of_id)
+    materials = _cached_of_materials(of_id)
 
     return {**details, "materiais": materials}
+
+
+def get_of_details_batch(pairs: list[tuple[str, str]]) -> list[dict]:
+    """
+    Detalhes de várias OFs de uma vez. O que não estiver em cache é buscado
+    em consultas por conjunto (roteiro e materiais), não OF a OF.
+    """
+    _sweep_closed_ofs()
+    pairs = list(dict.fromkeys(pairs))
+
+    details = {}
+    missing_details = []
+    for pair in pairs:
+        cached = _of_details_cache.get(pair)
+        if cached is None:
+            missing_details.append(pair)
+        else:
+            details[pair] = cached
+
+    for pair, value in repository.fetch_of_details_batch(missing_details).items():
+        _of_details_cache.set(pair, value)
+        details[pair] = value
+
+    materials = {}
+    missing_materials = []
+    for of_id in dict.fromkeys(of_id for of_id, _ in pairs):
+        cached = _of_materials_cache.get(of_id)
+        if cached is None:
+            missing_materials.append(of_id)
+        else:
+            materials[of_id] = cached
+
+    for of_id, value in repository.fetch_of_materials_batch(missing_materials).items():
+        _of_materials_cache.set(of_id, value)
+        materials[of_id] = value
+
+    result = []
+    for of_id, codseq in pairs:
+        found = details.get((of_id, codseq))
+        data = {**found, "materiais": materials.get(of_id, [])} if found else None
+        result.append(
+            {"of_id": of_id, "codseq": codseq, "found": found is not None, "data": data}
+        )
+    return result
+
+
+def parse_laser_reports(uploads: list) -> dict:
+    """
+    Lê os relatórios PDF enviados (objetos com .filename e .save()).
+    Cada arquivo vai para disco temporário e é processado no pool de
+    processos; `items` sai no formato esperado por confirm_batch.
+    """
+    if not uploads:
+        raise ValidationError("PDF não enviado")
+
+    tmp_dir = tempfile.mkdtemp(prefix="laser_reports_")
+    try:
+        files = []
+        for index, upload in enumerate(uploads):
+            path = os.path.join(tmp_dir, f"{index}.pdf")
+            upload.save(path)
+            files.append((upload.filename or f"{index}.pdf", path))
+
+        results = report_parser.parse_reports(files)
+    finally:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+    items = []
+    rejected = []
+    for index, result in enumerate(results):
+        if result.pop("success"):
+            items.append(result)
+        else:
+            rejected.append({"index": index, **result})
+    return {"items": items, "rejected": rejected}
@@ -0,0 +1,115 @@
+## backend/laser/service_async.py
+
+import time
+import asyncio
+
+from core.database_async import after_commit
+from laser import repository_async as repository
+from laser import events, service
+from shared.pagination import encode_cursor
+
+# Regras de laser/service.py para a camada assíncrona. Os caches em memória
+# são os mesmos da versão síncrona.
+
+SEQUENCING_FIELDS = service.SEQUENCING_FIELDS
+
+
+async def get_sequencing(operator_code: str, fields: tuple | None = None) -> tuple:
+    columns, rows, age = await get_sequencing_table(operator_code, fields)
+    return [dict(zip(columns, row)) for row in rows], age
+
+
+async def get_sequencing_table(
+    operator_code: str, fields: tuple | None = None
+) -> tuple:
+    select = service._sequencing_select(fields)
+    served = service._from_snapshot(operator_code, select)
+    if served is not None:
+        table, age = served
+        return (*service._with_step_availability(table, fields), age)
+    if service.sequencing_snapshot is not None:
+        table = await repository.fetch_sequencing(operator_code, select)
+        return (*service._with_step_availability(table, fields), None)
+    key = (operator_code, select)
+    table = service.cached_sequencing(key)
+    if table is None:
+        started = time.time()
+        table = await repository.fetch_sequencing(operator_code, select)
+        service.cache_sequencing(key, started, table)
+    return (*service._with_step_availability(table, fields), None)
+
+
+async def _transition(kind: str, **params) -> tuple:
+    # Como service._transition; o agrupador é síncrono e roda em uma thread
+    if service.group_commit is None:
+        call = getattr(repository, service._TRANSITIONS[kind])
+        return await call(**params), after_commit
+    result = await asyncio.to_thread(service.group_commit.submit, kind, params)
+    return result, service._run_now
+
+
+async def start_apontamento(data: dict) -> int:
+    params = service.start_params(data)
+    (outcome, apontamento_id, open_of), on_commit = await _transition("start", **params)
+    if outcome != "new" and service.journal is not None:
+        if await asyncio.to_thread(service.journal.pending, str(apontamento_id)):
+            (outcome, apontamento_id, open_of), on_commit = await _transition(
+                "start", **params, ignore_id=apontamento_id
+            )
+    return service.started(data, outcome, apontamento_id, open_of, on_commit)
+
+
+async def pause_apontamento(apontamento_id: int) -> None:
+    if service.journal is not None:
+        # Gravação local (SQLite) fora do loop
+        await asyncio.to_thread(service.pause_apontamento, apontamento_id)
+        return
+    (operator_code, of_id), on_commit = await _transition(
+        "pause", apontamento_id=apontamento_id
+    )
+    service.ensure_transition(apontamento_id, operator_code)
+    on_commit(events.publisher("pause", operator_code, of_id, apontamento_id))
+
+
+async def finish_apontamento(apontamento_id: int, quantidade: int) -> None:
+    if service.journal is not None:
+        await asyncio.to_thread(service.finish_apontamento, apontamento_id, quantidade)
+        return
+    (operator_code, of_id), on_commit = await _transition(
+        "finish", apontamento_id=apontamento_id, quantidade=quantidade
+    )
+    service.ensure_transition(apontamento_id, operator_code)
+    service.invalidate_sequencing(operator_code, on_commit)
+    on_commit(events.publisher("finish", operator_code, of_id, apontamento_id))
+
+
+async def list_apontamentos(of_id: str) -> list[dict]:
+    return await repository.fetch_apontamentos_by_of(of_id)
+
+
+async def list_apontamentos_page(
+    of_id: str, limit: int, after: tuple | None
+) -> tuple[list[dict], str | None]:
+    rows, next_key = await repository.fetch_apontamentos_page(of_id, limit, after)
+    return rows, encode_cursor(*next_key) if next_key else None
+
+
+def iter_apontamentos(of_id: str):
+    return repository.iter_apontamentos_by_of(of_id)
+
+
+async def get_of_details(of_id, empresa, codseq):
+    key = (str(of_id), str(codseq))
+    details = service._of_details_cache.get(key)
+    if details is None:
+        details = await repository.fetch_of_details(of_id, codseq)
+        if not details:
+            return None
+        service._of_details_cache.set(key, details)
+
+    materials = service._of_materials_cache.get(str(of_id))
+    if materials is None:
+        materials = await repository.fetch_of_materials(of_id)
+        service._of_materials_cache.set(str(of_id), materials)
+
+    return {**details, "materiais": materials}
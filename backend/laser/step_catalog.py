@@ -0,0 +1,181 @@
+## backend/laser/step_catalog.py
+
+import os
+import logging
+import threading
+import time
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+# Diretórios indexados, separados por os.pathsep (";" no Windows)
+STEP_ROOTS = [r for r in os.getenv("STEP_ROOTS", "").split(os.pathsep) if r]
+STEP_SCAN_INTERVAL = float(os.getenv("STEP_SCAN_INTERVAL", "60"))  # segundos
+# A cada N varreduras incrementais, uma completa (arquivos sobrescritos no
+# lugar não alteram o mtime do diretório)
+STEP_FULL_SCAN_EVERY = int(os.getenv("STEP_FULL_SCAN_EVERY", "10"))
+
+
+def normalize_step_path(path: str) -> str:
+    """Forma canônica usada como chave: com extensão .step, normpath e normcase."""
+    path = path.strip()
+    if not path.lower().endswith(".step"):
+        path = f"{path}.step"
+    return os.path.normcase(os.path.normpath(path))
+
+
+class StepCatalog:
+    """
+    Índice em memória dos arquivos .step disponíveis nos compartilhamentos.
+
+    Uma thread em segundo plano revarre periodicamente as raízes; só os
+    diretórios cujo mtime mudou são relidos. Os índices são reconstruídos e
+    trocados de uma vez, então as consultas nunca tocam o disco.
+    """
+
+    def __init__(self, roots: list[str], interval: float, full_scan_every: int):
+        self.roots = [os.path.normcase(os.path.normpath(r)) for r in roots]
+        self.interval = interval
+        self.full_scan_every = max(1, full_scan_every)
+        self._dirs: dict = {}  # dir -> (mtime, [subdirs], {chave: entrada})
+        self._by_path: dict = {}
+        self._scans = 0
+        self._last_scan = None
+        self._last_scan_seconds = None
+        self._thread = None
+        self._fork_hook = False
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+
+    # -----------------------------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------------------------
+    @property
+    def enabled(self) -> bool:
+        return bool(self.roots)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def covers(self, path: str) -> bool:
+        """O caminho está sob uma raiz indexada e o índice já foi montado?"""
+        if not self.ready:
+            return False
+        key = normalize_step_path(path)
+        return any(key == r or key.startswith(r + os.sep) for r in self.roots)
+
+    def lookup(self, path: str) -> dict | None:
+        return self._by_path.get(normalize_step_path(path))
+
+    def exists(self, path: str | None) -> bool | None:
+        """True/False se o índice cobre o caminho; None se não sabe."""
+        if not path or not self.covers(path):
+            return None
+        return self.lookup(path) is not None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "roots": self.roots,
+            "files": len(self._by_path),
+            "directories": len(self._dirs),
+            "scans": self._scans,
+            "last_scan": self._last_scan,
+            "last_scan_seconds": self._last_scan_seconds,
+        }
+
+    # -----------------------------------------------------------------------
+    # Varredura
+    # -----------------------------------------------------------------------
+    def _read_dir(self, directory: str) -> tuple[list, dict]:
+        subdirs = []
+        files = {}
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(".step"):
+                        st = entry.stat()
+                        files[normalize_step_path(entry.path)] = {
+                            "path": entry.path,
+                            "name": entry.name,
+                            "size": st.st_size,
+                            "mtime": st.st_mtime,
+                            "mtime_ns": st.st_mtime_ns,
+                        }
+                except OSError as e:
+                    logging.warning("Catálogo STEP: erro ao ler %s: %s", entry.path, e)
+        return subdirs, files
+
+    def scan(self, full: bool = False) -> None:
+        """Atualiza o índice, relendo só os diretórios alterados (ou todos)."""
+        started = time.monotonic()
+        dirs = {}
+        pending = list(self.roots)
+
+        while pending:
+            directory = pending.pop()
+            cached = self._dirs.get(directory)
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+                if cached is not None and cached[0] == mtime and not full:
+                    subdirs, files = cached[1], cached[2]
+                else:
+                    subdirs, files = self._read_dir(directory)
+            except OSError as e:
+                # Falha momentânea no compartilhamento: mantém o que já se sabia
+                logging.warning("Catálogo STEP: erro ao ler %s: %s", directory, e)
+                if cached is None:
+                    continue
+                mtime, subdirs, files = cached
+
+            dirs[directory] = (mtime, subdirs, files)
+            pending.extend(subdirs)
+
+        by_path = {}
+        for _, _, files in dirs.values():
+            by_path.update(files)
+
+        # Troca atômica: leitores veem o índice antigo ou o novo, nunca um parcial
+        self._dirs, self._by_path = dirs, by_path
+        self._scans += 1
+        self._last_scan = time.time()
+        self._last_scan_seconds = round(time.monotonic() - started, 3)
+        self._ready.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scan(full=self._scans % self.full_scan_every == 0)
+            except Exception as e:
+                logging.error("Catálogo STEP: falha na varredura: %s", e)
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Inicia a varredura em segundo plano (idempotente)."""
+        if not self.enabled or self._thread is not None:
+            return
+        if hasattr(os, "register_at_fork") and not self._fork_hook:
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        self._thread = threading.Thread(
+            target=self._run, name="step-catalog", daemon=True
+        )
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # Threads não sobrevivem ao fork (gunicorn --preload): o worker herda
+        # o índice já montado e reinicia a própria varredura
+        if self._thread is not None:
+            self._thread = None
+            self._stop = threading.Event()
+            self.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+catalog = StepCatalog(STEP_ROOTS, STEP_SCAN_INTERVAL, STEP_FULL_SCAN_EVERY)
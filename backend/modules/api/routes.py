@@ -2,9 +2,40 @@
 
 from flask import Blueprint, jsonify, request, abort
 from flask_login import current_user
-from core.database import get_connection
+from core.database import acquire, release
+from core.exceptions import AppError, ValidationError
+from core.statements import MANY, ONE, statement, bind, timed
+from laser import service
+from laser import schemas
+from shared.http_cache import conditional_json
+from shared.streaming import stream_json
+from laser.step_catalog import catalog as step_catalog
 
 api_bp = Blueprint("api_bp", __name__, url_prefix="/api")
+api_bp.after_request(conditional_json)
+
+LEGACY_SEQUENCING_QUERY = """
+    SELECT
+        OF_NUMERO,
+        SEQUENCIA,
+        QUANTIDADE,
+        COD_PRODUTO,
+        DESCRICAO_PRODUTO,
+        CAMINHO_STEP
+    FROM VW_SEQ_LASER
+    WHERE SOC_COLABID = :id
+      AND CAMINHO_STEP IS NOT NULL
+"""
+OPERADOR_QUERY = """
+    SELECT CLB_CODIGO, CLB_NOMECB
+    FROM F_COLAB
+    WHERE CLB_CODIGO = :codigo
+"""
+
+LEGACY_SEQUENCING = statement(
+    "legacy_sequencing", LEGACY_SEQUENCING_QUERY, MANY, arraysize=500
+)
+OPERADOR = statement("operador", OPERADOR_QUERY, ONE)
 
 
 # ---------------------------------------------------------------------------
@@ -26,27 +57,19 @@ def get_sequenciamento():
     if not operator:
         return jsonify({"success": False, "error": "Operador não especificado"}), 400
 
+    conn = None
     try:
-        conn = get_connection()
+        conn = acquire()
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                OF_NUMERO,
-                SEQUENCIA,
-                QUANTIDADE,
-                COD_PRODUTO,
-                DESCRICAO_PRODUTO,
-                CAMINHO_STEP
-            FROM VW_SEQ_LASER
-            WHERE SOC_COLABID = :id
-              AND CAMINHO_STEP IS NOT NULL
-            """,
-            {"id": operator},
-        )
+        with timed(LEGACY_SEQUENCING, cursor):
+            cursor.execute(
+                LEGACY_SEQUENCING.sql,
+                bind(cursor, LEGACY_SEQUENCING, {"id": operator}),
+            )
+            rows = cursor.fetchall()
 
         jobs = []
-        for of_num, seq, qty, prod, desc, step in cursor:
+        for of_num, seq, qty, prod, desc, step in rows:
             if not step.lower().endswith(".step"):
                 step = f"{step}.step"
             jobs.append(
@@ -57,15 +80,17 @@ def get_sequenciamento():
                     "produto": prod,
                     "descricao": desc,
                     "stepPath": step,
+                    "stepDisponivel": step_catalog.exists(step),
                 }
             )
 
         cursor.close()
-        conn.close()
         return jsonify({"success": True, "jobs": jobs})
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        release(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -73,14 +98,15 @@ def get_sequenciamento():
 # ---------------------------------------------------------------------------
 @api_bp.route("/laser/complete", methods=["POST"])
 def complete_job():
-    if "pdf" not in request.files:
+    files = request.files.getlist("pdf")
+    if not files:
         return jsonify({"success": False, "error": "PDF não enviado"}), 400
 
-    file = request.files["pdf"]
     try:
-        # TODO: implementar process_file_upload e salvar apontamento
-        result = process_file_upload(file)  # noqa: F821
+        result = service.parse_laser_reports(files)
         return jsonify({"success": True, "data": result})
+    except AppError as e:
+        return jsonify({"success": False, "error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -90,20 +116,14 @@ def complete_job():
 # ---------------------------------------------------------------------------
 @api_bp.route("/operadores/<codigo>", methods=["GET"])
 def get_operador(codigo):
+    conn = None
     try:
-        conn = get_connection()
+        conn = acquire()
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT CLB_CODIGO, CLB_NOMECB
-            FROM F_COLAB
-            WHERE CLB_CODIGO = :codigo
-            """,
-            {"codigo": codigo},
-        )
-        row = cursor.fetchone()
+        with timed(OPERADOR, cursor):
+            cursor.execute(OPERADOR.sql, bind(cursor, OPERADOR, {"codigo": codigo}))
+            row = cursor.fetchone()
         cursor.close()
-        conn.close()
 
         if not row:
             return jsonify({"success": False, "error": "Operador não encontrado"}), 404
@@ -112,6 +132,8 @@ def get_operador(codigo):
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        release(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -124,22 +146,25 @@ def get_jobs():
         return jsonify({"success": False, "error": "Operador não especificado"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT *
-            FROM VW_APONTAMENTO_LASER
-            WHERE OPERADOR = :operator
-            ORDER BY DATA_LANCAMENTO DESC
-            """,
-            {"operator": operator},
-        )
-        cols = [col[0].lower() for col in cursor.description]
-        jobs = [dict(zip(cols, row)) for row in cursor]
-        cursor.close()
-        conn.close()
-        return jsonify({"success": True, "jobs": jobs})
-
+        limit, after, stream = schemas.validate_pagination(request.args)
+        # As colunas da view só são consultadas se ?fields= vier
+        allowed = service.job_fields() if "fields" in request.args else ()
+        fields, columnar = schemas.validate_projection(request.args, allowed)
+        if stream:
+            if columnar:
+                raise ValidationError("stream não suporta format=columns")
+            return stream_json("jobs", service.iter_jobs(operator, fields))
+
+        columns, rows, next_cursor = service.list_jobs(operator, limit, after, fields)
+        if columnar:
+            body = {"success": True, "columns": columns, "jobs": rows}
+        else:
+            body = {"success": True, "jobs": [dict(zip(columns, r)) for r in rows]}
+        if limit is not None:
+            body["next_cursor"] = next_cursor
+        return jsonify(body)
+
+    except AppError as e:
+        return jsonify({"success": False, "error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,135 @@
+## backend/serve.py
+
+"""
+Ponto de entrada de produção.
+
+* Linux: gunicorn com N processos x M threads e --preload (pool, caches e
+  índices são montados uma vez no processo mestre e herdados pelos workers).
+* Windows: waitress (um processo, M threads) — gunicorn não roda no Windows.
+* SERVER_IMPL=hypercorn: ASGI (asgi.py) — rotas assíncronas no event loop,
+  demais rotas do Flask em threads. Exige DB_THIN_MODE=1.
+
+Uso:
+    python serve.py
+    SERVER_WORKERS=4 SERVER_THREADS=8 python serve.py
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5050"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(min(4, os.cpu_count() or 1))))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+# Segundos para concluir requisições em andamento ao receber SIGTERM
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "120"))
+
+
+def run_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    # Retrato do sequenciamento dividido entre os workers (um só consulta o
+    # banco; escrita em um worker vale para todos)
+    os.environ.setdefault(
+        "SEQUENCING_SNAPSHOT_SHARED",
+        os.path.join(tempfile.gettempdir(), f"laser-sequencing-{SERVER_PORT}.db"),
+    )
+    # Sem o retrato: escrita em um worker invalida o cache dos demais
+    os.environ.setdefault(
+        "SEQUENCING_MARKS_SHARED",
+        os.path.join(tempfile.gettempdir(), f"laser-marks-{SERVER_PORT}.db"),
+    )
+
+    # Eventos gravados em um worker chegam aos terminais dos demais
+    os.environ.setdefault(
+        "EVENTS_SHARED",
+        os.path.join(tempfile.gettempdir(), f"laser-events-{SERVER_PORT}.db"),
+    )
+
+    # O app é importado no mestre (preload_app); o que só deve rodar nos
+    # workers começa no post_fork
+    os.environ["SERVER_PRELOAD"] = "1"
+
+    def post_fork(server, worker):
+        from app import start_journal
+
+        start_journal()
+
+    class LaserApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+
+            return app
+
+    LaserApplication(
+        {
+            "bind": f"{SERVER_HOST}:{SERVER_PORT}",
+            "workers": SERVER_WORKERS,
+            "threads": SERVER_THREADS,
+            "worker_class": "gthread",
+            "preload_app": True,
+            "post_fork": post_fork,
+            "graceful_timeout": SERVER_GRACEFUL_TIMEOUT,
+            "timeout": SERVER_TIMEOUT,
+            "accesslog": os.getenv("SERVER_ACCESS_LOG") or None,
+        }
+    ).run()
+
+
+def run_waitress():
+    from waitress import serve
+    from app import app
+
+    logging.info(
+        "waitress em %s:%s (%s threads)", SERVER_HOST, SERVER_PORT, SERVER_THREADS
+    )
+    serve(
+        app,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        threads=SERVER_THREADS,
+        channel_timeout=SERVER_TIMEOUT,
+    )
+
+
+def run_hypercorn():
+    import asyncio
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+    from asgi import application
+
+    config = Config()
+    config.bind = [f"{SERVER_HOST}:{SERVER_PORT}"]
+    config.graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+    config.accesslog = os.getenv("SERVER_ACCESS_LOG") or None
+    asyncio.run(serve(application, config))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    # Nunca com debugger em produção
+    os.environ["FLASK_DEBUG"] = "0"
+    server = os.getenv("SERVER_IMPL") or ("waitress" if os.name == "nt" else "gunicorn")
+    if server == "gunicorn":
+        run_gunicorn()
+    elif server == "hypercorn":
+        run_hypercorn()
+    else:
+        run_waitress()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+## backend/shared/batcher.py
+
+import threading
+
+
+class _Item:
+    __slots__ = ("kind", "params", "done", "result", "error")
+
+    def __init__(self, kind: str, params: dict):
+        self.kind = kind
+        self.params = params
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommit:
+    """
+    Agrupa chamadas concorrentes em uma única execução.
+
+    A primeira chamada de uma rodada vira líder: espera `window` segundos
+    (ou até juntar `max_batch` itens), tira a fila e executa tudo com
+    `execute([(tipo, params)])`, que devolve um resultado por item — uma
+    exceção no lugar do resultado vale só para aquele item. Se `execute`
+    levantar (e, portanto, nada confirmar), cada item é reexecutado sozinho
+    e o erro fica com quem o causou. As demais
+    chamadas esperam o líder e recebem o próprio resultado. Não há thread
+    de fundo: sem concorrência, o custo é só a janela.
+    """
+
+    def __init__(self, execute, window: float, max_batch: int = 64):
+        self.execute = execute
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._lock = threading.Lock()
+        self._pending: list = []
+        self._full = threading.Event()
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    def submit(self, kind: str, params: dict):
+        item = _Item(kind, params)
+        with self._lock:
+            self._pending.append(item)
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+            full = self._full
+
+        if leader:
+            full.wait(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._full = threading.Event()
+            self._run(batch)
+        else:
+            item.done.wait()
+
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _execute_each(self, batch: list) -> list:
+        # Lote recusado por inteiro: um item de cada vez
+        results = []
+        for item in batch:
+            try:
+                results.append(self.execute([(item.kind, item.params)])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _run(self, batch: list) -> None:
+        results = None
+        try:
+            try:
+                results = self.execute([(i.kind, i.params) for i in batch])
+            except Exception as e:
+                results = self._execute_each(batch) if len(batch) > 1 else [e]
+        finally:
+            # Ninguém fica esperando, nem se o líder for interrompido
+            for index, item in enumerate(batch):
+                if results is None:
+                    item.error = RuntimeError("Lote interrompido")
+                elif isinstance(results[index], Exception):
+                    item.error = results[index]
+                else:
+                    item.result = results[index]
+                item.done.set()
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "window_ms": round(self.window * 1000, 1),
+                "max_batch": self.max_batch,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch": round(self.items / self.batches, 2) if self.batches else 0,
+                "largest_batch": self.largest,
+            }
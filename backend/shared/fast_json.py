@@ -0,0 +1,108 @@
+## backend/shared/fast_json.py
+
+"""
+Serialização JSON das respostas (Flask e Quart) com orjson.
+
+Tipos vindos do Oracle têm tratamento único em todas as rotas:
+
+* datetime/date → JSON_DATETIME_FORMAT / JSON_DATE_FORMAT ("iso" = ISO 8601)
+* Decimal → int quando inteiro, senão float
+* LOB → conteúdo (CLOB como texto, BLOB em base64); bytes → base64
+
+Sem orjson instalado, cai para o json da biblioteca padrão com as mesmas regras.
+"""
+
+import os
+import json
+import base64
+import datetime
+from decimal import Decimal
+
+import oracledb
+
+try:
+    import orjson
+except ImportError:  # opcional — mesmo formato, só mais lento
+    orjson = None
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+# Padrão = formato que o front já exibia (TO_CHAR 'DD/MM/YYYY HH24:MI:SS')
+JSON_DATETIME_FORMAT = os.getenv("JSON_DATETIME_FORMAT", "%d/%m/%Y %H:%M:%S")
+JSON_DATE_FORMAT = os.getenv("JSON_DATE_FORMAT", "%d/%m/%Y")
+
+_ISO = JSON_DATETIME_FORMAT.lower() == "iso"
+
+
+def default(obj):
+    """Tipos que o encoder não conhece nativamente."""
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat() if _ISO else obj.strftime(JSON_DATETIME_FORMAT)
+    if isinstance(obj, datetime.date):
+        return obj.isoformat() if _ISO else obj.strftime(JSON_DATE_FORMAT)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, oracledb.LOB):
+        return default(obj.read()) if obj.type is oracledb.DB_TYPE_BLOB else obj.read()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+
+if orjson is not None:
+    # PASSTHROUGH_DATETIME: datas passam por default() para seguir o formato
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | (
+        0 if _ISO else orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def dumps_bytes(obj, indent: bool = False) -> bytes:
+        options = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+        return orjson.dumps(obj, default=default, option=options)
+
+    def loads(s):
+        return orjson.loads(s)
+
+else:
+
+    def dumps_bytes(obj, indent: bool = False) -> bytes:
+        text = json.dumps(
+            obj,
+            default=default,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        )
+        return text.encode("utf-8")
+
+    def loads(s):
+        return json.loads(s)
+
+
+def dumps(obj, indent: bool = False) -> str:
+    return dumps_bytes(obj, indent).decode("utf-8")
+
+
+def provider_class(base):
+    """
+    Provider para `app.json` a partir do DefaultJSONProvider do framework
+    (flask.json.provider ou quart.json.provider).
+    """
+
+    class FastJSONProvider(base):
+        def dumps(self, obj, **kwargs) -> str:
+            return dumps(obj, indent=bool(kwargs.get("indent")))
+
+        def loads(self, s, **kwargs):
+            return loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            return self._app.response_class(
+                dumps_bytes(obj, indent), mimetype=self.mimetype
+            )
+
+    return FastJSONProvider
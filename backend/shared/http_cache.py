@@ -0,0 +1,96 @@
+## backend/shared/http_cache.py
+
+"""
+ETag/304 e compressão para as respostas JSON dos blueprints.
+
+O ETag (fraco) é o hash do corpo serializado: se o terminal já tem a mesma
+resposta, recebe 304 sem corpo. Corpos acima do limite são comprimidos com
+brotli (se instalado) ou gzip, conforme o Accept-Encoding.
+"""
+
+import os
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # opcional — sem ele, só gzip
+    brotli = None
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+JSON_COMPRESS_MIN_SIZE = int(os.getenv("JSON_COMPRESS_MIN_SIZE", "1024"))  # bytes
+JSON_GZIP_LEVEL = int(os.getenv("JSON_GZIP_LEVEL", "6"))
+JSON_BROTLI_QUALITY = int(os.getenv("JSON_BROTLI_QUALITY", "5"))
+
+
+def body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def choose_encoding(accept_encoding) -> str | None:
+    """Melhor codificação aceita pelo cliente (werkzeug MIMEAccept/Accept)."""
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=JSON_GZIP_LEVEL)
+
+
+def _eligible(response, buffered: bool) -> bool:
+    return (
+        buffered
+        and response.status_code == 200
+        and response.mimetype == "application/json"
+        and "Content-Encoding" not in response.headers
+    )
+
+
+def _finish(response, request, body: bytes) -> bool:
+    """Aplica ETag/304 e compressão. Retorna False se virou 304."""
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+
+    if request.method in ("GET", "HEAD"):
+        etag = body_etag(body)
+        response.set_etag(etag, weak=True)
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            response.set_data(b"")
+            response.headers.pop("Content-Type", None)
+            response.headers.pop("Content-Length", None)
+            return False
+
+    if len(body) >= JSON_COMPRESS_MIN_SIZE:
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding:
+            response.set_data(compress(body, encoding))
+            response.headers["Content-Encoding"] = encoding
+    return True
+
+
+def conditional_json(response):
+    """after_request dos blueprints Flask."""
+    from flask import request
+
+    buffered = not response.is_streamed and not response.direct_passthrough
+    if _eligible(response, buffered):
+        _finish(response, request, response.get_data())
+    return response
+
+
+async def conditional_json_async(response):
+    """after_request do blueprint Quart."""
+    from quart import request
+    from quart.wrappers.response import DataBody
+
+    if _eligible(response, isinstance(response.response, DataBody)):
+        _finish(response, request, await response.get_data())
+    return response
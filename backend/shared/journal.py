@@ -0,0 +1,303 @@
+## backend/shared/journal.py
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import datetime
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind     TEXT    NOT NULL,
+    key      TEXT,
+    payload  TEXT    NOT NULL,
+    created  REAL    NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status   TEXT    NOT NULL DEFAULT 'pending',
+    error    TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_status ON entries (status, seq);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (key) WHERE key IS NOT NULL;
+CREATE TABLE IF NOT EXISTS lease (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    owner   TEXT,
+    expires REAL
+);
+"""
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Tipo não suportado no diário: {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+class WriteJournal:
+    """
+    Diário local de escritas em SQLite (modo WAL).
+
+    append() grava a operação em disco e retorna: quem chamou não espera o
+    banco remoto. Uma thread em segundo plano reaplica as entradas na ordem de
+    chegada, em lotes, por `apply(lote)`; se `apply` levantar exceção o lote
+    inteiro é tentado de novo, com espera crescente. `apply` devolve
+    {seq: mensagem} das entradas recusadas de vez — ficam com status
+    'failed' para conferência; as demais são apagadas.
+
+    Vários processos podem dividir o arquivo (workers do gunicorn): só quem
+    detém a concessão da tabela `lease` drena, o que preserva a ordem.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        apply,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_backoff: float = 30.0,
+        lease: float = 60.0,
+        synchronous: str = "FULL",
+    ):
+        self.path = path
+        self.apply = apply
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._thread = None
+        self._fork_hook = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._owner = None
+        self._failures = 0
+        self._last_error = None
+        self._last_drain = None
+        self._drained = 0
+        self._db().executescript(_SCHEMA)
+
+    # -----------------------------------------------------------------------
+    # SQLite
+    # -----------------------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        # Uma conexão por thread; após o fork o worker abre as suas
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    # -----------------------------------------------------------------------
+    # Escrita
+    # -----------------------------------------------------------------------
+    def append(self, kind: str, payload: dict, key: str | None = None) -> None:
+        self.append_many([(kind, payload, key)])
+
+    def append_many(self, items: list[tuple]) -> None:
+        """Grava [(tipo, payload, chave)] em uma transação: tudo ou nada."""
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (kind, key, json.dumps(payload, default=_encode), now)
+            for kind, payload, key in items
+        ]
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO entries (kind, key, payload, created) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._wake.set()
+
+    def pending(self, key: str) -> bool:
+        """Há entrada ainda não aplicada com esta chave?"""
+        row = (
+            self._db()
+            .execute(
+                "SELECT 1 FROM entries WHERE key = ? AND status = 'pending' LIMIT 1",
+                (key,),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    # -----------------------------------------------------------------------
+    # Estado
+    # -----------------------------------------------------------------------
+    def counts(self) -> dict:
+        rows = self._db().execute(
+            "SELECT status, COUNT(*), MIN(created) FROM entries GROUP BY status"
+        )
+        return {status: (n, oldest) for status, n, oldest in rows}
+
+    def stats(self) -> dict:
+        counts = self.counts()
+        pending, oldest = counts.get("pending", (0, None))
+        return {
+            "enabled": True,
+            "path": self.path,
+            "pending": pending,
+            "failed": counts.get("failed", (0, None))[0],
+            "oldest_pending_seconds": (
+                round(time.time() - oldest, 1) if oldest is not None else None
+            ),
+            "draining": self._owner is not None and self._holds_lease(),
+            "drained": self._drained,
+            "consecutive_failures": self._failures,
+            "last_error": self._last_error,
+            "last_drain": self._last_drain,
+        }
+
+    # -----------------------------------------------------------------------
+    # Concessão entre processos
+    # -----------------------------------------------------------------------
+    def _holds_lease(self) -> bool:
+        row = self._db().execute("SELECT owner, expires FROM lease").fetchone()
+        return row is not None and row[0] == self._owner and row[1] >= time.time()
+
+    def _claim_lease(self) -> bool:
+        now = time.time()
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires FROM lease").fetchone()
+            if row is not None and row[0] != self._owner and row[1] >= now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO lease (id, owner, expires) VALUES (1, ?, ?)",
+                (self._owner, now + self.lease),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_lease(self) -> None:
+        self._db().execute("DELETE FROM lease WHERE owner = ?", (self._owner,))
+
+    # -----------------------------------------------------------------------
+    # Drenagem
+    # -----------------------------------------------------------------------
+    def _next_batch(self) -> list[dict]:
+        rows = self._db().execute(
+            "SELECT seq, kind, key, payload FROM entries WHERE status = 'pending' "
+            "ORDER BY seq LIMIT ?",
+            (self.batch_size,),
+        )
+        return [
+            {
+                "seq": seq,
+                "kind": kind,
+                "key": key,
+                "payload": json.loads(payload, object_hook=_decode),
+            }
+            for seq, kind, key, payload in rows
+        ]
+
+    def _finish(self, batch: list[dict], rejected: dict) -> None:
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE entries SET status = 'failed', attempts = attempts + 1, "
+                "error = ? WHERE seq = ?",
+                [(str(message), seq) for seq, message in rejected.items()],
+            )
+            conn.executemany(
+                "DELETE FROM entries WHERE seq = ?",
+                [(e["seq"],) for e in batch if e["seq"] not in rejected],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _record_failure(self, batch: list[dict], error: Exception) -> None:
+        self._failures += 1
+        self._last_error = str(error)
+        self._db().execute(
+            "UPDATE entries SET attempts = attempts + 1, error = ? "
+            "WHERE seq BETWEEN ? AND ?",
+            (self._last_error, batch[0]["seq"], batch[-1]["seq"]),
+        )
+
+    def drain_once(self) -> int:
+        """Aplica um lote. Retorna quantas entradas saíram da fila."""
+        batch = self._next_batch()
+        if not batch:
+            return 0
+        try:
+            rejected = self.apply(batch) or {}
+        except Exception as e:
+            self._record_failure(batch, e)
+            raise
+        self._finish(batch, rejected)
+        self._failures = 0
+        self._last_error = None
+        self._last_drain = time.time()
+        self._drained += len(batch)
+        for seq, message in rejected.items():
+            logging.error("Diário: entrada %s recusada: %s", seq, message)
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            wait = self.interval
+            try:
+                if self._claim_lease() and self.drain_once():
+                    # Ainda pode haver fila: segue sem esperar
+                    continue
+            except Exception as e:
+                logging.warning("Diário: falha ao drenar (%s): %s", self.path, e)
+                wait = min(self.max_backoff, self.interval * 2**self._failures)
+            self._wake.wait(wait)
+            self._wake.clear()
+        try:
+            self._release_lease()
+        except sqlite3.Error:
+            pass
+
+    def start(self) -> None:
+        """Inicia a drenagem em segundo plano (idempotente)."""
+        if self._thread is not None:
+            return
+        if hasattr(os, "register_at_fork") and not self._fork_hook:
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._thread = threading.Thread(
+            target=self._run, name="write-journal", daemon=True
+        )
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # O worker não herda a thread nem a concessão do processo pai
+        if self._thread is not None:
+            self._thread = None
+            self._stop = threading.Event()
+            self._wake = threading.Event()
+            self.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
@@ -0,0 +1,103 @@
+## backend/shared/marks.py
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS touched (
+    key TEXT PRIMARY KEY,
+    at  REAL NOT NULL
+);
+"""
+
+
+class TouchMarks:
+    """
+    Marcas "a chave mudou neste instante" (time.time()) para caches que
+    vivem em cada processo. Quem lê do banco anota quando a leitura começou;
+    a entrada guardada só vale enquanto não houver marca da chave igual ou
+    posterior a esse instante.
+
+    Com `path`, as marcas ficam em um arquivo SQLite dividido pelos processos
+    (workers do gunicorn): a escrita confirmada em um worker invalida o cache
+    de todos, sem esperar o TTL. Sem `path`, valem só para este processo.
+    Marcas mais velhas que `keep` segundos (o TTL do cache) são descartadas.
+    """
+
+    def __init__(self, keep: float, path: str | None = None):
+        self.keep = max(keep, 1.0)
+        self.path = path or None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._marks: dict = {}  # sem arquivo: chave -> time() da marca
+        self._pruned = time.time()
+        self._touches = 0
+        self._errors = 0
+        if self.path is not None:
+            self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        # Uma conexão por thread; após o fork o worker abre as suas
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def touch(self, key) -> None:
+        key, now = str(key), time.time()
+        prune = now - self._pruned > self.keep
+        if prune:
+            self._pruned = now
+        self._touches += 1
+        if self.path is None:
+            with self._lock:
+                self._marks[key] = now
+                if prune:
+                    limit = now - self.keep
+                    self._marks = {k: t for k, t in self._marks.items() if t >= limit}
+            return
+        try:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO touched (key, at) VALUES (?, ?)", (key, now)
+            )
+            if prune:
+                conn.execute("DELETE FROM touched WHERE at < ?", (now - self.keep,))
+        except sqlite3.Error as e:
+            # Os demais processos só veem a escrita quando o TTL vencer
+            self._errors += 1
+            logging.error("Marcas %s: falha ao gravar %s: %s", self.path, key, e)
+
+    def touched_at(self, key) -> float | None:
+        """Instante da última marca da chave (None = nenhuma recente)."""
+        key = str(key)
+        if self.path is None:
+            with self._lock:
+                return self._marks.get(key)
+        try:
+            row = self._db().execute("SELECT at FROM touched WHERE key = ?", (key,))
+            row = row.fetchone()
+            return row[0] if row is not None else None
+        except sqlite3.Error as e:
+            # Sem saber se houve escrita, o cache não é confiável: vai ao banco
+            self._errors += 1
+            logging.error("Marcas %s: falha ao ler %s: %s", self.path, key, e)
+            return time.time()
+
+    def fresh(self, key, started: float) -> bool:
+        """A leitura da chave que começou em `started` ainda vale?"""
+        touched = self.touched_at(key)
+        return touched is None or touched < started
+
+    def stats(self) -> dict:
+        return {
+            "shared": self.path,
+            "touches": self._touches,
+            "errors": self._errors,
+        }
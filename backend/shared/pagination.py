@@ -0,0 +1,24 @@
+## backend/shared/pagination.py
+
+import json
+import base64
+from datetime import datetime
+
+
+def encode_cursor(moment: datetime, number: int) -> str:
+    """
+    Cursor opaco de paginação por chave: (data da última linha, inteiro de
+    desempate). O cliente só devolve o valor recebido em `next_cursor`.
+    """
+    raw = json.dumps([moment.isoformat(), number], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """Inverso de encode_cursor. Levanta ValueError se o cursor for inválido."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        moment, number = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(moment), int(number)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"cursor inválido: {token!r}") from e
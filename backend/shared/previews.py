@@ -0,0 +1,161 @@
+## backend/shared/previews.py
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+# ---------------------------------------------------------------------------
+# Configuração
+# ---------------------------------------------------------------------------
+PREVIEW_CACHE_DIR = os.getenv(
+    "PREVIEW_CACHE_DIR", os.path.join(tempfile.gettempdir(), "laser_previews")
+)
+PREVIEW_CACHE_MAX_MB = int(os.getenv("PREVIEW_CACHE_MAX_MB", "512"))
+PREVIEW_QUALITY = int(os.getenv("PREVIEW_QUALITY", "80"))
+
+# Variante → maior dimensão (largura, altura)
+VARIANTS = {
+    "thumb": (320, 320),
+    "medium": (1280, 1280),
+}
+
+
+class PreviewCache:
+    """
+    Cache em disco das variantes redimensionadas, com limite de tamanho e
+    descarte LRU. A chave inclui mtime e tamanho do original, então um
+    desenho reconvertido gera uma nova variante automaticamente.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # nome → bytes
+        self._total = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """Reconstrói o índice LRU a partir do disco (mais antigos primeiro)."""
+        files = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".jpg"):
+                    st = entry.stat()
+                    files.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _key_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(name, threading.Lock())
+
+    def _hit(self, name: str, path: str) -> bool:
+        """Sob self._lock. Entrada no índice e arquivo ainda no disco?"""
+        if name not in self._entries:
+            return False
+        if not os.path.exists(path):
+            # Apagado por fora (limpeza do temp, outro processo): regenera
+            self._total -= self._entries.pop(name)
+            return False
+        self._entries.move_to_end(name)
+        return True
+
+    def get(self, source: str, variant: str) -> tuple[str, str]:
+        """
+        Retorna (caminho da variante, etag), gerando-a se necessário.
+        Levanta FileNotFoundError se o original não existir.
+        """
+        st = os.stat(source)
+        version = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        digest = hashlib.sha1(f"{source}|{version}|{variant}".encode()).hexdigest()
+        name = f"{digest}.jpg"
+        path = os.path.join(self.directory, name)
+
+        with self._lock:
+            if self._hit(name, path):
+                return path, digest
+
+        # Um único gerador por variante; os demais esperam e reutilizam
+        lock = self._key_lock(name)
+        try:
+            with lock:
+                with self._lock:
+                    if self._hit(name, path):
+                        return path, digest
+
+                size = self._render(source, path, VARIANTS[variant])
+
+                with self._lock:
+                    self._total += size - self._entries.get(name, 0)
+                    self._entries[name] = size
+                    self._evict()
+        finally:
+            # Também quando a geração falha: a trava não fica para sempre
+            with self._lock:
+                if self._key_locks.get(name) is lock:
+                    del self._key_locks[name]
+        return path, digest
+
+    def _render(self, source: str, target: str, box: tuple[int, int]) -> int:
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        try:
+            with Image.open(source) as img:
+                # draft: o decoder JPEG já reduz na leitura (DCT), bem mais rápido
+                img.draft("RGB", box)
+                img = img.convert("RGB")
+                img.thumbnail(box, Image.Resampling.LANCZOS)
+                img.save(
+                    tmp,
+                    "JPEG",
+                    quality=PREVIEW_QUALITY,
+                    optimize=True,
+                    progressive=True,
+                )
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        logging.debug("Preview gerado: %s → %s", source, target)
+        return os.path.getsize(target)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> PreviewCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PreviewCache(PREVIEW_CACHE_DIR, PREVIEW_CACHE_MAX_MB * 1024 * 1024)
+        return _cache
@@ -0,0 +1,344 @@
+## backend/shared/snapshot.py
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import decimal
+import logging
+import datetime
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    started REAL    NOT NULL,
+    taken   REAL    NOT NULL,
+    payload TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS touched (
+    key TEXT PRIMARY KEY,
+    at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lease (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    owner   TEXT,
+    expires REAL
+);
+"""
+
+
+def _encode(value):
+    if isinstance(value, decimal.Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Tipo não suportado no retrato: {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and "$dec" in obj:
+        return decimal.Decimal(obj["$dec"])
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+class PartitionedSnapshot:
+    """
+    Resultado inteiro de uma consulta em memória, indexado por uma coluna.
+
+    Uma thread em segundo plano roda `fetch()` — que devolve (colunas,
+    linhas) — a cada `interval` segundos, monta {chave: [linhas]} e troca o
+    índice de uma vez: leitores veem o antigo ou o novo, nunca um parcial.
+
+    touch(chave) marca a partição como alterada por uma escrita nossa e
+    antecipa a recarga (as marcas de `min_gap` segundos viram uma recarga
+    só). Até chegar um retrato cuja consulta começou depois da marca,
+    lookup() devolve None para essa chave e quem chamou lê do banco. O mesmo
+    vale para tudo se o retrato passar de `max_age` (banco fora, por exemplo).
+
+    Com `path`, os processos (workers do gunicorn) dividem um arquivo SQLite:
+    só quem detém a concessão consulta o banco e publica o retrato; os demais
+    o carregam do arquivo. As marcas também ficam no arquivo, então a escrita
+    feita em um worker vale para todos. Sem `path`, cada processo é sozinho.
+    """
+
+    def __init__(
+        self,
+        fetch,
+        key: str,
+        interval: float,
+        max_age: float,
+        min_gap: float = 1.0,
+        name: str = "snapshot",
+        path: str | None = None,
+    ):
+        self.fetch = fetch
+        self.key = key
+        self.interval = interval
+        self.max_age = max(max_age, interval)
+        self.min_gap = min_gap
+        self.name = name
+        self.path = path or None
+        self.lease = max(self.max_age, 10.0)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (colunas, {chave: [linhas]}, início da consulta, fim da consulta)
+        self._state = None
+        self._touched: dict = {}  # sem arquivo: chave -> time() da escrita
+        self._rows = 0
+        self._refreshes = 0
+        self._loads = 0
+        self._failures = 0
+        self._last_error = None
+        self._last_refresh_seconds = None
+        self._served = 0
+        self._bypassed = 0
+        self._owner = None
+        self._thread = None
+        self._fork_hook = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        if self.path is not None:
+            self._db().executescript(_SCHEMA)
+
+    # -----------------------------------------------------------------------
+    # SQLite (modo compartilhado)
+    # -----------------------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        # Uma conexão por thread; após o fork o worker abre as suas
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _touched_at(self, key: str) -> float | None:
+        row = self._db().execute("SELECT at FROM touched WHERE key = ?", (key,))
+        row = row.fetchone()
+        return row[0] if row is not None else None
+
+    def _touched_since(self, started: float) -> bool:
+        row = self._db().execute("SELECT MAX(at) FROM touched").fetchone()
+        return row[0] is not None and row[0] >= started
+
+    # -----------------------------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------------------------
+    def lookup(self, key) -> tuple | None:
+        """(colunas, linhas, idade em segundos) ou None se é preciso ir ao banco."""
+        key = str(key)
+        if self.path is None:
+            # Retrato e marcas lidos juntos: a recarga troca os dois de uma vez
+            with self._lock:
+                state, touched = self._state, self._touched.get(key)
+        else:
+            # No arquivo, marcas só saem depois de max_age
+            state = self._state
+            touched = self._touched_at(key) if state is not None else None
+        with self._lock:
+            if (
+                state is None
+                or (touched is not None and touched >= state[2])
+                or time.time() - state[2] > self.max_age
+            ):
+                self._bypassed += 1
+                return None
+            self._served += 1
+        columns, index, started, _ = state
+        return columns, index.get(key, []), time.time() - started
+
+    def age(self) -> float | None:
+        state = self._state
+        return None if state is None else time.time() - state[2]
+
+    def touch(self, key) -> None:
+        """Marca a partição como alterada (em todos os processos) e pede recarga."""
+        key, now = str(key), time.time()
+        if self.path is None:
+            with self._lock:
+                self._touched[key] = now
+        else:
+            self._db().execute(
+                "INSERT OR REPLACE INTO touched (key, at) VALUES (?, ?)", (key, now)
+            )
+        self._wake.set()
+
+    def stats(self) -> dict:
+        state = self._state
+        age = self.age()
+        return {
+            "enabled": True,
+            "shared": self.path,
+            "ready": state is not None,
+            "interval": self.interval,
+            "max_age": self.max_age,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "taken_at": state[3] if state is not None else None,
+            "keys": len(state[1]) if state is not None else 0,
+            "rows": self._rows,
+            "served": self._served,
+            "bypassed": self._bypassed,
+            "refreshing": self._owner is not None and self._holds_lease(),
+            "refreshes": self._refreshes,
+            "loads": self._loads,
+            "last_refresh_seconds": self._last_refresh_seconds,
+            "consecutive_failures": self._failures,
+            "last_error": self._last_error,
+        }
+
+    # -----------------------------------------------------------------------
+    # Recarga
+    # -----------------------------------------------------------------------
+    def _install(self, columns: list, rows: list, started: float, taken: float):
+        at = columns.index(self.key)
+        index = {}
+        for row in rows:
+            index.setdefault(str(row[at]), []).append(row)
+        with self._lock:
+            # Troca atômica
+            self._state = (columns, index, started, taken)
+            self._touched = {k: t for k, t in self._touched.items() if t >= started}
+        self._rows = len(rows)
+
+    def refresh(self) -> None:
+        """Consulta o banco, troca o índice e, com arquivo, publica o retrato."""
+        started = time.time()
+        columns, rows = self.fetch()
+        taken = time.time()
+        if self.path is not None:
+            payload = json.dumps([columns, rows], default=_encode)
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshot (id, started, taken, payload) "
+                    "VALUES (1, ?, ?, ?)",
+                    (started, taken, payload),
+                )
+                # Marca mais velha que max_age não barra nenhum retrato servível
+                conn.execute(
+                    "DELETE FROM touched WHERE at < ?", (taken - self.max_age,)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._install(columns, rows, started, taken)
+        self._refreshes += 1
+        self._last_refresh_seconds = round(taken - started, 3)
+
+    def _load_shared(self) -> None:
+        """Carrega o retrato publicado por outro processo, se for mais novo."""
+        state = self._state
+        row = self._db().execute("SELECT started FROM snapshot").fetchone()
+        if row is None or (state is not None and row[0] <= state[2]):
+            return
+        started, taken, payload = (
+            self._db()
+            .execute("SELECT started, taken, payload FROM snapshot")
+            .fetchone()
+        )
+        columns, rows = json.loads(payload, object_hook=_decode)
+        self._install(columns, [tuple(r) for r in rows], started, taken)
+        self._loads += 1
+
+    def _due(self) -> bool:
+        state = self._state
+        return (
+            state is None
+            or time.time() - state[2] >= self.interval
+            or self._touched_since(state[2])
+        )
+
+    # -----------------------------------------------------------------------
+    # Concessão entre processos
+    # -----------------------------------------------------------------------
+    def _holds_lease(self) -> bool:
+        if self.path is None:
+            return True
+        row = self._db().execute("SELECT owner, expires FROM lease").fetchone()
+        return row is not None and row[0] == self._owner and row[1] >= time.time()
+
+    def _claim_lease(self) -> bool:
+        now = time.time()
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires FROM lease").fetchone()
+            if row is not None and row[0] != self._owner and row[1] >= now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO lease (id, owner, expires) VALUES (1, ?, ?)",
+                (self._owner, now + self.lease),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_lease(self) -> None:
+        self._db().execute("DELETE FROM lease WHERE owner = ?", (self._owner,))
+
+    def _tick(self) -> None:
+        if self.path is None:
+            self.refresh()
+            return
+        if self._claim_lease():
+            if self._due():
+                self.refresh()
+        else:
+            self._load_shared()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._tick()
+                self._failures = 0
+                self._last_error = None
+            except Exception as e:
+                self._failures += 1
+                self._last_error = str(e)
+                logging.error("%s: falha na recarga: %s", self.name, e)
+            if self.path is not None:
+                # Marcas de outros processos só aparecem no arquivo
+                self._stop.wait(self.min_gap)
+            elif self._wake.wait(self.interval) and not self._stop.is_set():
+                # Junta as escritas de uma rajada em uma recarga só
+                self._stop.wait(self.min_gap)
+        if self.path is not None:
+            try:
+                self._release_lease()
+            except sqlite3.Error:
+                pass
+
+    def start(self) -> None:
+        """Inicia a recarga em segundo plano (idempotente)."""
+        if self._thread is not None:
+            return
+        if hasattr(os, "register_at_fork") and not self._fork_hook:
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # O worker herda o último retrato e reinicia a própria recarga
+        if self._thread is not None:
+            self._thread = None
+            self._stop = threading.Event()
+            self._wake = threading.Event()
+            self._lock = threading.Lock()
+            self.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
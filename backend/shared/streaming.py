@@ -0,0 +1,86 @@
+## backend/shared/streaming.py
+
+"""
+Respostas JSON geradas aos pedaços, enquanto as linhas saem do cursor.
+
+O documento tem a forma {"<chave>": [...], "total": n, "success": true};
+"success" vem por último porque só se sabe o resultado no fim. Se a leitura
+falhar no meio, o documento fecha com "success": false e "error" — o status
+HTTP (200) já foi enviado.
+"""
+
+import logging
+
+from flask import Response, current_app, stream_with_context
+
+# Bytes acumulados antes de entregar um pedaço ao servidor
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _opening(key: str, dumps) -> str:
+    return "{" + dumps(key) + ":["
+
+
+def _closing(total: int, error: Exception | None, dumps) -> str:
+    if error is None:
+        return f'],"total":{total},"success":true}}'
+    message = getattr(error, "message", None) or str(error)
+    return f'],"total":{total},"success":false,"error":{dumps(message)}}}'
+
+
+def json_chunks(key: str, rows, dumps):
+    """Gera o documento JSON em pedaços de ~STREAM_CHUNK_BYTES."""
+    buffer = [_opening(key, dumps)]
+    size = 0
+    total = 0
+    error = None
+    try:
+        for row in rows:
+            item = dumps(row)
+            buffer.append("," + item if total else item)
+            size += len(item)
+            total += 1
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+    except Exception as e:
+        logging.error("Falha durante resposta em streaming (%s): %s", key, e)
+        error = e
+    buffer.append(_closing(total, error, dumps))
+    yield "".join(buffer)
+
+
+async def json_chunks_async(key: str, rows, dumps):
+    """Mesmo que json_chunks, para iteradores assíncronos."""
+    buffer = [_opening(key, dumps)]
+    size = 0
+    total = 0
+    error = None
+    try:
+        async for row in rows:
+            item = dumps(row)
+            buffer.append("," + item if total else item)
+            size += len(item)
+            total += 1
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+    except Exception as e:
+        logging.error("Falha durante resposta em streaming (%s): %s", key, e)
+        error = e
+    buffer.append(_closing(total, error, dumps))
+    yield "".join(buffer)
+
+
+def stream_json(key: str, rows) -> Response:
+    """
+    Resposta Flask em streaming. O contexto da requisição (e a conexão da
+    unidade de trabalho) fica aberto até o último pedaço ser enviado.
+    """
+    dumps = current_app.json.dumps
+    return Response(
+        stream_with_context(json_chunks(key, rows, dumps)),
+        mimetype="application/json",
+    )
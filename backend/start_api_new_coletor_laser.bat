@@ -46,12 +46,12 @@ cd
 echo.
 echo Iniciando API...
 echo ========================================
-echo A API estara disponivel em: http://localhost:5000
+echo A API estara disponivel em: http://localhost:5050
 echo ========================================
 echo.
 
-:: Iniciar a API
-python app.py
+:: Iniciar a API (waitress, sem debug). Para desenvolvimento: python app.py
+python serve.py
 
 :: Se a API fechar, mostrar mensagem
 echo.
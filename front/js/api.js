@@ -57,6 +57,26 @@ export async function apiConfirmBatch(payload) {
     return request(`${LASER}/apontamento/confirm_batch`, "POST", payload);
 }
 
+// --- Eventos em tempo real (Server-Sent Events) ---
+// O EventSource reconecta sozinho se a conexão cair. Se o servidor recusar
+// (503: limite de assinantes), ele desiste e chama onClosed.
+export function subscribeChanges(operatorCode, ofId, onEvent, onClosed) {
+    const params = new URLSearchParams({ operator_code: operatorCode });
+    if (ofId) params.set("of_id", ofId);
+    const source = new EventSource(`${LASER}/events?${params}`);
+    source.onmessage = (msg) => {
+        try {
+            onEvent(JSON.parse(msg.data));
+        } catch {
+            /* mensagem malformada — ignora */
+        }
+    };
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && onClosed) onClosed();
+    };
+    return source;
+}
+
 // --- Download .step ---
 export function buildStepDownloadUrl(filePath) {
     return `${LASER}/download_step?file_path=${encodeURIComponent(filePath)}`;
@@ -24,10 +24,12 @@ import {
 } from "./ui.js";
 import { loadSequencing } from "./dashboard.js";
 import { startTimer, pauseTimer, resetTimer } from "./timer.js";
+import { startLiveUpdates } from "./live.js";
 
 // ── Abertura da view ───────────────────────────────────────────
 export async function openApontamento(job) {
     state.selectedOf = job;
+    startLiveUpdates();
 
     showView("apontamento");
 
@@ -50,7 +52,7 @@ export async function openApontamento(job) {
         // Botão de download do .STEP
         const btnStep = document.getElementById("btnDownloadStep");
         if (btnStep) {
-            if (job.JPC_DESENHO_ENG) {
+            if (job.JPC_DESENHO_ENG && job.STEP_DISPONIVEL !== false) {
                 btnStep.disabled = false;
                 btnStep.onclick = () => {
                     window.location = buildStepDownloadUrl(job.JPC_DESENHO_ENG);
@@ -255,11 +257,19 @@ async function _handleBack() {
 
     state.selectedOf = null;
     resetApontamento();
+    startLiveUpdates();
 
     await loadSequencing();
     showView("dashboard");
 }
 
+// Recarrega o histórico da OF aberta (usado por live.js)
+export function refreshExistingApontamentos() {
+    if (state.selectedOf) {
+        _loadExistingApontamentos(state.selectedOf.SOC_CODIOF);
+    }
+}
+
 // ── Helpers internos ───────────────────────────────────────────
 function _refresh() {
     syncControlButtons(state.apontamentoState, state.apontamentoId);
@@ -8,6 +8,7 @@ import { state } from "./state.js";
 import { fetchSequencing } from "./api.js";
 import { showToast, showView } from "./ui.js";
 import { renderJobTable } from "./dashboard.js";
+import { startLiveUpdates } from "./live.js";
 
 export function initAuth() {
     const loginBtn = document.getElementById("loginBtn");
@@ -63,6 +64,7 @@ async function handleLogin() {
         const success = await loadSequencing();
 
         if (success) {
+            startLiveUpdates();
             loginBtn.style.background = "linear-gradient(135deg,#28a745 0%,#20c997 100%)";
             loginBtnText.textContent = "Acesso concedido!";
 
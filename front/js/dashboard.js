@@ -38,7 +38,7 @@ export function renderJobTable(jobs) {
         const progress = qtdProg > 0 ? (qtdReal / qtdProg) * 100 : 0;
         const progColor = progress >= 100 ? "#28a745" : progress >= 50 ? "#ffc107" : "#dc3545";
 
-        const stepBtn = job.JPC_DESENHO_ENG
+        const stepBtn = job.JPC_DESENHO_ENG && job.STEP_DISPONIVEL !== false
             ? `<button class="btn btn-download-step" data-path="${job.JPC_DESENHO_ENG}"
               style="background:#6c757d;color:white;border:none;padding:8px 16px;border-radius:6px;
                      cursor:pointer;font-size:0.8rem;display:inline-flex;align-items:center;gap:6px;">
@@ -0,0 +1,85 @@
+// frontend/js/live.js
+
+// ============================================================
+// live.js — Atualização automática por eventos do servidor
+// Substitui recargas manuais: o backend avisa quando um
+// apontamento do operador (ou da OF aberta) muda.
+// ============================================================
+
+import { state } from "./state.js";
+import { subscribeChanges, fetchSequencing } from "./api.js";
+import { renderJobTable } from "./dashboard.js";
+import { refreshExistingApontamentos } from "./apontamento.js";
+
+// Sem canal de eventos (servidor recusou): recarrega a cada POLL_MS e
+// tenta assinar de novo depois de RETRY_MS
+const POLL_MS = 30000;
+const RETRY_MS = 60000;
+
+let source = null;
+let timer = null;
+let polling = null;
+let retry = null;
+let pending = { sequencing: false, apontamentos: false };
+
+// (Re)abre a assinatura para o operador e a OF selecionada
+export function startLiveUpdates() {
+    stopLiveUpdates();
+    if (!state.operatorCode) return;
+    source = subscribeChanges(
+        state.operatorCode,
+        state.selectedOf?.SOC_CODIOF,
+        _onChange,
+        _fallBackToPolling
+    );
+}
+
+export function stopLiveUpdates() {
+    if (source) source.close();
+    source = null;
+    clearInterval(polling);
+    clearTimeout(retry);
+    polling = retry = null;
+}
+
+function _fallBackToPolling() {
+    source = null;
+    polling = setInterval(() => _onChange({ type: "resync" }), POLL_MS);
+    retry = setTimeout(startLiveUpdates, RETRY_MS);
+}
+
+function _onChange(event) {
+    const ofId = state.selectedOf?.SOC_CODIOF;
+    const all = event.type === "resync";
+
+    if (all || event.operator_code === String(state.operatorCode)) {
+        pending.sequencing = true;
+    }
+    if (ofId && (all || event.of_id === String(ofId))) {
+        pending.apontamentos = true;
+    }
+
+    // Agrupa rajadas (ex.: confirm_batch) em uma recarga só
+    clearTimeout(timer);
+    timer = setTimeout(_apply, 300);
+}
+
+async function _apply() {
+    const todo = pending;
+    pending = { sequencing: false, apontamentos: false };
+
+    if (todo.sequencing) {
+        try {
+            const data = await fetchSequencing(state.operatorCode);
+            if (data.success && data.jobs) {
+                state.allJobs = data.jobs;
+                renderJobTable(state.allJobs);
+            }
+        } catch {
+            /* próxima alteração tenta de novo */
+        }
+    }
+    if (todo.apontamentos) {
+        refreshExistingApontamentos();
+    }
+}
@@ -0,0 +1,351 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import queue
+from datetime import datetime
+
+log = logging.getLogger("conversao")
+
+
+# ========= BACKENDS =========
+class FakeConverter:
+    """Conversor substituto (Linux/testes): grava um arquivo no destino."""
+
+    def __init__(self, delay: float = 0.0, fail_every: int = 0):
+        self.delay = delay
+        self.fail_every = fail_every
+        self._calls = 0
+
+    def convert(self, origem: str, destino: str) -> None:
+        self._calls += 1
+        if self.fail_every and self._calls % self.fail_every == 0:
+            raise RuntimeError("falha simulada")
+        if self.delay:
+            time.sleep(self.delay)
+        with open(destino, "wb") as f:
+            f.write(b"FAKE-JPG " + os.path.basename(origem).encode("utf-8"))
+
+    def close(self) -> None:
+        pass
+
+
+class SolidWorksConverter:
+    """
+    Conversor real via COM. Cada worker abre sua própria instância do
+    SolidWorks (DispatchEx), então as conversões rodam em paralelo.
+    """
+
+    swDocDRAWING = 3
+    swSaveAsCurrentVersion = 0
+    swSaveAsOptions_Silent = 1
+
+    def __init__(self):
+        import pythoncom
+        import win32com.client
+
+        pythoncom.CoInitialize()
+        self._pythoncom = pythoncom
+        self.sw = win32com.client.DispatchEx("SldWorks.Application")
+        self.sw.Visible = False
+
+    def convert(self, origem: str, destino: str) -> None:
+        # OpenDoc6 é síncrono: retorna com o documento carregado, sem sleep
+        doc = self.sw.OpenDoc6(origem, self.swDocDRAWING, 0, "", None, None)
+        if doc is None:
+            raise RuntimeError("SolidWorks não abriu o desenho")
+        try:
+            ok = doc.SaveAs3(
+                destino, self.swSaveAsCurrentVersion, self.swSaveAsOptions_Silent
+            )
+            if ok not in (0, True, None):
+                raise RuntimeError(f"SaveAs3 retornou {ok}")
+        finally:
+            self.sw.CloseDoc(origem)
+
+    def close(self) -> None:
+        try:
+            self.sw.ExitApp()
+        finally:
+            self._pythoncom.CoUninitialize()
+
+
+BACKENDS = {
+    "solidworks": SolidWorksConverter,
+    "fake": FakeConverter,
+}
+
+
+# ========= MANIFESTO =========
+class Manifest:
+    """Estado persistente das conversões (SQLite, modo WAL)."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS desenhos (
+                origem      TEXT PRIMARY KEY,
+                mtime_ns    INTEGER NOT NULL,
+                tamanho     INTEGER NOT NULL,
+                hash        TEXT,
+                destino     TEXT,
+                status      TEXT NOT NULL,
+                tentativas  INTEGER NOT NULL DEFAULT 0,
+                erro        TEXT,
+                convertido  TEXT
+            )
+            """)
+        self.conn.commit()
+
+    def load(self) -> dict:
+        rows = self.conn.execute(
+            "SELECT origem, mtime_ns, tamanho, hash, status FROM desenhos"
+        )
+        return {
+            r[0]: {"mtime_ns": r[1], "tamanho": r[2], "hash": r[3], "status": r[4]}
+            for r in rows
+        }
+
+    def touch(self, origem: str, mtime_ns: int, tamanho: int) -> None:
+        """Arquivo tocado mas com o mesmo conteúdo: só atualiza mtime/tamanho."""
+        self.conn.execute(
+            "UPDATE desenhos SET mtime_ns = ?, tamanho = ? WHERE origem = ?",
+            (mtime_ns, tamanho, origem),
+        )
+
+    def record(self, job: dict, status: str, tentativas: int, erro=None) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO desenhos
+                (origem, mtime_ns, tamanho, hash, destino, status,
+                 tentativas, erro, convertido)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(origem) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                tamanho = excluded.tamanho,
+                hash = excluded.hash,
+                destino = excluded.destino,
+                status = excluded.status,
+                tentativas = excluded.tentativas,
+                erro = excluded.erro,
+                convertido = excluded.convertido
+            """,
+            (
+                job["origem"],
+                job["mtime_ns"],
+                job["tamanho"],
+                job["hash"],
+                job["destino"],
+                status,
+                tentativas,
+                erro,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ========= PLANEJAMENTO =========
+def plan(pasta_origem: str, pasta_destino: str, manifest: Manifest) -> list[dict]:
+    """
+    Lista os desenhos que precisam de conversão. Desenhos com mtime e
+    tamanho iguais aos do manifesto (e JPG presente) nem são abertos; o hash
+    só é calculado quando mtime/tamanho mudaram. Desenho ainda fora do
+    manifesto cujo JPG é mais novo (regra do conversor antigo) entra no
+    manifesto como convertido, sem passar pelo SolidWorks.
+    """
+    known = manifest.load()
+    # Uma listagem do destino em vez de um stat por JPG: nome → mtime
+    existentes = {}
+    with os.scandir(pasta_destino) as it:
+        for e in it:
+            if e.name.lower().endswith(".jpg"):
+                existentes[e.name.lower()] = e.stat().st_mtime_ns
+
+    jobs = []
+    with os.scandir(pasta_origem) as it:
+        for entry in it:
+            if not entry.name.lower().endswith(".slddrw") or not entry.is_file():
+                continue
+
+            st = entry.stat()
+            nome = os.path.splitext(entry.name)[0]
+            jpg = nome + ".jpg"
+            destino = os.path.join(pasta_destino, jpg)
+            atual = known.get(entry.path)
+            tem_jpg = jpg.lower() in existentes
+
+            if atual is None and tem_jpg and existentes[jpg.lower()] >= st.st_mtime_ns:
+                # Fora do manifesto (primeira execução) com JPG mais novo que o
+                # desenho: já convertido pelo conversor antigo, só registra
+                manifest.record(
+                    {
+                        "origem": entry.path,
+                        "destino": destino,
+                        "mtime_ns": st.st_mtime_ns,
+                        "tamanho": st.st_size,
+                        "hash": file_hash(entry.path),
+                    },
+                    "ok",
+                    0,
+                )
+                continue
+
+            if (
+                atual
+                and atual["status"] == "ok"
+                and tem_jpg
+                and atual["mtime_ns"] == st.st_mtime_ns
+                and atual["tamanho"] == st.st_size
+            ):
+                continue
+
+            digest = file_hash(entry.path)
+            if (
+                atual
+                and atual["status"] == "ok"
+                and tem_jpg
+                and atual["hash"] == digest
+            ):
+                manifest.touch(entry.path, st.st_mtime_ns, st.st_size)
+                continue
+
+            motivo = "JPG não existe" if not tem_jpg else "Atualizado, reconvertendo"
+            log.info("%s → %s", entry.name, motivo)
+            jobs.append(
+                {
+                    "origem": entry.path,
+                    "destino": destino,
+                    "mtime_ns": st.st_mtime_ns,
+                    "tamanho": st.st_size,
+                    "hash": digest,
+                }
+            )
+
+    manifest.commit()
+    return jobs
+
+
+# ========= EXECUÇÃO =========
+def run(
+    jobs: list[dict],
+    manifest: Manifest,
+    backend_factory,
+    workers: int = 2,
+    retries: int = 3,
+    backoff: float = 2.0,
+) -> dict:
+    """
+    Converte os desenhos com `workers` threads. Cada thread cria, usa e
+    encerra o próprio conversor (exigência do COM); falhas são repetidas
+    com espera exponencial. O manifesto é gravado só pela thread principal.
+
+    Uma thread que não consegue criar o conversor (mesmas tentativas) sai
+    sem tocar na fila: as demais seguem com ela. Se nenhuma conseguir, os
+    desenhos que sobraram não são marcados como erro — ficam fora do
+    manifesto e voltam na próxima varredura ("pendente" no resumo).
+    """
+    fila = queue.Queue()
+    resultados = queue.Queue()
+    for job in jobs:
+        fila.put(job)
+
+    def worker():
+        backend = None
+        try:
+            for tentativa in range(1, retries + 1):
+                try:
+                    backend = backend_factory()
+                    break
+                except Exception as e:
+                    log.warning(
+                        "Falha ao iniciar conversor (tentativa %d): %s", tentativa, e
+                    )
+                    if tentativa < retries:
+                        time.sleep(backoff * 2 ** (tentativa - 1))
+            if backend is None:
+                log.error("Conversor indisponível, thread encerrada")
+                return
+            while True:
+                try:
+                    job = fila.get_nowait()
+                except queue.Empty:
+                    return
+                resultados.put(convert(backend, job))
+        finally:
+            if backend is not None:
+                try:
+                    backend.close()
+                except Exception as e:
+                    log.warning("Erro ao encerrar conversor: %s", e)
+            # Fim da thread: depois de todos os resultados dela
+            resultados.put(None)
+
+    def convert(backend, job):
+        nome = os.path.basename(job["origem"])
+        erro = None
+        for tentativa in range(1, retries + 1):
+            try:
+                log.info("Convertendo %s (tentativa %d)", nome, tentativa)
+                backend.convert(job["origem"], job["destino"])
+                log.info("%s → OK", nome)
+                return job, tentativa, None
+            except Exception as e:
+                erro = str(e)
+                log.warning("ERRO em %s (tentativa %d): %s", nome, tentativa, e)
+                if tentativa < retries:
+                    time.sleep(backoff * 2 ** (tentativa - 1))
+        return job, retries, erro
+
+    threads = [
+        threading.Thread(target=worker, name=f"conversor-{n}", daemon=True)
+        for n in range(max(1, min(workers, len(jobs))))
+    ]
+    for t in threads:
+        t.start()
+
+    resumo = {"ok": 0, "erro": 0, "pendente": 0}
+    vivas = len(threads)
+    recebidos = 0
+    try:
+        while recebidos < len(jobs) and vivas:
+            item = resultados.get()
+            if item is None:
+                vivas -= 1
+                continue
+            job, tentativas, erro = item
+            status = "erro" if erro else "ok"
+            manifest.record(job, status, tentativas, erro)
+            resumo[status] += 1
+            recebidos += 1
+            if recebidos % 50 == 0:
+                manifest.commit()
+        resumo["pendente"] = len(jobs) - recebidos
+        if resumo["pendente"]:
+            log.error(
+                "Nenhum conversor disponível: %d desenhos ficam para a próxima execução",
+                resumo["pendente"],
+            )
+    finally:
+        manifest.commit()
+        for t in threads:
+            t.join()
+    return resumo
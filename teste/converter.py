@@ -1,87 +1,78 @@
 import os
+import sys
 import time
-import win32com.client
-from datetime import datetime
+import logging
+import argparse
+
+from conversion import BACKENDS, Manifest, plan, run, log
 
 # ========= CONFIG =========
 PASTA_ORIGEM = r"\\10.42.92.192\Diversos\Isaac\Isaac\laser 2.0\teste\slddrw"
 PASTA_DESTINO = r"\\10.42.92.192\Diversos\Isaac\Isaac\laser 2.0\teste\jpg"
 LOG = "conversao.log"
-
-os.makedirs(PASTA_DESTINO, exist_ok=True)
+MANIFESTO = "conversao.sqlite"
+WORKERS = 2
+TENTATIVAS = 3
+BACKOFF = 2.0  # segundos, dobra a cada tentativa
 
 
 # ========= LOG =========
-def log(msg):
-    data = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    linha = f"[{data}] {msg}"
-    print(linha)
-
-    with open(LOG, "a", encoding="utf-8") as f:
-        f.write(linha + "\n")
-
-
-# ========= INICIAR SOLID =========
-log("Iniciando SolidWorks...")
-
-sw = win32com.client.Dispatch("SldWorks.Application")
-sw.Visible = False
-
-swDocDRAWING = 3
-swSaveAsCurrentVersion = 0
-swSaveAsOptions_Silent = 1
-
-
-# ========= LOOP =========
-for arquivo in os.listdir(PASTA_ORIGEM):
-
-    if not arquivo.lower().endswith(".slddrw"):
-        continue
-
-    origem = os.path.join(PASTA_ORIGEM, arquivo)
-    nome = os.path.splitext(arquivo)[0]
-    destino = os.path.join(PASTA_DESTINO, nome + ".jpg")
-
-    data_sld = os.path.getmtime(origem)
-
-    precisa_converter = False
-
-    # Se JPG não existe → gera
-    if not os.path.exists(destino):
-        precisa_converter = True
-        log(f"{arquivo} → JPG não existe")
-
-    else:
-        data_jpg = os.path.getmtime(destino)
-
-        # Se desenho é mais novo → atualiza
-        if data_sld > data_jpg:
-            precisa_converter = True
-            log(f"{arquivo} → Atualizado, reconvertendo")
-
-    # ========= CONVERTER =========
-    if precisa_converter:
-
-        try:
-            log(f"Convertendo {arquivo}")
-
-            doc = sw.OpenDoc6(origem, swDocDRAWING, 0, "", None, None)
-
-            time.sleep(1)
-
-            doc.SaveAs3(destino, swSaveAsCurrentVersion, swSaveAsOptions_Silent)
-
-            sw.CloseDoc(origem)
-
-            log(f"{arquivo} → OK")
-
-        except Exception as e:
-            log(f"ERRO em {arquivo}: {e}")
-
-    else:
-        log(f"{arquivo} → Sem alteração")
-
-
-# ========= FINAL =========
-sw.ExitApp()
-log("Finalizado.")
+def configurar_log(arquivo: str) -> None:
+    # Um handler de arquivo aberto durante toda a execução
+    formato = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+    log.setLevel(logging.INFO)
+    for handler in (
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler(arquivo, encoding="utf-8"),
+    ):
+        handler.setFormatter(formato)
+        log.addHandler(handler)
+
+
+# ========= MAIN =========
+def main():
+    parser = argparse.ArgumentParser(description="Converte desenhos .SLDDRW em JPG")
+    parser.add_argument("--origem", default=PASTA_ORIGEM)
+    parser.add_argument("--destino", default=PASTA_DESTINO)
+    parser.add_argument("--manifesto", default=MANIFESTO)
+    parser.add_argument("--log", default=LOG)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--tentativas", type=int, default=TENTATIVAS)
+    parser.add_argument("--backoff", type=float, default=BACKOFF)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="solidworks")
+    args = parser.parse_args()
+
+    configurar_log(args.log)
+    os.makedirs(args.destino, exist_ok=True)
+
+    inicio = time.monotonic()
+    manifest = Manifest(args.manifesto)
+    try:
+        jobs = plan(args.origem, args.destino, manifest)
+        log.info("%d desenho(s) para converter", len(jobs))
+
+        if jobs:
+            if args.backend == "solidworks":
+                log.info("Iniciando SolidWorks (%d instância(s))...", args.workers)
+            resumo = run(
+                jobs,
+                manifest,
+                BACKENDS[args.backend],
+                workers=args.workers,
+                retries=args.tentativas,
+                backoff=args.backoff,
+            )
+            log.info(
+                "Convertidos: %d | Erros: %d | Pendentes: %d",
+                resumo["ok"],
+                resumo["erro"],
+                resumo["pendente"],
+            )
+    finally:
+        manifest.close()
+
+    log.info("Finalizado em %.1fs.", time.monotonic() - inicio)
+
+
+if __name__ == "__main__":
+    main()